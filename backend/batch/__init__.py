@@ -0,0 +1,18 @@
+"""Batch scene processing for MapTopics backend (API endpoint and `python -m batch`).
+
+Convenience exports:
+    from backend.batch import BatchOptions, process_scene, fan_out, scene_items
+"""
+
+from .jobs import OPERATIONS, BatchOptions, SceneOutcome, process_scene
+from .runner import BatchFormatError, fan_out, scene_items
+
+__all__ = [
+    "OPERATIONS",
+    "BatchOptions",
+    "SceneOutcome",
+    "process_scene",
+    "BatchFormatError",
+    "fan_out",
+    "scene_items",
+]
@@ -0,0 +1,147 @@
+"""
+Process many Excalidraw scenes offline, in parallel, without the API server.
+
+    # re-render thumbnails of every scene in a directory, writing <id>.webp files
+    uv run python -m batch scenes/ --operation render --format webp --thumbnail --out-dir thumbs/
+
+    # validate an NDJSON library export (one scene, or {"id": ..., "scene": ...}, per line)
+    uv run python -m batch library.ndjson --operation parse --results report.ndjson
+
+    # read NDJSON from stdin
+    cat library.ndjson | uv run python -m batch - --operation convert
+
+Inputs are .excalidraw/.json files (one scene each, id = file name), .ndjson/.jsonl files,
+directories (searched recursively for all of these) and `-` for NDJSON on stdin. Scenes are
+spread over --workers processes; one JSON result per scene is written as it completes
+(stdout by default), and a summary goes to stderr. The exit status is 1 if any scene failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List
+
+from render.matplotlib_renderer import IMAGE_FORMATS, init_matplotlib
+
+from .jobs import OPERATIONS, BatchOptions, SceneOutcome, process_scene
+from .runner import fan_out
+
+SCENE_SUFFIXES = (".excalidraw", ".json")
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+def _input_items(paths: List[str]) -> Iterator[bytes]:
+    """JSON of every batch item in `paths`, in order; scene files are wrapped with their name as id."""
+    for name in paths:
+        if name == "-":
+            for line in sys.stdin.buffer:
+                if line.strip():
+                    yield line.strip()
+            continue
+        path = Path(name)
+        if path.is_dir():
+            files = sorted(p for p in path.rglob("*") if p.suffix.lower() in SCENE_SUFFIXES + NDJSON_SUFFIXES)
+        else:
+            files = [path]
+        for file in files:
+            if file.suffix.lower() in NDJSON_SUFFIXES:
+                with file.open("rb") as f:
+                    for line in f:
+                        if line.strip():
+                            yield line.strip()
+            else:
+                scene_id = json.dumps(str(file.relative_to(path)) if path.is_dir() else file.name)
+                yield b'{"id":' + scene_id.encode("utf-8") + b',"scene":' + file.read_bytes() + b"}"
+
+
+async def _aiter(items: Iterator[bytes]) -> AsyncIterator[bytes]:
+    for item in items:
+        yield item
+
+
+def _image_path(out_dir: Path, outcome: SceneOutcome) -> Path:
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", str(outcome.id)).strip("._") or str(outcome.index)
+    return out_dir / f"{stem}.{outcome.image.format}"
+
+
+async def run(args: argparse.Namespace) -> int:
+    options = BatchOptions(operation=args.operation, format=args.format, thumbnail=args.thumbnail)
+    results = open(args.results, "w", encoding="utf-8") if args.results else sys.stdout
+    if args.out_dir:
+        args.out_dir.mkdir(parents=True, exist_ok=True)
+
+    loop = asyncio.get_running_loop()
+
+    def new_executor() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=args.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_matplotlib,
+        )
+
+    executor = new_executor()
+
+    async def submit(index: int, raw: bytes) -> SceneOutcome:
+        nonlocal executor
+        used = executor
+        try:
+            return await loop.run_in_executor(used, process_scene, index, raw, options)
+        except Exception as e:
+            # One broken scene (or worker) must not end the whole run: a crashed worker breaks
+            # its pool, so the scenes after it get a fresh one
+            if isinstance(e, BrokenProcessPool) and executor is used:
+                used.shutdown(wait=False, cancel_futures=True)
+                executor = new_executor()
+            return SceneOutcome(index, index, False, 0.0, error=f"{type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    done = failed = 0
+    try:
+        # A few items queued per worker keeps every process busy between results
+        async for outcome in fan_out(_aiter(_input_items(args.inputs)), submit, args.workers * 2):
+            done += 1
+            row = outcome.to_dict()
+            if outcome.ok and outcome.image is not None and args.out_dir:
+                path = _image_path(args.out_dir, outcome)
+                path.write_bytes(outcome.image.data)
+                row["path"] = str(path)
+            failed += not outcome.ok
+            results.write(json.dumps(row) + "\n")
+            results.flush()
+    finally:
+        executor.shutdown(cancel_futures=True)
+        if results is not sys.stdout:
+            results.close()
+
+    seconds = time.perf_counter() - started
+    rate = done / seconds if seconds else 0.0
+    print(f"{done} scenes ({failed} failed) in {seconds:.2f}s, {rate:.1f} scenes/s on {args.workers} workers", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m batch", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="scene files, NDJSON files, directories, or - for stdin")
+    parser.add_argument("--operation", choices=OPERATIONS, default="render")
+    parser.add_argument("--format", choices=IMAGE_FORMATS, default="png")
+    parser.add_argument("--thumbnail", action="store_true", help="render previews of at most 320px")
+    parser.add_argument("--out-dir", type=Path, default=None, help="write rendered images here")
+    parser.add_argument("--results", default=None, help="NDJSON results file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    args.workers = max(1, args.workers)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
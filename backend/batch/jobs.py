@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from graph.networkx_adapter import excalidraw_to_networkx
+from models import ElementTable, ExcalidrawDocument
+from render.cache import RenderResult, render_cache_key, render_variant_key
+from render.matplotlib_renderer import IMAGE_FORMATS, THUMBNAIL_MAX_SIZE, render_scene, scene_from_table
+
+# parse: validate and count; convert: also build the graph; render: draw the preview (no graph needed)
+OPERATIONS = ("parse", "convert", "render")
+
+
+@dataclass(frozen=True)
+class BatchOptions:
+    operation: str = "render"
+    format: str = "png"
+    thumbnail: bool = False
+
+    def __post_init__(self) -> None:
+        if self.operation not in OPERATIONS:
+            raise ValueError(f"operation must be one of {', '.join(OPERATIONS)}")
+        if self.format not in IMAGE_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(IMAGE_FORMATS)}")
+
+    @property
+    def max_size(self) -> Optional[int]:
+        return THUMBNAIL_MAX_SIZE if self.thumbnail else None
+
+
+@dataclass
+class SceneOutcome:
+    """
+    Result of one scene of a batch, as returned from a worker process.
+
+    `summary` holds what the operation found (element counts, graph size, image size);
+    `image` and `cache_key` are set by render, the key being the scene's render cache variant
+    key so the caller can store the image where the render endpoints will find it.
+    """
+
+    index: int
+    id: Any
+    ok: bool
+    seconds: float
+    summary: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    image: Optional[RenderResult] = None
+    cache_key: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"index": self.index, "id": self.id, "ok": self.ok, "seconds": round(self.seconds, 4)}
+        if self.ok:
+            out.update(self.summary)
+        else:
+            out["error"] = self.error
+        return out
+
+
+def _unwrap(item: Any, index: int):
+    """(id, scene) of a batch item: a scene, or {"id": ..., "scene": scene}."""
+    if isinstance(item, dict) and "scene" in item:
+        return item.get("id", index), item["scene"]
+    return index, item
+
+
+def process_scene(index: int, raw: bytes, options: BatchOptions) -> SceneOutcome:
+    """
+    Run one batch item through `options.operation`. Runs in a worker process, so invalid
+    scenes come back as failed outcomes rather than exceptions.
+
+    `raw` is the JSON of one item: an Excalidraw export or element list, optionally wrapped
+    as {"id": ..., "scene": ...}; without an id the item's position is used.
+    """
+    started = time.perf_counter()
+    scene_id: Any = index
+    try:
+        scene_id, scene = _unwrap(json.loads(raw), index)
+        if not isinstance(scene, list) and not (isinstance(scene, dict) and isinstance(scene.get("elements"), list)):
+            raise ValueError("item is not an Excalidraw scene (expected an element list or an object with elements)")
+        doc = ExcalidrawDocument.from_raw_scene(scene)
+        summary: Dict[str, Any] = {"elements": len(doc.elements), "nodes": len(doc.nodes), "edges": len(doc.edges)}
+        outcome = SceneOutcome(index, scene_id, True, 0.0, summary)
+        if options.operation == "convert":
+            G = excalidraw_to_networkx(doc, directed=True, allow_multi=True, include_deleted=False)
+            summary["graph"] = {"nodes": G.number_of_nodes(), "edges": G.number_of_edges()}
+        elif options.operation == "render":
+            # Rendering needs only the drawable scene, built from the element table without a graph
+            scene = scene_from_table(ElementTable.from_document(doc))
+            summary["graph"] = {"nodes": len(scene), "edges": len(scene.edges)}
+            image = render_scene(scene, options.format, options.max_size)
+            outcome.image = image
+            outcome.cache_key = render_variant_key(render_cache_key(doc), options.format, options.max_size)
+            summary["image"] = {"format": image.format, "width": image.width, "height": image.height, "bytes": len(image.data)}
+    except Exception as e:
+        # Whatever one scene raises (invalid JSON or elements, RecursionError on absurd nesting,
+        # a drawing error) fails only that scene's line
+        outcome = SceneOutcome(index, scene_id, False, 0.0, error=f"{type(e).__name__}: {e}")
+    outcome.seconds = time.perf_counter() - started
+    return outcome
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Optional, Set, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatchFormatError(ValueError):
+    """The batch body is neither NDJSON nor a JSON array of scenes."""
+
+
+async def fan_out(items: AsyncIterable[T], fn: Callable[[int, T], Awaitable[R]], concurrency: int) -> AsyncIterator[R]:
+    """
+    Run `fn(index, item)` for every item with at most `concurrency` running at once, and
+    yield the results as they complete (not in input order).
+
+    Items are pulled from `items` only while there is a free slot, so a long or slowly
+    arriving input is processed as it streams in without being buffered whole. Closing the
+    generator early (e.g. the client went away) cancels the calls still running.
+    """
+    iterator = items.__aiter__()
+    running: Set[asyncio.Future] = set()
+    next_item: "asyncio.Future | None" = None
+    index = 0
+    try:
+        while True:
+            if next_item is None and iterator is not None and len(running) < concurrency:
+                next_item = asyncio.ensure_future(iterator.__anext__())
+            waiting = running | ({next_item} if next_item is not None else set())
+            if not waiting:
+                return
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if next_item is not None and next_item in done:
+                done.discard(next_item)
+                try:
+                    item = next_item.result()
+                except StopAsyncIteration:
+                    iterator = None
+                else:
+                    running.add(asyncio.ensure_future(fn(index, item)))
+                    index += 1
+                next_item = None
+            for task in done:
+                running.discard(task)
+                yield task.result()
+    finally:
+        for task in running | ({next_item} if next_item is not None else set()):
+            task.cancel()
+
+
+async def scene_items(chunks: AsyncIterable[bytes], ndjson: Optional[bool] = None) -> AsyncIterator[bytes]:
+    """
+    Split a batch body into the JSON of its items. NDJSON (one scene per line, blank lines
+    ignored) is split as it arrives; a JSON array of scenes is parsed whole. With
+    `ndjson=None` the format is guessed: a body starting with `[` is an array (send NDJSON
+    explicitly when its lines are bare element lists).
+    """
+    buffer = bytearray()
+    mode = None if ndjson is None else ("lines" if ndjson else "array")
+    async for chunk in chunks:
+        buffer += chunk
+        if mode is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                continue
+            mode = "array" if stripped[:1] == b"[" else "lines"
+        if mode == "lines":
+            start = 0
+            while True:
+                newline = buffer.find(b"\n", start)
+                if newline < 0:
+                    break
+                line = bytes(buffer[start:newline]).strip()
+                start = newline + 1
+                if line:
+                    yield line
+            del buffer[:start]
+
+    if mode == "array":
+        try:
+            items = json.loads(buffer)
+        except ValueError as e:
+            raise BatchFormatError(f"invalid JSON array: {e}") from None
+        if not isinstance(items, list):
+            raise BatchFormatError("expected a JSON array of scenes")
+        for item in items:
+            yield json.dumps(item, separators=(",", ":")).encode("utf-8")
+    elif mode == "lines":
+        line = bytes(buffer).strip()
+        if line:
+            yield line
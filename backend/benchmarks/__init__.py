@@ -0,0 +1,5 @@
+"""Benchmarks for MapTopics backend.
+
+Run from the backend directory, e.g.:
+    uv run python -m benchmarks.bench_render
+"""
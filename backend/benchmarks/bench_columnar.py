@@ -0,0 +1,126 @@
+"""
+Geometry passes over a scene: element models vs the columnar ElementTable.
+
+    uv run python -m benchmarks.bench_columnar --nodes 25000 --repeat 5
+
+- memory: traced Python-heap bytes per element of the validated document vs of its table.
+- bounds: every element's bounding box, element by element from the models (what
+  element_bounds does on dicts) vs ElementTable.bounds().
+- extent: min/max over all node boxes.
+- render scene: excalidraw_to_networkx + scene_from_graph vs scene_from_table.
+
+Building the table costs about one walk over the models and is reported on its own; the
+bounds and extent passes then run on the built table, while the render scene row includes
+the build, as the render endpoints pay it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from graph.networkx_adapter import excalidraw_to_networkx
+from models import ElementTable, ExcalidrawDocument
+from render.matplotlib_renderer import scene_from_graph, scene_from_table
+
+from .scenes import synthetic_scene
+
+
+def model_bounds(doc: ExcalidrawDocument) -> list:
+    out = []
+    for el in doc.elements:
+        points = getattr(el, "points", None)
+        if points:
+            xs = [el.x + p[0] for p in points]
+            ys = [el.y + p[1] for p in points]
+            box = [min(xs), min(ys), max(xs), max(ys)]
+        else:
+            box = [min(el.x, el.x + el.width), min(el.y, el.y + el.height), max(el.x, el.x + el.width), max(el.y, el.y + el.height)]
+        if el.angle:
+            cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+            cos, sin = math.cos(el.angle), math.sin(el.angle)
+            corners = [(box[0], box[1]), (box[2], box[1]), (box[2], box[3]), (box[0], box[3])]
+            xs = [cx + (px - cx) * cos - (py - cy) * sin for px, py in corners]
+            ys = [cy + (px - cx) * sin + (py - cy) * cos for px, py in corners]
+            box = [min(xs), min(ys), max(xs), max(ys)]
+        out.append(box)
+    return out
+
+
+def model_extent(doc: ExcalidrawDocument) -> Tuple[float, float, float, float]:
+    nodes = [n for n in doc.nodes if not n.isDeleted]
+    return (
+        min(n.x for n in nodes),
+        min(n.y for n in nodes),
+        max(n.x + n.width for n in nodes),
+        max(n.y + n.height for n in nodes),
+    )
+
+
+def table_extent(table: ElementTable) -> Tuple[float, float, float, float]:
+    rows = table.node_rows()
+    return (
+        float(table.x[rows].min()),
+        float(table.y[rows].min()),
+        float((table.x[rows] + table.width[rows]).max()),
+        float((table.y[rows] + table.height[rows]).max()),
+    )
+
+
+def traced_bytes(build: Callable[[], object]) -> int:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def median_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=25000, help="nodes (each but the first adds an arrow)")
+    parser.add_argument("--points", type=int, default=2, help="points per arrow")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scene = synthetic_scene(args.nodes, points_per_arrow=args.points, n_files=0)
+    doc = ExcalidrawDocument.from_raw_scene(scene)
+    n = len(doc.elements)
+    doc_bytes = traced_bytes(lambda: ExcalidrawDocument.from_raw_scene(scene))
+    table_bytes = traced_bytes(lambda: ElementTable.from_document(doc))
+    print(f"{n} elements")
+    print(f"memory per element: models {doc_bytes / n:,.0f} B, table {table_bytes / n:,.0f} B ({doc_bytes / table_bytes:.1f}x)")
+
+    table = ElementTable.from_document(doc)
+    rows = [
+        ("build table", None, lambda: ElementTable.from_document(doc)),
+        ("bounds", lambda: model_bounds(doc), table.bounds),
+        ("extent", lambda: model_extent(doc), lambda: table_extent(table)),
+        ("render scene", lambda: scene_from_graph(excalidraw_to_networkx(doc)), lambda: scene_from_table(ElementTable.from_document(doc))),
+    ]
+    print(f"{'pass':>14} {'models (ms)':>12} {'table (ms)':>11} {'speedup':>8}")
+    for name, models, columnar in rows:
+        table_ms = median_ms(columnar, args.repeat)
+        if models is None:
+            print(f"{name:>14} {'':>12} {table_ms:>11.1f}")
+            continue
+        models_ms = median_ms(models, args.repeat)
+        print(f"{name:>14} {models_ms:>12.1f} {table_ms:>11.1f} {models_ms / table_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
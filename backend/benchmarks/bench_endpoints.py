@@ -0,0 +1,165 @@
+"""
+Latency, throughput and memory of the API endpoints, with results stored for comparison.
+
+    # in-process (ASGI app called directly, no server)
+    uv run python -m benchmarks.bench_endpoints --sizes 100 1000 10000
+
+    # against a running server (standalone load generator)
+    uv run python -m benchmarks.bench_endpoints --url http://127.0.0.1:8000 --concurrency 16
+
+    # compare with an earlier run
+    uv run python -m benchmarks.bench_endpoints --compare benchmarks/results/endpoints-20250101-120000.json
+
+Scenarios: /api/explore, /api/mindmap/{topic}, and /api/excalidraw/parse, echo and render
+for scenes of each --sizes element count, built from copies of data/excalidraw_base.json.
+`render` repeats one scene, so after the first request it measures the render cache;
+`render-cold` changes the scene on every request to measure actual drawing.
+
+Each scenario reports p50/p95/p99 latency, throughput, the peak Python heap of one
+request (tracemalloc, in-process only) and the process peak RSS after it ran (in-process
+only; monotonic over the run). Results go to benchmarks/results/ as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .loadgen import AsgiTransport, HttpTransport, Scenario, run_scenario, wait_ready
+from .scenes import base_scene_elements
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def build_scenarios(sizes: List[int], cold_requests: int) -> List[Scenario]:
+    scenarios = [
+        Scenario("explore", "GET", "/api/explore?limit=20"),
+        Scenario("explore-count", "GET", "/api/explore/count"),
+        Scenario("mindmap", "GET", "/api/mindmap/benchmark"),
+    ]
+    for size in sizes:
+        elements = base_scene_elements(size)
+        body = json.dumps({"type": "excalidraw", "version": 2, "elements": elements}).encode("utf-8")
+        head, tail = body[:-1], body[-1:]
+
+        def cold(i: int, head: bytes = head, tail: bytes = tail) -> bytes:
+            # One extra element unique to request i changes the render cache key
+            marker = {"id": f"bench-{i}", "type": "rectangle", "x": i, "y": 0, "width": 10, "height": 10}
+            return head[:-1] + b"," + json.dumps(marker).encode("utf-8") + b"]" + tail
+
+        scenarios += [
+            Scenario(f"parse-{size}", "POST", "/api/excalidraw/parse", body),
+            Scenario(f"echo-{size}", "POST", "/api/excalidraw/echo", body),
+            Scenario(f"render-{size}", "POST", "/api/excalidraw/render?format=png", body),
+            Scenario(f"render-cold-{size}", "POST", "/api/excalidraw/render?format=png", cold, requests=cold_requests),
+        ]
+    return scenarios
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    scenarios = [s for s in build_scenarios(args.sizes, args.cold_requests) if re.search(args.only, s.name)]
+    if args.url:
+        transport: Any = HttpTransport(args.url)
+    else:
+        os.environ.setdefault("MAPTOPICS_DB_PATH", ":memory:")
+        import main as app_module
+
+        transport = AsgiTransport(app_module.app)
+
+    results = []
+    async with transport:
+        await wait_ready(transport)
+        print(f"{'scenario':<22} {'req':>5} {'err':>4} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'heap MB':>8} {'rss MB':>8}")
+        for scenario in scenarios:
+            result = await run_scenario(
+                transport,
+                scenario,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+                trace_memory=not args.url,
+            )
+            row = result.to_dict()
+            results.append(row)
+            print(
+                f"{row['scenario']:<22} {row['requests']:>5} {row['errors']:>4} {row['throughputRps']:>9.1f} "
+                f"{row['p50Ms']:>9.2f} {row['p95Ms']:>9.2f} {row['p99Ms']:>9.2f} "
+                f"{_fmt(row['peakAllocMb']):>8} {_fmt(row['peakRssMb']):>8}"
+            )
+    return results
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: Path) -> None:
+    baseline = {row["scenario"]: row for row in json.loads(baseline_path.read_text())["results"]}
+    print(f"\nvs {baseline_path.name} (negative latency / positive throughput change is better)")
+    print(f"{'scenario':<22} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9}")
+    for row in current:
+        before = baseline.get(row["scenario"])
+        if before is None:
+            continue
+        cells = [_change(before[k], row[k]) for k in ("p50Ms", "p95Ms", "p99Ms", "throughputRps")]
+        print(f"{row['scenario']:<22} " + " ".join(f"{c:>9}" for c in cells))
+
+
+def _change(before: Optional[float], after: Optional[float]) -> str:
+    if not before or after is None:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="scene sizes in elements")
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--cold-requests", type=int, default=10, help="requests for the render-cold scenarios")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2, help="uncounted requests before each scenario")
+    parser.add_argument("--only", default="", help="regex: run only matching scenarios")
+    parser.add_argument("--output", type=Path, default=None, help="results file (default: benchmarks/results/endpoints-<time>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    output = args.output or RESULTS_DIR / f"endpoints-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    meta = {
+        "timestamp": stamp,
+        "commit": _git_commit(),
+        "target": args.url or "in-process",
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+    }
+    output.write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+    print(f"\nresults written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
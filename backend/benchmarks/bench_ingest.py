@@ -0,0 +1,93 @@
+"""
+Per-request ingestion cost of a scene: parse + validate + re-serialize (the echo path).
+
+    uv run python -m benchmarks.bench_ingest --nodes 5000 --points 50 --files 20
+
+- dict path: what FastAPI did with `Body(...)`: json.loads, from_raw_scene, then
+  jsonable_encoder + json.dumps of the returned dict.
+- bytes path: ExcalidrawDocument.from_json on the raw body and to_raw_scene_json.
+
+The parse (counts only) section compares a full from_json document with LazyScene, which
+validates elements one at a time and never decodes `files`.
+
+Peak memory is measured with tracemalloc, so it covers Python-heap allocations only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from models import ExcalidrawDocument, LazyScene
+
+from .scenes import synthetic_scene
+
+
+def dict_path(body: bytes) -> bytes:
+    doc = ExcalidrawDocument.from_raw_scene(json.loads(body))
+    return json.dumps(jsonable_encoder(doc.to_raw_scene())).encode("utf-8")
+
+
+def bytes_path(body: bytes) -> bytes:
+    return ExcalidrawDocument.from_json(body).to_raw_scene_json()
+
+
+def full_counts(body: bytes) -> object:
+    doc = ExcalidrawDocument.from_json(body)
+    return len(doc.elements), doc.node_count, doc.edge_count
+
+
+def lazy_counts(body: bytes) -> object:
+    return LazyScene(body).counts(validate=True)
+
+
+def measure(fn: Callable[[bytes], object], body: bytes, repeat: int) -> Tuple[float, float]:
+    """Median latency in seconds and peak traced memory in MiB."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(body)
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(samples), peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--points", type=int, default=50, help="points per arrow")
+    parser.add_argument("--files", type=int, default=20, help="embedded images")
+    parser.add_argument("--file-size", type=int, default=256 * 1024, help="decoded bytes per image")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scene = synthetic_scene(args.nodes, points_per_arrow=args.points, n_files=args.files, file_size=args.file_size)
+    body = json.dumps(scene).encode("utf-8")
+    assert json.loads(dict_path(body)) == json.loads(bytes_path(body))
+
+    print(f"body: {len(body) / (1024 * 1024):.1f} MiB, {len(scene['elements'])} elements")
+    print("echo (parse + serialize):")
+    print(f"{'path':>6} {'median (ms)':>12} {'peak (MiB)':>11}")
+    for name, fn in (("dict", dict_path), ("bytes", bytes_path)):
+        latency, peak = measure(fn, body, args.repeat)
+        print(f"{name:>6} {latency * 1000:>12.1f} {peak:>11.1f}")
+
+    print("parse (counts only):")
+    print(f"{'path':>6} {'median (ms)':>12} {'peak (MiB)':>11}")
+    for name, fn in (("full", full_counts), ("lazy", lazy_counts)):
+        latency, peak = measure(fn, body, args.repeat)
+        print(f"{name:>6} {latency * 1000:>12.1f} {peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Layout time for tree, force-directed and incremental layouts.
+
+    uv run python -m benchmarks.bench_layout --sizes 1000 5000 10000 --repeat 3
+
+The incremental case adds `--new` nodes to an already laid out map and places only those
+(and their neighbors). Times include writing coordinates back into the document.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from graph.layout import layout_document
+from models import ExcalidrawDocument
+
+from .scenes import synthetic_elements
+
+
+def _time(make_doc, run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        doc = make_doc()
+        start = time.perf_counter()
+        run(doc)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--new", type=int, default=20, help="nodes added for the incremental case")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'tree (s)':>9} {'force (s)':>10} {'incremental (s)':>16}")
+    for size in args.sizes:
+        elements = synthetic_elements(size + args.new)
+        new_ids = [f"n{i}" for i in range(size, size + args.new)]
+        # synthetic_elements attaches node i to an earlier node, so the first `size` nodes form a map
+        cut = next(i for i, el in enumerate(elements) if el["id"] == new_ids[0])
+        base = ExcalidrawDocument.from_raw_scene(elements[:cut])
+        layout_document(base, "tree")
+        laid_out = base.to_raw_scene()["elements"] + elements[cut:]
+
+        tree = _time(lambda: ExcalidrawDocument.from_raw_scene(elements[:cut]), lambda d: layout_document(d, "tree"), args.repeat)
+        force = _time(lambda: ExcalidrawDocument.from_raw_scene(elements[:cut]), lambda d: layout_document(d, "force"), args.repeat)
+        incremental = _time(
+            lambda: ExcalidrawDocument.from_raw_scene(laid_out),
+            lambda d: layout_document(d, "force", new_node_ids=new_ids),
+            args.repeat,
+        )
+        print(f"{size:>8} {tree:>9.3f} {force:>10.3f} {incremental:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
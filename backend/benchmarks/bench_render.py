@@ -0,0 +1,81 @@
+"""
+Render time of the batched (collection-based) renderer vs the previous per-artist loop.
+
+    uv run python -m benchmarks.bench_render --sizes 100 1000 10000 --repeat 3
+
+Scenes are synthetic mind maps: a tree of rectangles connected by bound arrows, with a
+fraction of nodes carrying a text label.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import statistics
+import time
+
+from graph.networkx_adapter import excalidraw_to_networkx
+from models import ExcalidrawDocument
+from render.matplotlib_renderer import RenderScene, init_matplotlib, render_scene, scene_from_graph
+
+from .scenes import synthetic_elements
+
+
+def render_scene_per_artist(scene: RenderScene) -> bytes:
+    """The renderer before batching: one Line2D per edge, one Circle and Text per node."""
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Circle
+
+    centers = scene.centers
+    min_x, min_y = centers.min(axis=0)
+    max_x, max_y = centers.max(axis=0)
+    padding = 40.0
+    dpi = 96
+    width_px = max(1.0, (max_x - min_x) + 2 * padding)
+    height_px = max(1.0, (max_y - min_y) + 2 * padding)
+    fig = Figure(figsize=(max(1.0, width_px / dpi), max(1.0, height_px / dpi)), dpi=dpi)
+    ax = fig.add_subplot()
+    ax.set_facecolor("white")
+    ax.axis("off")
+    ax.set_xlim(min_x - padding, max_x + padding)
+    ax.set_ylim(max_y + padding, min_y - padding)
+    for u, v in scene.edges:
+        ax.plot([centers[u][0], centers[v][0]], [centers[u][1], centers[v][1]], color="#999999", linewidth=1.5, alpha=0.9)
+    for i, (x, y) in enumerate(centers):
+        ax.add_patch(Circle((x, y), radius=scene.radii[i], facecolor=scene.fills[i], edgecolor=scene.strokes[i], linewidth=1.5, alpha=0.95))
+        if scene.labels[i]:
+            ax.text(x, y, scene.labels[i], ha="center", va="center", fontsize=8, color="#222222")
+    buf = io.BytesIO()
+    fig.tight_layout(pad=0)
+    fig.savefig(buf, format="png", dpi=dpi, facecolor="white", bbox_inches="tight", pad_inches=0)
+    return buf.getvalue()
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--label-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    init_matplotlib()
+    print(f"{'nodes':>8} {'per-artist (s)':>15} {'batched (s)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        doc = ExcalidrawDocument.from_raw_scene(synthetic_elements(size, args.label_ratio))
+        scene = scene_from_graph(excalidraw_to_networkx(doc))
+        before = _time(lambda: render_scene_per_artist(scene), args.repeat)
+        after = _time(lambda: render_scene(scene), args.repeat)
+        print(f"{size:>8} {before:>15.3f} {after:>12.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Cold-start cost of the API: import time of `main`, and time until a freshly started server
+answers its first request and until it reports ready.
+
+    uv run python -m benchmarks.bench_startup --repeat 5
+
+Every sample runs in a new interpreter. Import time is measured in-process around
+`import main` and broken down with -X importtime; startup times are measured from
+launching uvicorn until /api/health and /api/ready first return 200.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def _env(extra: Dict[str, str]) -> Dict[str, str]:
+    # Keep benchmark runs away from the real database
+    return {**os.environ, "MAPTOPICS_DB_PATH": ":memory:", **extra}
+
+
+def import_time(env: Dict[str, str]) -> float:
+    out = subprocess.run([sys.executable, "-c", _IMPORT_SNIPPET], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: Dict[str, str], top: int) -> List[tuple]:
+    """(cumulative seconds, module) of the slowest top-level imports of `main`, via -X importtime."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if cumulative.strip().isdigit() and name.startswith("   ") and not name.startswith("    "):
+            rows.append((int(cumulative) / 1e6, name.strip()))  # direct imports of main
+    return sorted(rows, reverse=True)[:top]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _status(url: str) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def server_startup(env: Dict[str, str], timeout: float) -> Dict[str, float]:
+    """Seconds from process launch to the first 200 from /api/health and from /api/ready."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    times: Dict[str, float] = {}
+    try:
+        while len(times) < 2 and time.perf_counter() - start < timeout:
+            if "health" not in times and _status(base + "/api/health") == 200:
+                times["health"] = time.perf_counter() - start
+            if "health" in times:
+                ready = _status(base + "/api/ready")
+                if ready in (200, 404):  # builds without a readiness endpoint are ready when they answer
+                    times["ready"] = time.perf_counter() - start if ready == 200 else times["health"]
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait()
+    if len(times) < 2:
+        raise RuntimeError(f"server did not become ready within {timeout:g}s")
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None, help="MAPTOPICS_RENDER_WORKERS for the server (default: its own)")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    env = _env({} if args.workers is None else {"MAPTOPICS_RENDER_WORKERS": str(args.workers)})
+
+    imports = [import_time(env) for _ in range(args.repeat)]
+    print(f"import main: median {statistics.median(imports):.3f}s  min {min(imports):.3f}s")
+    print("slowest direct imports (cumulative):")
+    for seconds, name in slowest_imports(env, args.top):
+        print(f"  {seconds:>7.3f}s  {name}")
+
+    samples = [server_startup(env, args.timeout) for _ in range(args.repeat)]
+    for key, label in (("health", "first response (/api/health)"), ("ready", "ready (/api/ready)")):
+        values = [s[key] for s in samples]
+        print(f"{label:<30} median {statistics.median(values):.3f}s  min {min(values):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
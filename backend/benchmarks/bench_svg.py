@@ -0,0 +1,57 @@
+"""
+SVG export vs the matplotlib raster preview, from the parsed document to the finished bytes.
+
+    uv run python -m benchmarks.bench_svg --sizes 100 1000 10000 --repeat 3
+
+Both sides start from the validated document: the raster side builds its scene with
+scene_from_table and draws a PNG with render_scene, the SVG side builds its own table and
+writes the SVG with SvgRenderer. Each size is measured at full size and as a thumbnail
+(THUMBNAIL_MAX_SIZE on the longer side). Scenes are synthetic mind maps: a tree of
+rectangles connected by bound arrows, with a fraction of nodes carrying a text label.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from models import ElementTable, ExcalidrawDocument
+from render.matplotlib_renderer import THUMBNAIL_MAX_SIZE, init_matplotlib, render_scene, scene_from_table
+from render.svg import render_svg
+
+from .scenes import synthetic_elements
+
+
+def _time(fn, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--label-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    init_matplotlib()
+    print(f"{'nodes':>8} {'variant':>9} {'png (s)':>9} {'svg (s)':>9} {'speedup':>8} {'png KiB':>9} {'svg KiB':>9}")
+    for size in args.sizes:
+        doc = ExcalidrawDocument.from_raw_scene(synthetic_elements(size, args.label_ratio))
+        for variant, max_size in (("full", None), ("thumbnail", THUMBNAIL_MAX_SIZE)):
+            png_s, png = _time(lambda: render_scene(scene_from_table(ElementTable.from_document(doc)), "png", max_size), args.repeat)
+            svg_s, svg = _time(lambda: render_svg(doc, max_size), args.repeat)
+            print(
+                f"{size:>8} {variant:>9} {png_s:>9.3f} {svg_s:>9.3f} {png_s / svg_s:>7.1f}x "
+                f"{len(png.data) / 1024:>9.0f} {len(svg.data) / 1024:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
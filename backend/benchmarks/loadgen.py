@@ -0,0 +1,333 @@
+"""
+Load generation for the endpoint benchmarks: transports, the request loop and statistics.
+
+Two transports drive the same scenarios:
+
+- AsgiTransport calls the ASGI app directly, in this process (no sockets, no server), after
+  running its lifespan startup. It isolates the cost of the application code and allows
+  measuring per-request memory with tracemalloc.
+- HttpTransport speaks HTTP/1.1 over keep-alive connections to a running server (one
+  connection per concurrent client), for end-to-end numbers including uvicorn.
+
+Both only need the standard library.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+Headers = Sequence[Tuple[str, str]]
+# A fixed body, or a function of the request number (e.g. to defeat a cache on purpose)
+Body = Union[bytes, Callable[[int], bytes], None]
+
+
+@dataclass
+class Scenario:
+    """
+    One endpoint call to repeat; `expect` lists the acceptable status codes, and `requests`
+    caps the run's request count (for scenarios too slow to repeat as often as others).
+    """
+
+    name: str
+    method: str
+    path: str
+    body: Body = None
+    headers: Headers = ()
+    expect: Tuple[int, ...] = (200,)
+    requests: Optional[int] = None
+
+    def body_for(self, i: int) -> bytes:
+        if self.body is None:
+            return b""
+        return self.body(i) if callable(self.body) else self.body
+
+
+class AsgiTransport:
+    """Send requests straight into an ASGI app. Use as an async context manager (runs the lifespan)."""
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._lifespan: Optional[asyncio.Task] = None
+        self._lifespan_queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._lifespan_events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def __aenter__(self) -> "AsgiTransport":
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._lifespan = asyncio.create_task(self.app(scope, self._lifespan_queue.get, self._lifespan_events.put))
+        await self._lifespan_queue.put({"type": "lifespan.startup"})
+        message = await self._lifespan_events.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"app failed to start: {message}")
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self._lifespan_queue.put({"type": "lifespan.shutdown"})
+        await self._lifespan_events.get()
+        await self._lifespan
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: Headers = ()) -> Tuple[int, int]:
+        """(status, response body size)."""
+        path, _, query = path.partition("?")
+        raw_headers = [(b"host", b"bench"), (b"content-length", str(len(body)).encode())]
+        raw_headers += [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+            "state": {},
+        }
+        done = asyncio.Event()
+        sent = False
+        status = 0
+        size = 0
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if not message.get("more_body"):
+                    done.set()
+
+        await self.app(scope, receive, send)
+        done.set()
+        return status, size
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpTransport:
+    """
+    Minimal HTTP/1.1 client over asyncio streams. Each concurrent client (`slot`) keeps its
+    own keep-alive connection; handles Content-Length and chunked responses.
+    """
+
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        if parts.scheme != "http":
+            raise ValueError("only http:// URLs are supported")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self._connections: Dict[int, Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = {}
+
+    async def __aenter__(self) -> "HttpTransport":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: Headers = (), slot: int = 0) -> Tuple[int, int]:
+        for attempt in range(2):
+            reader, writer = await self._connection(slot)
+            try:
+                status, size, keep_alive = await self._exchange(reader, writer, method, path, body, headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # The server closed an idle keep-alive connection; reconnect once
+                self._drop(slot)
+                if attempt:
+                    raise
+                continue
+            if not keep_alive:
+                self._drop(slot)
+            return status, size
+        raise AssertionError("unreachable")
+
+    async def close(self) -> None:
+        for slot in list(self._connections):
+            self._drop(slot)
+
+    async def _connection(self, slot: int) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if slot not in self._connections:
+            self._connections[slot] = await asyncio.open_connection(self.host, self.port, limit=1 << 20)
+        return self._connections[slot]
+
+    def _drop(self, slot: int) -> None:
+        connection = self._connections.pop(slot, None)
+        if connection is not None:
+            connection[1].close()
+
+    async def _exchange(self, reader, writer, method, path, body, headers) -> Tuple[int, int, bool]:
+        lines = [f"{method} {self.prefix}{path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        if body:
+            lines.append("Content-Type: application/json")
+        lines += [f"{k}: {v}" for k, v in headers]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        head = await reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        status = int(status_line.split(" ", 2)[1])
+        response_headers = {}
+        for line in header_lines:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                response_headers[key.strip().lower()] = value.strip()
+
+        size = 0
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                chunk_size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await reader.readexactly(chunk_size + 2)
+                size += chunk_size
+                if chunk_size == 0:
+                    break
+        elif method != "HEAD" and status not in (204, 304):
+            size = int(response_headers.get("content-length", 0))
+            await reader.readexactly(size)
+        return status, size, response_headers.get("connection", "").lower() != "close"
+
+
+@dataclass
+class Result:
+    """Latency distribution (milliseconds) and throughput of one scenario run."""
+
+    scenario: str
+    requests: int
+    concurrency: int
+    errors: int
+    seconds: float
+    latencies_ms: List[float] = field(repr=False, default_factory=list)
+    response_bytes: int = 0
+    request_bytes: int = 0
+    peak_alloc_mb: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+        return {
+            "scenario": self.scenario,
+            "requests": self.requests,
+            "concurrency": self.concurrency,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 4),
+            "throughputRps": round(self.requests / self.seconds, 2) if self.seconds else None,
+            "meanMs": round(statistics.fmean(lat), 3) if lat else None,
+            "p50Ms": round(percentile(lat, 50), 3),
+            "p95Ms": round(percentile(lat, 95), 3),
+            "p99Ms": round(percentile(lat, 99), 3),
+            "maxMs": round(lat[-1], 3) if lat else None,
+            "requestBytes": self.request_bytes,
+            "responseBytes": self.response_bytes,
+            "peakAllocMb": self.peak_alloc_mb,
+            "peakRssMb": self.peak_rss_mb,
+        }
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile of already sorted values (NaN when empty)."""
+    if not sorted_values:
+        return math.nan
+    rank = (len(sorted_values) - 1) * q / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def run_scenario(
+    transport: Union[AsgiTransport, HttpTransport],
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int = 1,
+    trace_memory: bool = False,
+) -> Result:
+    """
+    Send `requests` requests with `concurrency` clients, each issuing its next request as
+    soon as the previous one finished (closed loop). `warmup` requests run first and are not
+    counted. With `trace_memory` (in-process only), one extra request runs under
+    tracemalloc to record the peak Python heap allocated while serving it.
+    """
+
+    async def send(i: int, slot: int) -> Tuple[int, int, int]:
+        body = scenario.body_for(i)
+        if isinstance(transport, HttpTransport):
+            status, size = await transport.request(scenario.method, scenario.path, body, scenario.headers, slot=slot)
+        else:
+            status, size = await transport.request(scenario.method, scenario.path, body, scenario.headers)
+        return status, size, len(body)
+
+    for i in range(warmup):
+        await send(-1 - i, 0)
+
+    peak_alloc = None
+    if trace_memory and isinstance(transport, AsgiTransport):
+        tracemalloc.start()
+        try:
+            await send(-1 - warmup, 0)
+            peak_alloc = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+
+    requests = min(requests, scenario.requests or requests)
+    result = Result(scenario=scenario.name, requests=requests, concurrency=concurrency, errors=0, seconds=0.0, peak_alloc_mb=peak_alloc)
+    counter = iter(range(requests))
+
+    async def client(slot: int) -> None:
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                status, size, sent = await send(i, slot)
+            except Exception:
+                result.errors += 1
+                continue
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+            result.response_bytes += size
+            result.request_bytes += sent
+            if status not in scenario.expect:
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(slot) for slot in range(concurrency)))
+    result.seconds = time.perf_counter() - start
+    if isinstance(transport, AsgiTransport):
+        result.peak_rss_mb = peak_rss_mb()
+    return result
+
+
+async def wait_ready(transport: Union[AsgiTransport, HttpTransport], path: str = "/api/ready", timeout: float = 60.0) -> None:
+    """Poll a readiness endpoint until it stops answering 503 (404 counts as ready)."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            status, _ = await transport.request("GET", path)
+        except OSError:
+            status = None
+        if status is not None and status != 503:
+            return
+        await asyncio.sleep(0.05)
+    raise TimeoutError(f"{path} did not report ready within {timeout:g}s")
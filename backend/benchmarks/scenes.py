@@ -0,0 +1,127 @@
+"""Synthetic Excalidraw scenes shared by the benchmarks."""
+
+from __future__ import annotations
+
+import base64
+import copy
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BASE_SCENE_PATH = Path(__file__).resolve().parent.parent / "data" / "excalidraw_base.json"
+
+
+def synthetic_elements(n_nodes: int, label_ratio: float = 0.1, seed: int = 0) -> List[Dict[str, Any]]:
+    """A random tree of `n_nodes` rectangles, each linked to its parent by an arrow."""
+    rng = random.Random(seed)
+    elements: List[Dict[str, Any]] = []
+    for i in range(n_nodes):
+        node: Dict[str, Any] = {
+            "id": f"n{i}",
+            "type": "rectangle",
+            "x": rng.uniform(0, 40 * n_nodes ** 0.5),
+            "y": rng.uniform(0, 40 * n_nodes ** 0.5),
+            "width": rng.uniform(40, 200),
+            "height": rng.uniform(30, 100),
+            "backgroundColor": rng.choice(["#a5d8ff", "#b2f2bb", "#ffec99", "transparent"]),
+            "strokeColor": "#1e1e1e",
+        }
+        if rng.random() < label_ratio:
+            node["text"] = f"Topic {i}"
+        elements.append(node)
+        if i:
+            parent = rng.randrange(i)
+            elements.append({
+                "id": f"a{i}",
+                "type": "arrow",
+                "x": 0,
+                "y": 0,
+                "width": 0,
+                "height": 0,
+                "startBinding": {"elementId": f"n{parent}"},
+                "endBinding": {"elementId": f"n{i}"},
+            })
+    return elements
+
+
+def synthetic_scene(
+    n_nodes: int,
+    label_ratio: float = 0.1,
+    points_per_arrow: int = 2,
+    n_files: int = 0,
+    file_size: int = 64 * 1024,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    A full export dict around synthetic_elements.
+
+    - points_per_arrow: length of each arrow's `points` polyline.
+    - n_files / file_size: embedded images under `files`, as base64 data URLs of roughly
+      `file_size` decoded bytes each (what pasted screenshots look like).
+    """
+    rng = random.Random(seed)
+    elements = synthetic_elements(n_nodes, label_ratio, seed)
+    for el in elements:
+        if el["type"] == "arrow":
+            el["points"] = [[rng.uniform(-200, 200), rng.uniform(-200, 200)] for _ in range(points_per_arrow)]
+
+    files: Dict[str, Any] = {}
+    for i in range(n_files):
+        blob = base64.b64encode(rng.randbytes(file_size)).decode("ascii")
+        files[f"file{i}"] = {
+            "mimeType": "image/png",
+            "id": f"file{i}",
+            "dataURL": f"data:image/png;base64,{blob}",
+            "created": 0,
+        }
+
+    return {
+        "type": "excalidraw",
+        "version": 2,
+        "source": "https://excalidraw.com",
+        "elements": elements,
+        "appState": {"viewBackgroundColor": "#ffffff", "gridSize": None},
+        "files": files,
+    }
+
+
+def base_scene_elements(n_elements: int, path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """
+    At least `n_elements` elements made of copies of the bundled base scene
+    (data/excalidraw_base.json), laid out side by side on a grid.
+
+    Every copy gets its own ids, and the references between elements (bound text,
+    arrow bindings, boundElements, groups, frames) are rewritten to stay within the copy,
+    so the result is a realistic scene of the size under test.
+    """
+    base = json.loads((path or BASE_SCENE_PATH).read_text(encoding="utf-8"))
+    if isinstance(base, dict):
+        base = base.get("elements", [])
+    if not base:
+        raise ValueError("base scene has no elements")
+    xs = [float(el.get("x", 0)) + float(el.get("width", 0)) for el in base]
+    ys = [float(el.get("y", 0)) + float(el.get("height", 0)) for el in base]
+    step_x, step_y = max(xs) - min(el.get("x", 0) for el in base) + 200, max(ys) - min(el.get("y", 0) for el in base) + 200
+    copies = -(-n_elements // len(base))
+    columns = max(1, round(copies ** 0.5))
+
+    elements: List[Dict[str, Any]] = []
+    for k in range(copies):
+        suffix = f"-{k}"
+        dx, dy = (k % columns) * step_x, (k // columns) * step_y
+        for el in copy.deepcopy(base):
+            el["id"] = f"{el['id']}{suffix}"
+            el["x"] = el.get("x", 0) + dx
+            el["y"] = el.get("y", 0) + dy
+            for key in ("containerId", "frameId"):
+                if el.get(key):
+                    el[key] += suffix
+            for key in ("startBinding", "endBinding"):
+                if isinstance(el.get(key), dict) and el[key].get("elementId"):
+                    el[key]["elementId"] += suffix
+            for bound in el.get("boundElements") or []:
+                bound["id"] += suffix
+            el["groupIds"] = [group + suffix for group in el.get("groupIds") or []]
+            elements.append(el)
+    return elements
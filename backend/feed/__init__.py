@@ -0,0 +1,16 @@
+"""Explore feed for MapTopics backend.
+
+Convenience exports:
+    from backend.feed import FeedStore, MOCK_TOPICS
+"""
+
+from .mock_data import MOCK_TOPICS, generate_mock_description, generate_mock_sources
+from .store import FeedStore, InvalidCursor
+
+__all__ = [
+    "MOCK_TOPICS",
+    "generate_mock_description",
+    "generate_mock_sources",
+    "FeedStore",
+    "InvalidCursor",
+]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import random
+from typing import List
+
+from models.explore_models import Source
+
+# Module-level generator used when callers do not pass their own (e.g. a seeded one)
+_DEFAULT_RNG = random.Random()
+
+# Mock data for explore cards - in production this would come from a database
+MOCK_TOPICS = [
+    "Quantum Computing", "Machine Learning", "Climate Change", "Blockchain Technology",
+    "Artificial Intelligence", "Space Exploration", "Renewable Energy", "Biotechnology",
+    "Virtual Reality", "Cybersecurity", "Neural Networks", "Gene Editing",
+    "Sustainable Agriculture", "Ocean Conservation", "Robotics", "Nanotechnology",
+    "Solar Energy", "Electric Vehicles", "Digital Privacy", "Cryptocurrency",
+    "Augmented Reality", "3D Printing", "Smart Cities", "Internet of Things",
+    "Cloud Computing", "Big Data Analytics", "Autonomous Vehicles", "Telemedicine",
+    "Green Technology", "Quantum Physics", "Bioinformatics", "Environmental Science",
+    "Space Technology", "Renewable Resources", "Data Science", "Computer Vision",
+    "Natural Language Processing", "Edge Computing", "Microbiome Research", "Clean Energy",
+    "Precision Medicine", "Smart Agriculture", "Digital Transformation", "Ecosystem Restoration",
+    "Sustainable Development", "Advanced Materials", "Bioengineering", "Quantum Sensors",
+    "Carbon Capture", "Marine Biology", "Atmospheric Science", "Sustainable Transportation"
+]
+
+
+def generate_mock_description(topic: str, rng: random.Random = _DEFAULT_RNG) -> str:
+    """Generate a realistic description for a topic"""
+    descriptions = [
+        f"{topic} represents a groundbreaking field that is revolutionizing how we understand and interact with the world around us. This comprehensive exploration delves into the fundamental principles, cutting-edge research, and practical applications that define this fascinating domain. represents a groundbreaking field that is revolutionizing how we understand and interact with the world around us. This comprehensive exploration delves into the fundamental principles, cutting-edge research, and practical applications that define this fascinating domain.",
+        f"Exploring {topic} reveals a complex landscape of innovation and discovery. From theoretical foundations to real-world implementations, this field continues to push the boundaries of human knowledge and technological capability.",
+        f"The study of {topic} encompasses a wide range of interdisciplinary approaches and methodologies. This topic explores the intersection of science, technology, and society, highlighting key developments and future possibilities.",
+        f"{topic} is at the forefront of modern scientific and technological advancement. This exploration examines current trends, breakthrough discoveries, and the potential impact on various industries and aspects of daily life.",
+        f"Understanding {topic} requires a deep dive into both historical context and contemporary developments. This comprehensive overview covers essential concepts, recent innovations, and emerging challenges in this dynamic field."
+    ]
+    return rng.choice(descriptions)
+
+
+SOURCES_POOL = [
+    Source(title="Wikipedia", url="https://wikipedia.org", favicon="https://wikipedia.org/static/favicon/wikipedia.ico"),
+    Source(title="Nature Journal", url="https://nature.com", favicon=None),
+    Source(title="MIT Technology Review", url="https://technologyreview.com", favicon=None),
+    Source(title="Scientific American", url="https://scientificamerican.com", favicon=None),
+    Source(title="IEEE Spectrum", url="https://spectrum.ieee.org", favicon=None),
+    Source(title="Research Paper Archive", url="https://arxiv.org", favicon=None),
+    Source(title="Google Scholar", url="https://scholar.google.com", favicon=None),
+    Source(title="Academic Database", url="https://example.com", favicon=None),
+    Source(title="Science Direct", url="https://sciencedirect.com", favicon=None),
+    Source(title="PubMed", url="https://pubmed.ncbi.nlm.nih.gov", favicon=None)
+]
+
+
+def generate_mock_sources(topic: str, rng: random.Random = _DEFAULT_RNG) -> List[Source]:
+    """Generate realistic sources for a topic"""
+    return rng.sample(SOURCES_POOL, min(rng.randint(2, 4), len(SOURCES_POOL)))
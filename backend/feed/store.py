@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import random
+from array import array
+from typing import Any, Dict, Iterator, List, Sequence
+
+from models.explore_models import ExploreCard
+
+from .mock_data import generate_mock_description, generate_mock_sources
+
+
+class InvalidCursor(ValueError):
+    """The pagination cursor is malformed or was issued for a different feed version."""
+
+
+class FeedStore:
+    """
+    Precomputed explore feed.
+
+    Every card is generated once at construction (with a seeded RNG, so every worker process
+    builds the identical feed) and serialized to JSON. The serialized cards are kept in one
+    contiguous buffer, comma-separated, with an offsets array marking where each card starts,
+    so a page of `limit` cards is a single O(limit) slice that is already valid JSON.
+
+    - version: content hash of the whole feed; it seeds ETags and is embedded in cursors so
+      a cursor from an older feed is rejected instead of silently skipping or repeating cards.
+    """
+
+    def __init__(self, topics: Sequence[str], variations: int = 3, seed: int = 0):
+        rng = random.Random(seed)
+        total = len(topics) * variations
+        parts: List[bytes] = []
+        for card_index in range(total):
+            # Cycle through topics and add variation
+            topic_index = card_index % len(topics)
+            variation = (card_index // len(topics)) + 1
+
+            base_topic = topics[topic_index]
+            topic = base_topic if variation == 1 else f"{base_topic} (Advanced Concepts)"
+
+            card = ExploreCard(
+                id=card_index + 1,
+                topic=topic,
+                description=generate_mock_description(topic, rng),
+                sources=generate_mock_sources(topic, rng),
+            )
+            parts.append(card.model_dump_json().encode("utf-8"))
+
+        # starts[i] is where card i begins; starts[total] is one past the last card's end + 1,
+        # so card i spans starts[i] : starts[i + 1] - 1 (dropping the separating comma)
+        self._starts = array("Q", [0])
+        for part in parts:
+            self._starts.append(self._starts[-1] + len(part) + 1)
+        self._blob = b",".join(parts)
+        self.total_count = total
+        self.version = hashlib.sha256(self._blob).hexdigest()[:16]
+
+    def clamp(self, offset: int, limit: int) -> range:
+        """Card indexes of the page at offset/limit."""
+        start = min(offset, self.total_count)
+        return range(start, min(start + limit, self.total_count))
+
+    def page_json(self, offset: int, limit: int) -> bytes:
+        """The full ExploreResponse for this page, as JSON bytes."""
+        page = self.clamp(offset, limit)
+        if len(page):
+            cards = self._blob[self._starts[page.start]:self._starts[page.stop] - 1]
+        else:
+            cards = b""
+        has_more = offset + limit < self.total_count
+        next_cursor = self.encode_cursor(page.stop) if has_more else None
+        return (
+            b'{"cards":[' + cards + b"],"
+            + b'"has_more":' + (b"true" if has_more else b"false")
+            + b',"total_count":' + str(self.total_count).encode("ascii")
+            + b',"next_cursor":' + json.dumps(next_cursor).encode("ascii")
+            + b"}"
+        )
+
+    def cards(self) -> Iterator[Dict[str, Any]]:
+        """Every card as a dict, in feed order (for indexing; pages are served from the buffer)."""
+        for i in range(self.total_count):
+            yield json.loads(self._blob[self._starts[i]:self._starts[i + 1] - 1])
+
+    def etag(self, offset: int, limit: int) -> str:
+        page = self.clamp(offset, limit)
+        return f'"{self.version}-{page.start}-{len(page)}"'
+
+    def encode_cursor(self, offset: int) -> str:
+        raw = f"{self.version}:{offset}".encode("ascii")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> int:
+        """Return the offset a cursor points at; raise InvalidCursor if it is not ours."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            version, _, offset = base64.urlsafe_b64decode(padded).decode("ascii").partition(":")
+            value = int(offset)
+        except (ValueError, UnicodeDecodeError):
+            raise InvalidCursor("malformed cursor")
+        if version != self.version:
+            raise InvalidCursor("cursor is from a different feed version")
+        if value < 0:
+            raise InvalidCursor("malformed cursor")
+        return value
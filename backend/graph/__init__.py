@@ -2,8 +2,39 @@
 
 Convenience exports:
     from backend.graph import excalidraw_to_networkx
+    from backend.graph import CSRGraph, GraphCache, SceneGraph, graph_cache_key
+    from backend.graph import layout_document, tree_layout, force_layout
 """
 
+from .analytics import (
+    CENTRALITY_METRICS,
+    GraphCache,
+    GraphTooLarge,
+    SceneGraph,
+    centrality,
+    components,
+    cycles,
+    graph_cache_key,
+    shortest_path,
+)
+from .csr import CSRGraph
+from .layout import LAYOUT_ALGORITHMS, force_layout, layout_document, tree_layout
 from .networkx_adapter import excalidraw_to_networkx
 
-__all__ = ["excalidraw_to_networkx"]
+__all__ = [
+    "excalidraw_to_networkx",
+    "CSRGraph",
+    "SceneGraph",
+    "GraphCache",
+    "GraphTooLarge",
+    "CENTRALITY_METRICS",
+    "graph_cache_key",
+    "centrality",
+    "components",
+    "shortest_path",
+    "cycles",
+    "LAYOUT_ALGORITHMS",
+    "layout_document",
+    "tree_layout",
+    "force_layout",
+]
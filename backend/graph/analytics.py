@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from models import ExcalidrawDocument, LazyScene, binding_target
+
+from .csr import CSRGraph
+
+# Bump whenever graph construction changes so cached graphs are never reused across versions.
+GRAPH_VERSION = 2
+
+# Element fields that determine the graph: moving or restyling elements keeps the cache key.
+_GRAPH_FIELDS = ("id", "type", "isDeleted", "text", "containerId", "startBinding", "endBinding")
+
+CENTRALITY_METRICS = ("degree", "pagerank", "betweenness")
+
+# Betweenness is O(n * m) in NetworkX; beyond this many nodes it is refused.
+BETWEENNESS_MAX_NODES = 2000
+
+
+class GraphTooLarge(ValueError):
+    """The requested analysis is too expensive for a graph of this size."""
+
+
+def graph_cache_key(lazy: LazyScene) -> str:
+    """
+    Content hash of everything that shapes the graph, computed from the raw scene.
+
+    Only ids, types, labels and arrow bindings of non-deleted elements are read, so the key
+    is cheap to compute and survives layout and style edits.
+    """
+    canonical: List[Any] = [GRAPH_VERSION]
+    for el in lazy.iter_elements(_GRAPH_FIELDS):
+        if el.get("isDeleted"):
+            continue
+        if el.get("type") == "arrow":
+            canonical.append(["e", el.get("id"), binding_target(el.get("startBinding")), binding_target(el.get("endBinding"))])
+        else:
+            canonical.append(["n", el.get("id"), el.get("text"), el.get("containerId")])
+    blob = json.dumps(canonical, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class SceneGraph:
+    """
+    A scene's graph, kept in the cache between requests.
+
+    The CSR form answers every query; a NetworkX MultiDiGraph (as built by
+    excalidraw_to_networkx) is only materialized for algorithms that need it.
+    """
+
+    def __init__(self, csr: CSRGraph):
+        self.csr = csr
+        self._nx = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_document(cls, doc: ExcalidrawDocument) -> "SceneGraph":
+        return cls(CSRGraph.from_document(doc))
+
+    def networkx(self):
+        with self._lock:
+            if self._nx is None:
+                import networkx as nx
+
+                G = nx.MultiDiGraph()
+                G.add_nodes_from(self.csr.node_ids)
+                ids = self.csr.node_ids
+                G.add_edges_from((ids[s], ids[t]) for s, t in zip(self.csr.src.tolist(), self.csr.dst.tolist()))
+                self._nx = G
+            return self._nx
+
+
+class GraphCache:
+    """
+    Bounded LRU of SceneGraphs. Thread-safe.
+
+    The same graph may be stored under several keys (e.g. graph_cache_key and a hash of the
+    raw body); each key takes one slot, and every probe counts as a hit or a miss.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._graphs: "OrderedDict[str, SceneGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[SceneGraph]:
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is None:
+                self._stats["misses"] += 1
+                return None
+            self._graphs.move_to_end(key)
+            self._stats["hits"] += 1
+            return graph
+
+    def put(self, key: str, graph: SceneGraph) -> None:
+        with self._lock:
+            self._graphs[key] = graph
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_entries:
+                self._graphs.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._graphs)
+            stats["maxEntries"] = self.max_entries
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRatio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# --- analyses (JSON-ready results) ---
+
+
+def centrality(graph: SceneGraph, metric: str = "degree", top: int = 20) -> Dict[str, Any]:
+    """
+    The `top` nodes by `metric`:
+
+    - degree: in + out degree, normalized by n - 1 (networkx.degree_centrality).
+    - pagerank: PageRank with damping 0.85.
+    - betweenness: normalized betweenness centrality, up to BETWEENNESS_MAX_NODES nodes.
+    """
+    csr = graph.csr
+    n = csr.node_count
+    if metric == "degree":
+        scores = (csr.in_degree() + csr.out_degree()) / max(1, n - 1)
+    elif metric == "pagerank":
+        scores = csr.pagerank()
+    elif metric == "betweenness":
+        if n > BETWEENNESS_MAX_NODES:
+            raise GraphTooLarge(f"betweenness is limited to {BETWEENNESS_MAX_NODES} nodes (graph has {n})")
+        import networkx as nx
+
+        by_id = nx.betweenness_centrality(graph.networkx())
+        scores = np.array([by_id[node_id] for node_id in csr.node_ids], dtype=np.float64)
+    else:
+        raise ValueError(f"unknown centrality metric {metric!r}; expected one of {', '.join(CENTRALITY_METRICS)}")
+
+    top = min(top, n)
+    best = np.argpartition(-scores, top - 1)[:top] if top else np.zeros(0, dtype=np.int64)
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return {
+        "metric": metric,
+        "nodeCount": n,
+        "edgeCount": csr.edge_count,
+        "nodes": [_node(csr, i, score=float(scores[i])) for i in best.tolist()],
+    }
+
+
+def components(graph: SceneGraph, top: int = 10, max_nodes: int = 100) -> Dict[str, Any]:
+    """Weakly connected components: how many, and the `top` largest with up to `max_nodes` ids each."""
+    csr = graph.csr
+    labels = csr.weak_components()
+    roots, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.argsort(-sizes, kind="stable")[:top]
+    members = np.argsort(inverse, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    largest = []
+    for c in order.tolist():
+        nodes = members[starts[c] : starts[c] + min(sizes[c], max_nodes)]
+        largest.append({"size": int(sizes[c]), "nodes": [_node(csr, i) for i in nodes.tolist()]})
+    return {
+        "nodeCount": csr.node_count,
+        "componentCount": len(roots),
+        "isolatedCount": int((sizes == 1).sum()),
+        "components": largest,
+    }
+
+
+def shortest_path(graph: SceneGraph, source: str, target: str, directed: bool = True) -> Dict[str, Any]:
+    """Fewest-hops path between two element ids; `path` is None when there is none."""
+    csr = graph.csr
+    missing = [node_id for node_id in (source, target) if node_id not in csr.index]
+    if missing:
+        raise KeyError(", ".join(missing))
+    path = csr.shortest_path(csr.index[source], csr.index[target], directed=directed)
+    return {
+        "source": source,
+        "target": target,
+        "directed": directed,
+        "length": len(path) - 1 if path is not None else None,
+        "path": [_node(csr, i) for i in path] if path is not None else None,
+    }
+
+
+def cycles(graph: SceneGraph, top: int = 10, max_nodes: int = 100) -> Dict[str, Any]:
+    """Groups of mutually reachable topics (cyclic SCCs), largest first, each with one example cycle."""
+    csr = graph.csr
+    sccs = csr.cyclic_components()
+    return {
+        "hasCycle": bool(sccs),
+        "cyclicComponentCount": len(sccs),
+        "nodesInCycles": sum(len(c) for c in sccs),
+        "components": [
+            {
+                "size": len(c),
+                "nodes": [_node(csr, i) for i in c[:max_nodes]],
+                "cycle": [csr.node_ids[i] for i in csr.find_cycle(c)],
+            }
+            for c in sccs[:top]
+        ],
+    }
+
+
+def _node(csr: CSRGraph, i: int, **extra: Any) -> Dict[str, Any]:
+    return {"id": csr.node_ids[i], "label": csr.labels[i], **extra}
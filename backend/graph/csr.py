@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import ElementTable, ExcalidrawDocument
+
+
+@dataclass
+class CSRGraph:
+    """
+    Compact directed multigraph in compressed sparse row form.
+
+    Nodes are numbered 0..n-1 in document order. Out-neighbors of node i are
+    `dst[indptr[i]:indptr[i + 1]]`, with `src` holding the matching source of every edge,
+    so a graph of tens of thousands of nodes is a handful of int arrays instead of the
+    nested dicts NetworkX keeps per node and edge. Algorithms below are vectorized with
+    numpy where the access pattern allows, and plain O(n + m) loops where it does not.
+
+    - node_ids / labels: Excalidraw element id and text of each node.
+    - src / dst: (m,) edge endpoints, sorted by source.
+    - indptr: (n + 1,) row offsets into src/dst.
+    """
+
+    node_ids: List[str]
+    labels: List[Optional[str]]
+    src: np.ndarray
+    dst: np.ndarray
+    indptr: np.ndarray
+    index: Dict[str, int] = field(init=False, repr=False)
+    _undirected: Optional[Tuple[np.ndarray, np.ndarray]] = field(default=None, init=False, repr=False)
+    _reverse: Optional[Tuple[np.ndarray, np.ndarray]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+
+    @classmethod
+    def from_document(
+        cls,
+        doc: ExcalidrawDocument,
+        include_deleted: bool = False,
+        merge_bound_text: bool = True,
+    ) -> "CSRGraph":
+        """
+        Same nodes and edges as excalidraw_to_networkx: arrows bound to two existing nodes.
+
+        With `merge_bound_text` (the default, as in excalidraw_to_networkx), text bound to a
+        container is the container's label rather than a node of its own, and arrows bound
+        to the text connect to the container.
+        """
+        return cls.from_table(ElementTable.from_document(doc), include_deleted, merge_bound_text)
+
+    @classmethod
+    def from_table(
+        cls,
+        table: ElementTable,
+        include_deleted: bool = False,
+        merge_bound_text: bool = True,
+    ) -> "CSRGraph":
+        """from_document, for a document whose element table is already built."""
+        if merge_bound_text:
+            rows, redirect = table.merged_node_rows(include_deleted)
+        else:
+            rows, redirect = table.node_rows(include_deleted), None
+        _, edges = table.bound_arrows(rows, include_deleted, redirect=redirect)
+        node_ids = [table.ids[i] for i in rows.tolist()]
+        return cls.from_edges(node_ids, table.labels(rows, redirect), edges[:, 0], edges[:, 1])
+
+    @classmethod
+    def from_edges(
+        cls,
+        node_ids: List[str],
+        labels: List[Optional[str]],
+        src: np.ndarray,
+        dst: np.ndarray,
+    ) -> "CSRGraph":
+        indptr, src, dst = _compress(len(node_ids), src, dst)
+        return cls(node_ids=node_ids, labels=labels, src=src, dst=dst, indptr=indptr)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.src)
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.dst, minlength=self.node_count)
+
+    # --- algorithms ---
+
+    def pagerank(self, alpha: float = 0.85, tol: float = 1.0e-6, max_iter: int = 100) -> np.ndarray:
+        """
+        PageRank by power iteration, matching networkx.pagerank on the multigraph (parallel
+        edges add weight, dangling nodes spread their rank uniformly). Each iteration is one
+        bincount over the edge list.
+        """
+        n = self.node_count
+        if n == 0:
+            return np.zeros(0)
+        out = self.out_degree().astype(np.float64)
+        dangling = out == 0
+        inv_out = np.divide(1.0, out, out=np.zeros(n), where=~dangling)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            spread = np.bincount(self.dst, weights=(rank * inv_out)[self.src], minlength=n)
+            new = alpha * spread + (alpha * rank[dangling].sum() + 1.0 - alpha) / n
+            err = np.abs(new - rank).sum()
+            rank = new
+            if err < n * tol:
+                break
+        return rank
+
+    def weak_components(self) -> np.ndarray:
+        """
+        Label every node with a representative of its weakly connected component.
+
+        Union-find over the whole edge list at once: each round hooks the larger of two
+        differing roots onto the smaller, then compresses paths by pointer jumping.
+        """
+        labels = np.arange(self.node_count)
+        u, v = self.src, self.dst
+        while True:
+            lu, lv = labels[u], labels[v]
+            differ = lu != lv
+            if not differ.any():
+                return labels
+            lo = np.minimum(lu[differ], lv[differ])
+            hi = np.maximum(lu[differ], lv[differ])
+            np.minimum.at(labels, hi, lo)
+            while True:
+                jumped = labels[labels]
+                if np.array_equal(jumped, labels):
+                    break
+                labels = jumped
+
+    def shortest_path(self, source: int, target: int, directed: bool = True) -> Optional[List[int]]:
+        """Fewest-hops path from `source` to `target` (node indices), or None if unreachable."""
+        indptr, neighbors = (self.indptr, self.dst) if directed else self.undirected_csr()
+        parent = np.full(self.node_count, -1, dtype=np.int64)
+        parent[source] = source
+        frontier = np.array([source], dtype=np.int64)
+        # Level-synchronous BFS: a whole frontier is expanded with array operations
+        while frontier.size and parent[target] < 0:
+            nbrs, origin = _expand(indptr, neighbors, frontier)
+            fresh = parent[nbrs] < 0
+            nbrs, first = np.unique(nbrs[fresh], return_index=True)
+            parent[nbrs] = origin[fresh][first]
+            frontier = nbrs
+        if parent[target] < 0:
+            return None
+        path = [target]
+        while path[-1] != source:
+            path.append(int(parent[path[-1]]))
+        return path[::-1]
+
+    def bfs_forest(self, roots: np.ndarray, directed: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Breadth-first search from all `roots` at once.
+
+        Returns (parent, depth): roots are their own parent at depth 0, unreached nodes
+        have parent -1 and depth -1. Each node is claimed by the first root to reach it.
+        """
+        indptr, neighbors = (self.indptr, self.dst) if directed else self.undirected_csr()
+        parent = np.full(self.node_count, -1, dtype=np.int64)
+        depth = np.full(self.node_count, -1, dtype=np.int64)
+        frontier = np.asarray(roots, dtype=np.int64)
+        parent[frontier] = frontier
+        depth[frontier] = 0
+        level = 0
+        while frontier.size:
+            level += 1
+            nbrs, origin = _expand(indptr, neighbors, frontier)
+            fresh = parent[nbrs] < 0
+            nbrs, first = np.unique(nbrs[fresh], return_index=True)
+            parent[nbrs] = origin[fresh][first]
+            depth[nbrs] = level
+            frontier = nbrs
+        return parent, depth
+
+    def cyclic_components(self) -> List[List[int]]:
+        """
+        Strongly connected components that contain a cycle (more than one node, or a
+        self-loop), largest first.
+
+        Nodes with no incoming or no outgoing edge cannot be on a cycle, so they are peeled
+        away first; on a mostly tree-shaped mind map this leaves little or nothing for the
+        SCC search.
+        """
+        n = self.node_count
+        rev_indptr, rev_neighbors = self.reverse_csr()
+        out_nbrs = self.dst.tolist()
+        in_nbrs = rev_neighbors.tolist()
+        indptr = self.indptr.tolist()
+        rev_ptr = rev_indptr.tolist()
+        indeg = self.in_degree().tolist()
+        outdeg = self.out_degree().tolist()
+
+        removed = [False] * n
+        stack = [i for i in range(n) if indeg[i] == 0 or outdeg[i] == 0]
+        while stack:
+            v = stack.pop()
+            if removed[v]:
+                continue
+            removed[v] = True
+            for w in out_nbrs[indptr[v] : indptr[v + 1]]:
+                indeg[w] -= 1
+                if indeg[w] == 0 and not removed[w]:
+                    stack.append(w)
+            for u in in_nbrs[rev_ptr[v] : rev_ptr[v + 1]]:
+                outdeg[u] -= 1
+                if outdeg[u] == 0 and not removed[u]:
+                    stack.append(u)
+
+        core = [i for i in range(n) if not removed[i]]
+        if not core:
+            return []
+        self_loops = set(self.src[self.src == self.dst].tolist())
+        sccs = _tarjan(core, removed, out_nbrs, indptr)
+        cyclic = [c for c in sccs if len(c) > 1 or c[0] in self_loops]
+        cyclic.sort(key=len, reverse=True)
+        return cyclic
+
+    def find_cycle(self, component: List[int]) -> List[int]:
+        """Shortest directed cycle through the first node of a strongly connected `component`."""
+        members = set(component)
+        start = component[0]
+        parent: Dict[int, int] = {}
+        frontier = [start]
+        while frontier:
+            nxt = []
+            for v in frontier:
+                for w in self.dst[self.indptr[v] : self.indptr[v + 1]].tolist():
+                    if w == start:
+                        cycle = [v]
+                        while cycle[-1] != start:
+                            cycle.append(parent[cycle[-1]])
+                        return cycle[::-1]
+                    if w in members and w not in parent:
+                        parent[w] = v
+                        nxt.append(w)
+            frontier = nxt
+        return []
+
+    # --- adjacency views ---
+
+    def undirected_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(indptr, neighbors) with every edge in both directions; built once and kept."""
+        if self._undirected is None:
+            both_src = np.concatenate([self.src, self.dst])
+            both_dst = np.concatenate([self.dst, self.src])
+            indptr, _, neighbors = _compress(self.node_count, both_src, both_dst)
+            self._undirected = (indptr, neighbors)
+        return self._undirected
+
+    def reverse_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(indptr, neighbors) of in-edges; built once and kept."""
+        if self._reverse is None:
+            indptr, _, neighbors = _compress(self.node_count, self.dst, self.src)
+            self._reverse = (indptr, neighbors)
+        return self._reverse
+
+
+def _compress(n: int, src: np.ndarray, dst: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sort edges by source and build the row offsets."""
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, src[order], dst[order]
+
+
+def _expand(indptr: np.ndarray, neighbors: np.ndarray, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """All neighbors of the frontier nodes, plus the frontier node each one came from."""
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    # Position of every neighbor: its row start plus its rank within the row
+    offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return neighbors[offsets + np.arange(total)], np.repeat(frontier, counts)
+
+
+def _tarjan(nodes: List[int], removed: List[bool], out_nbrs: List[int], indptr: List[int]) -> List[List[int]]:
+    """Iterative Tarjan SCC over `nodes`, ignoring edges into removed nodes."""
+    index: Dict[int, int] = {}
+    low: Dict[int, int] = {}
+    on_stack = set()
+    stack: List[int] = []
+    result: List[List[int]] = []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        # Each frame: (node, position of the next out-edge to look at)
+        work = [(root, indptr[root])]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            v, i = work[-1]
+            end = indptr[v + 1]
+            while i < end and (removed[out_nbrs[i]] or (out_nbrs[i] in index and out_nbrs[i] not in on_stack)):
+                i += 1
+            if i < end:
+                w = out_nbrs[i]
+                work[-1] = (v, i + 1)
+                if w in index:  # on the stack: a back edge
+                    low[v] = min(low[v], index[w])
+                else:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, indptr[w]))
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    component.append(w)
+                    if w == v:
+                        break
+                result.append(component)
+    return result
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from models import Edge, ElementTable, ExcalidrawDocument, Node
+
+from .csr import CSRGraph
+
+LAYOUT_ALGORITHMS = ("force", "tree")
+
+# Space kept between neighboring boxes, in scene units.
+NODE_GAP = 60.0
+# Nodes each node is repelled from per force iteration (a random sample, rescaled to n).
+REPULSION_SAMPLE = 128
+# Pull toward the centroid, per unit of distance.
+GRAVITY = 0.05
+
+
+def tree_layout(csr: CSRGraph, sizes: np.ndarray, gap_x: float = 2 * NODE_GAP, gap_y: float = NODE_GAP / 2) -> np.ndarray:
+    """
+    Left-to-right mind-map tree: one root per connected component, depth as columns, and
+    every subtree given a vertical band as tall as its leaves need.
+
+    The spanning tree is a BFS forest over the undirected graph. Roots are the highest-degree
+    node without incoming arrows in each component. Bands are computed one depth level at a
+    time with array operations, bottom-up for sizes and top-down for offsets.
+
+    `sizes` is (n, 2) width/height; returns (n, 2) box centers.
+    """
+    n = csr.node_count
+    if n == 0:
+        return np.zeros((0, 2))
+    width, height = sizes[:, 0], sizes[:, 1]
+
+    # Root per weakly connected component: prefer sources, then degree
+    comp = csr.weak_components()
+    indeg = csr.in_degree()
+    degree = indeg + csr.out_degree()
+    order = np.lexsort((-degree, indeg != 0, comp))
+    roots = order[np.r_[True, comp[order][1:] != comp[order][:-1]]]
+    parent, depth = csr.bfs_forest(roots)
+    levels = [np.flatnonzero(depth == d) for d in range(int(depth.max()) + 1)]
+
+    # Bottom-up: band height = max(own height, sum of the children's bands)
+    band = height + gap_y
+    children_total = np.zeros(n)
+    for nodes in reversed(levels[1:]):
+        sums = np.bincount(parent[nodes], weights=band[nodes], minlength=n)
+        parents = np.unique(parent[nodes])
+        children_total[parents] = sums[parents]
+        band[parents] = np.maximum(band[parents], sums[parents])
+
+    # Top-down: roots stacked, children stacked inside their parent's band in document order
+    top = np.zeros(n)
+    top[levels[0]] = np.cumsum(band[levels[0]]) - band[levels[0]]
+    for nodes in levels[1:]:
+        nodes = nodes[np.lexsort((nodes, top[parent[nodes]]))]
+        par = parent[nodes]
+        before = np.cumsum(band[nodes]) - band[nodes]
+        group_first = np.maximum.accumulate(np.where(np.r_[True, par[1:] != par[:-1]], np.arange(len(nodes)), 0))
+        top[nodes] = top[par] + (band[par] - children_total[par]) / 2 + before - before[group_first]
+
+    # Columns as wide as their widest box
+    col_width = np.array([width[nodes].max() for nodes in levels])
+    col_left = np.concatenate([[0.0], np.cumsum(col_width + gap_x)[:-1]])
+    centers = np.empty((n, 2))
+    centers[:, 0] = col_left[depth] + col_width[depth] / 2
+    centers[:, 1] = top + band / 2
+    return centers
+
+
+def force_layout(
+    csr: CSRGraph,
+    sizes: np.ndarray,
+    initial: np.ndarray,
+    movable: Optional[np.ndarray] = None,
+    iterations: int = 50,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Fruchterman-Reingold force-directed layout, vectorized over all nodes.
+
+    Springs pull along edges; repulsion is computed against a random sample of
+    REPULSION_SAMPLE nodes per iteration, rescaled to the full node count, so an iteration
+    costs O(n * sample + m) instead of O(n^2). A weak pull to the centroid keeps
+    disconnected parts from drifting apart. The ideal edge length follows the box sizes.
+
+    `initial` is (n, 2) starting centers. Only nodes where `movable` is set are moved; the
+    others still attract and repel them. Returns (n, 2) centers.
+    """
+    n = csr.node_count
+    pos = np.array(initial, dtype=np.float64)
+    if n < 2 or iterations <= 0:
+        return pos
+    if movable is None:
+        movable = np.ones(n, dtype=bool)
+    rng = np.random.default_rng(seed)
+    k = float(np.median(np.hypot(sizes[:, 0], sizes[:, 1]))) + NODE_GAP
+    src, dst = csr.src, csr.dst
+    loops = src != dst
+    src, dst = src[loops], dst[loops]
+    sample_size = min(n, REPULSION_SAMPLE)
+    scale = n / sample_size
+
+    # Start hot enough to untangle the moving part, cool linearly to nothing
+    spread = np.ptp(pos[movable], axis=0).max() if movable.any() else 0.0
+    temperature = max(spread, k * np.sqrt(movable.sum())) / 10
+    cooling = temperature / (iterations + 1)
+
+    # Only rows for moving nodes are computed; pinned nodes still act on them
+    active = np.flatnonzero(movable)
+    # float32 halves the memory traffic of the (active x sample) blocks; precision is ample
+    x = pos[:, 0].astype(np.float32)
+    y = pos[:, 1].astype(np.float32)
+    for _ in range(iterations):
+        sample = rng.choice(n, sample_size, replace=False) if sample_size < n else np.arange(n)
+        dx = x[active, None] - x[None, sample]  # (a, s)
+        dy = y[active, None] - y[None, sample]
+        dist2 = dx * dx + dy * dy
+        dist2[dist2 < 1e-9] = np.inf  # self and coincident pairs
+        inv = np.float32(scale * k * k) / dist2
+        fx = (dx * inv).sum(axis=1)
+        fy = (dy * inv).sum(axis=1)
+
+        if len(src):
+            ex = x[src] - x[dst]
+            ey = y[src] - y[dst]
+            dist = np.hypot(ex, ey) / k
+            ex *= dist
+            ey *= dist
+            fx += (np.bincount(dst, ex, n) - np.bincount(src, ex, n))[active]
+            fy += (np.bincount(dst, ey, n) - np.bincount(src, ey, n))[active]
+
+        cx, cy = x.mean(), y.mean()
+        fx += GRAVITY * (cx - x[active])
+        fy += GRAVITY * (cy - y[active])
+
+        length = np.maximum(np.hypot(fx, fy), 1e-9)
+        step = np.minimum(length, temperature) / length
+        x[active] += fx * step
+        y[active] += fy * step
+        temperature -= cooling
+    pos[:, 0], pos[:, 1] = x, y
+    return pos
+
+
+def layout_document(
+    doc: ExcalidrawDocument,
+    algorithm: str = "force",
+    new_node_ids: Optional[Iterable[str]] = None,
+    iterations: int = 50,
+    seed: int = 0,
+) -> int:
+    """
+    Lay out the scene's graph and write the new coordinates back into `doc`, in place.
+
+    Nodes are the non-deleted, non-arrow elements (text bound to a container moves with its
+    container). `tree` places everything from scratch. `force` starts from the tree layout
+    and relaxes it; with `new_node_ids` it runs incrementally instead: everything keeps its
+    position except the new nodes and their direct neighbors, and new nodes start next to
+    their already placed neighbors.
+
+    Arrows touching a moved node are redrawn as straight lines between the bound boxes;
+    deleted elements are left alone. Every changed element gets a version bump, so delta sync picks the changes up. Returns
+    the number of moved nodes.
+    """
+    if algorithm not in LAYOUT_ALGORITHMS:
+        raise ValueError(f"unknown layout {algorithm!r}; expected one of {', '.join(LAYOUT_ALGORITHMS)}")
+    table = ElementTable.from_document(doc)
+    csr = CSRGraph.from_table(table)
+    n = csr.node_count
+    if n == 0:
+        return 0
+    by_id: Dict[str, Node] = {node.id: node for node in doc.nodes if not node.isDeleted}
+    rows, _ = table.merged_node_rows()  # csr node i is element row rows[i]
+    boxes = np.stack([table.x[rows], table.y[rows], table.width[rows], table.height[rows]], axis=1)
+    sizes = np.maximum(np.abs(boxes[:, 2:]), 1.0)
+    current = boxes[:, :2] + boxes[:, 2:] / 2
+
+    if new_node_ids is not None:
+        fresh = np.zeros(n, dtype=bool)
+        fresh[[csr.index[i] for i in new_node_ids if i in csr.index]] = True
+        if not fresh.any():
+            return 0
+        indptr, neighbors = csr.undirected_csr()
+        movable = fresh.copy()
+        for i in np.flatnonzero(fresh):
+            movable[neighbors[indptr[i] : indptr[i + 1]]] = True
+        initial = _place_new_nodes(csr, current, sizes, fresh, seed)
+        centers = force_layout(csr, sizes, initial, movable=movable, iterations=iterations, seed=seed)
+    else:
+        centers = tree_layout(csr, sizes)
+        if algorithm == "force":
+            centers = force_layout(csr, sizes, centers, iterations=iterations, seed=seed)
+        # Anchor the new layout where the old one was, so the map stays in view
+        centers += current.min(axis=0) - centers.min(axis=0)
+
+    moved = np.flatnonzero(np.any(np.abs(centers - current) > 0.5, axis=1))
+    _write_back(doc, csr, by_id, centers - current, moved)
+    return len(moved)
+
+
+def _place_new_nodes(csr: CSRGraph, centers: np.ndarray, sizes: np.ndarray, fresh: np.ndarray, seed: int) -> np.ndarray:
+    """Start each new node at the centroid of its placed neighbors, or right of the map if it has none."""
+    rng = np.random.default_rng(seed)
+    pos = centers.copy()
+    placed = ~fresh
+    indptr, neighbors = csr.undirected_csr()
+    right = centers[placed, 0].max() + sizes[placed, 0].max() + NODE_GAP if placed.any() else 0.0
+    middle = centers[placed, 1].mean() if placed.any() else 0.0
+    for i in np.flatnonzero(fresh):
+        anchors = neighbors[indptr[i] : indptr[i + 1]]
+        anchors = anchors[placed[anchors]]
+        base = pos[anchors].mean(axis=0) if anchors.size else np.array([right, middle])
+        pos[i] = base + rng.normal(scale=sizes[i].max() + NODE_GAP, size=2)
+    return pos
+
+
+def _write_back(
+    doc: ExcalidrawDocument,
+    csr: CSRGraph,
+    by_id: Dict[str, Node],
+    delta: np.ndarray,
+    moved: np.ndarray,
+) -> None:
+    now = int(time.time() * 1000)
+    shift: Dict[str, Tuple[float, float]] = {csr.node_ids[i]: (float(delta[i, 0]), float(delta[i, 1])) for i in moved}
+    # Deleted elements keep their last state: moving them would only churn their versions
+    for node in doc.nodes:
+        if node.isDeleted:
+            continue
+        d = shift.get(node.id) or shift.get(node.containerId or "")
+        if d is not None:
+            node.x += d[0]
+            node.y += d[1]
+            _touch(node, now)
+
+    for edge in doc.edges:
+        if edge.isDeleted:
+            continue
+        start = edge.startBinding.elementId if edge.startBinding else None
+        end = edge.endBinding.elementId if edge.endBinding else None
+        if start not in shift and end not in shift:
+            continue
+        _reroute(edge, by_id.get(start), by_id.get(end))
+        _touch(edge, now)
+
+
+def _reroute(edge: Edge, start: Optional[Node], end: Optional[Node]) -> None:
+    """Redraw an arrow as a straight line from box edge to box edge (unbound ends stay put)."""
+    points = edge.points or [(0.0, 0.0)]
+    ax, ay = edge.x + points[0][0], edge.y + points[0][1]
+    bx, by = edge.x + points[-1][0], edge.y + points[-1][1]
+    # Aim from center to center; an unbound end aims from where it is
+    ca = _center(start) if start is not None else (ax, ay)
+    cb = _center(end) if end is not None else (bx, by)
+    if start is not None:
+        ax, ay = _box_exit(start, ca, cb, edge.startBinding.gap)
+    if end is not None:
+        bx, by = _box_exit(end, cb, ca, edge.endBinding.gap)
+    edge.x, edge.y = ax, ay
+    dx, dy = bx - ax, by - ay
+    edge.points = [(0.0, 0.0), (dx, dy)]
+    edge.width, edge.height = abs(dx), abs(dy)
+    # A two-point route is not a valid elbow route
+    if edge.elbowed:
+        edge.elbowed = False
+    edge.fixedSegments = None
+
+
+def _center(node: Node) -> Tuple[float, float]:
+    return node.x + node.width / 2, node.y + node.height / 2
+
+
+def _box_exit(node: Node, center: Tuple[float, float], toward: Tuple[float, float], gap: Optional[float]) -> Tuple[float, float]:
+    """Where the ray from `center` to `toward` leaves the node's box, plus the binding gap."""
+    dx, dy = toward[0] - center[0], toward[1] - center[1]
+    length = math.hypot(dx, dy)
+    if length < 1e-9:
+        return center
+    dx, dy = dx / length, dy / length
+    t = min(
+        abs(node.width) / 2 / abs(dx) if dx else math.inf,
+        abs(node.height) / 2 / abs(dy) if dy else math.inf,
+    )
+    t += gap if gap is not None else 4.0
+    return center[0] + dx * t, center[1] + dy * t
+
+
+def _touch(el, now: int) -> None:
+    el.version = (el.version or 0) + 1
+    el.versionNonce = random.randrange(1, 2**31)
+    el.updated = now
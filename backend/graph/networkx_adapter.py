@@ -1,6 +1,10 @@
 from __future__ import annotations
-from typing import List, Optional
-from models import ExcalidrawDocument, Node
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from models import ElementTable, ExcalidrawDocument, SceneRelations
+
 
 def excalidraw_to_networkx(
     doc: ExcalidrawDocument,
@@ -10,6 +14,8 @@ def excalidraw_to_networkx(
     include_deleted: bool = False,
     node_attr_fields: Optional[List[str]] = None,
     edge_attr_fields: Optional[List[str]] = None,
+    merge_bound_text: bool = True,
+    collapse_groups: bool = False,
 ):
     """
     Convert an ExcalidrawDocument into a NetworkX graph.
@@ -18,6 +24,11 @@ def excalidraw_to_networkx(
     - allow_multi: use a Multi(Graph/DiGraph) to allow parallel edges between the same nodes.
     - node_attr_fields / edge_attr_fields: optional whitelists of attributes to include on nodes/edges.
     - include_deleted: include elements with isDeleted==True. Otherwise they are skipped.
+    - merge_bound_text: text bound to a container (containerId) is not a node of its own but
+      the `text` of its container node (or of its arrow, for arrow labels).
+    - collapse_groups: every grouped element is replaced by one node per outermost group,
+      keyed by the group id, with the members' bounding box, their labels joined, and the
+      member ids under `members`; arrows between members of one group are dropped.
     """
     try:
         import networkx as nx
@@ -65,46 +76,70 @@ def excalidraw_to_networkx(
             "strokeWidth",
             "elbowed",
             "opacity",
+            "text",
         ]
 
-    # Add nodes: all non-arrow elements
-    for el in doc.elements:
-        if el.type == "arrow":
-            continue
-        if not include_deleted and getattr(el, "isDeleted", False):
-            continue
-        n = Node(**el.model_dump())
-        attrs_full = n.model_dump(exclude_none=True)
-        attrs = {k: v for k, v in attrs_full.items() if k in node_attr_fields}
-        attrs["_excalidraw_kind"] = "node"
-        G.add_node(n.id, **attrs)
+    node_include = set(node_attr_fields)
+    edge_include = set(edge_attr_fields)
 
-    # Add edges: arrows with both bindings
-    for e in doc.edges:
-        if not include_deleted and getattr(e, "isDeleted", False):
-            continue
-        sid = e.startBinding.elementId if e.startBinding else None
-        tid = e.endBinding.elementId if e.endBinding else None
-        if not sid or not tid:
-            continue
-        if sid not in G.nodes or tid not in G.nodes:
+    # Which elements become nodes and which arrows connect two of them is decided on the
+    # element table; only the chosen elements are read as models, for their attributes.
+    table = ElementTable.from_document(doc)
+    relations = SceneRelations.from_document(doc, include_deleted)
+    elements = doc.elements
+    if merge_bound_text:
+        # Bound text becomes its container's label; arrows bound to it bind to the container
+        node_rows, redirect = table.merged_node_rows(include_deleted)
+    else:
+        node_rows, redirect = table.node_rows(include_deleted), None
+    rows = node_rows.tolist()
+
+    # Graph node of each node row: the element itself, or its outermost group when collapsing
+    node_keys: List[str] = []
+    groups: Dict[str, List[int]] = {}
+    for i in rows:
+        element_id = table.ids[i]
+        group_id = relations.outermost_group(element_id) if collapse_groups else None
+        if group_id is not None:
+            groups.setdefault(group_id, []).append(i)
+            node_keys.append(group_id)
             continue
+        attrs = elements[i].model_dump(include=node_include, exclude_none=True)
+        if merge_bound_text and "text" in node_include and "text" not in attrs:
+            label = relations.label(element_id)
+            if label:
+                attrs["text"] = label
+        attrs["_excalidraw_kind"] = "node"
+        G.add_node(element_id, **attrs)
+        node_keys.append(element_id)
+    if groups:
+        bounds = table.bounds()
+        for group_id, members in groups.items():
+            G.add_node(group_id, **_group_attrs(group_id, members, table, bounds, relations, node_include))
 
-        attrs_full = e.model_dump(exclude_none=True)
-        attrs = {k: v for k, v in attrs_full.items() if k in edge_attr_fields}
+    # Add edges: arrows bound at both ends to a node
+    arrow_rows, pairs = table.bound_arrows(node_rows, include_deleted, redirect)
+    multi = allow_multi and G.is_multigraph()
+    for i, (s, t) in zip(arrow_rows.tolist(), pairs.tolist()):
+        sid, tid = node_keys[s], node_keys[t]
+        if sid == tid and sid in groups:
+            continue  # connects two members of one collapsed group
+        e = elements[i]
+        attrs = e.model_dump(include=edge_include, exclude_none=True)
+        if merge_bound_text and "text" in edge_include:
+            label = relations.label(e.id)
+            if label:
+                attrs["text"] = label
         attrs["_excalidraw_kind"] = "edge"
 
-        if hasattr(G, "add_edge"):
+        if multi:
             # Multi-graphs: use edge id as key
-            if allow_multi and (G.is_multigraph() if hasattr(G, "is_multigraph") else True):
-                G.add_edge(sid, tid, key=e.id, **attrs)
-            else:
-                # Simple graphs: accumulate weight
-                if G.has_edge(sid, tid):
-                    current_w = G[sid][tid].get("weight", 1)
-                    G[sid][tid]["weight"] = current_w + 1
-                else:
-                    G.add_edge(sid, tid, weight=1, **attrs)
+            G.add_edge(sid, tid, key=e.id, **attrs)
+        elif G.has_edge(sid, tid):
+            # Simple graphs: accumulate weight
+            G[sid][tid]["weight"] = G[sid][tid].get("weight", 1) + 1
+        else:
+            G.add_edge(sid, tid, weight=1, **attrs)
 
     G.graph.setdefault("excalidraw", {})
     G.graph["excalidraw"]["elementCount"] = {
@@ -112,3 +147,32 @@ def excalidraw_to_networkx(
         "edges": G.number_of_edges(),
     }
     return G
+
+
+def _group_attrs(
+    group_id: str,
+    member_rows: List[int],
+    table: ElementTable,
+    bounds: np.ndarray,
+    relations: SceneRelations,
+    include: Set[str],
+) -> Dict[str, Any]:
+    """Attributes of a collapsed group's super-node: the box around its members and their labels."""
+    box = bounds[member_rows]
+    min_x, min_y = box[:, :2].min(axis=0)
+    max_x, max_y = box[:, 2:].max(axis=0)
+    attrs: Dict[str, Any] = {
+        "id": group_id,
+        "type": "group",
+        "x": float(min_x),
+        "y": float(min_y),
+        "width": float(max_x - min_x),
+        "height": float(max_y - min_y),
+    }
+    labels = [relations.label(table.ids[i]) for i in member_rows]
+    if any(labels):
+        attrs["text"] = "\n".join(label for label in labels if label)
+    attrs = {k: v for k, v in attrs.items() if k in include}
+    attrs["members"] = [table.ids[i] for i in member_rows]
+    attrs["_excalidraw_kind"] = "group"
+    return attrs
@@ -1,96 +1,131 @@
-from fastapi import FastAPI, Query, HTTPException, Body
+from fastapi import BackgroundTasks, Depends, FastAPI, Query, HTTPException, Request, Response
+from fastapi import Path as PathParam
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional, Union
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+from pydantic import BaseModel, ValidationError
 import asyncio
 import math
 import json
-from pathlib import Path
+import tempfile
 from models.excalidraw_models import ExcalidrawDocument
-from graph.networkx_adapter import excalidraw_to_networkx
-import io
+from models.lazy_scene import LazyScene, SceneFormatError
+from models.sync_models import SyncRequest
+from models.spatial import SceneSpatialIndex
+from models.columnar import ElementTable
+from models.explore_models import ExploreResponse
+from batch import BatchFormatError, BatchOptions, SceneOutcome, fan_out, process_scene, scene_items
+from feed import MOCK_TOPICS, FeedStore, InvalidCursor
+from graph import analytics
+from graph.analytics import GraphCache, GraphTooLarge, SceneGraph, graph_cache_key
+from graph.layout import LAYOUT_ALGORITHMS, layout_document
+from render.cache import RenderCache, RenderResult, render_cache_key, render_variant_key
+from render.matplotlib_renderer import (
+    IMAGE_FORMATS,
+    THUMBNAIL_MAX_SIZE,
+    RenderScene,
+    init_matplotlib,
+    render_scene,
+    scene_from_table,
+)
+from render.pool import RenderPool, RenderPoolBusy, RenderTimeout
+from render.svg import SvgRenderer, svg_cache_key
+from render.tiles import MAX_ZOOM, MIN_ZOOM, TILE_SIZE, TileSet, TileSetCache, render_tile
+from web.compression import CompressedBodyCache, CompressionMiddleware
+from web.conditional import etag_matches
+from web.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from web.metrics import SIZE_BUCKETS, MetricsMiddleware, MetricsRegistry, StageTimer
+from web.profiling import SlowRequestProfiler
+from web.startup import Warmup
+from web.streaming import DuplexStreamingResponse, request_chunks
+from search import (
+    SEARCH_KINDS,
+    SearchIndex,
+    index_feed,
+    index_mindmap,
+    index_store,
+    index_stored_mindmap,
+    index_topics,
+    mindmap_doc_id,
+    update_mindmap_elements,
+)
+from templates import DEFAULT_TEMPLATE, TemplateRegistry, UnknownTemplate
+from storage import MindMapStore, RevisionMismatch, SQLiteMindMapStore, element_records
+from settings import Settings, get_settings
 import base64
+import hashlib
 
-app = FastAPI()
 
-# --- CORS (Cross-Origin Resource Sharing) ---
-# Allow React frontend to make requests to this backend
-origins = [
-    "http://localhost:5173", # The default Vite dev server port
-    "http://127.0.0.1:5173",
-]
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start accepting requests right away and warm up in the background (see /api/ready);
+    # tear the render workers and the database pool down on shutdown
+    warmup.start()
+    yield
+    render_pool.shutdown()
+    mindmap_store.close()
+
 
+# Deployment knobs (MAPTOPICS_* environment variables or backend/.env), loaded once. The
+# objects built below at import (middleware, pools, caches, store) are sized from these;
+# endpoints read their request-time knobs through Depends(get_settings) instead.
+settings = get_settings()
+
+app = FastAPI(lifespan=lifespan)
+
+# --- CORS (Cross-Origin Resource Sharing) ---
+# Allow React frontend to make requests to this backend; the default origins are the Vite
+# dev server (port 5173), MAPTOPICS_CORS_ORIGINS lists others
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins,
+    allow_origins=list(settings.cors_origins),
     allow_credentials=True,
     allow_methods=["*"], # Allows all methods (GET, POST, etc.)
     allow_headers=["*"], # Allows all headers
 )
 # --- End of CORS Setup ---
 
-# Pydantic models for API responses
-class Source(BaseModel):
-    title: str
-    url: str
-    favicon: Optional[str] = None
+# --- Metrics (exported on /metrics) ---
+# Per-route request counts, latency and in-flight requests come from the middleware; stage()
+# times the steps inside a request (parse, graph, draw, encode...). Setting
+# MAPTOPICS_PROFILE_SLOW_MS turns on a sampling profiler that writes a flamegraph for every
+# request at least that slow.
+metrics = MetricsRegistry()
+stage = StageTimer(
+    metrics.histogram("maptopics_stage_duration_seconds", "Time spent in each stage of request handling", ("stage",))
+)
+scene_elements = metrics.histogram("maptopics_scene_elements", "Elements per scene request body", buckets=SIZE_BUCKETS)
+scene_bytes = metrics.histogram(
+    "maptopics_scene_bytes", "Size of scene request bodies", buckets=tuple(1024 * 4**i for i in range(11))
+)
+
+slow_profiler = None
+if settings.profile_slow_ms is not None:
+    slow_profiler = SlowRequestProfiler(
+        threshold=settings.profile_slow_ms / 1000,
+        out_dir=settings.profiles_dir,
+        interval=settings.profile_interval_ms / 1000,
+    )
 
-class ExploreCard(BaseModel):
-    id: int
-    topic: str
-    description: str
-    sources: List[Source]
-
-class ExploreResponse(BaseModel):
-    cards: List[ExploreCard]
-    has_more: bool
-    total_count: int
-
-# Mock data for explore cards - in production this would come from a database
-MOCK_TOPICS = [
-    "Quantum Computing", "Machine Learning", "Climate Change", "Blockchain Technology",
-    "Artificial Intelligence", "Space Exploration", "Renewable Energy", "Biotechnology",
-    "Virtual Reality", "Cybersecurity", "Neural Networks", "Gene Editing",
-    "Sustainable Agriculture", "Ocean Conservation", "Robotics", "Nanotechnology",
-    "Solar Energy", "Electric Vehicles", "Digital Privacy", "Cryptocurrency",
-    "Augmented Reality", "3D Printing", "Smart Cities", "Internet of Things",
-    "Cloud Computing", "Big Data Analytics", "Autonomous Vehicles", "Telemedicine",
-    "Green Technology", "Quantum Physics", "Bioinformatics", "Environmental Science",
-    "Space Technology", "Renewable Resources", "Data Science", "Computer Vision",
-    "Natural Language Processing", "Edge Computing", "Microbiome Research", "Clean Energy",
-    "Precision Medicine", "Smart Agriculture", "Digital Transformation", "Ecosystem Restoration",
-    "Sustainable Development", "Advanced Materials", "Bioengineering", "Quantum Sensors",
-    "Carbon Capture", "Marine Biology", "Atmospheric Science", "Sustainable Transportation"
-]
-
-def generate_mock_description(topic: str) -> str:
-    """Generate a realistic description for a topic"""
-    descriptions = [
-        f"{topic} represents a groundbreaking field that is revolutionizing how we understand and interact with the world around us. This comprehensive exploration delves into the fundamental principles, cutting-edge research, and practical applications that define this fascinating domain. represents a groundbreaking field that is revolutionizing how we understand and interact with the world around us. This comprehensive exploration delves into the fundamental principles, cutting-edge research, and practical applications that define this fascinating domain.",
-        f"Exploring {topic} reveals a complex landscape of innovation and discovery. From theoretical foundations to real-world implementations, this field continues to push the boundaries of human knowledge and technological capability.",
-        f"The study of {topic} encompasses a wide range of interdisciplinary approaches and methodologies. This topic explores the intersection of science, technology, and society, highlighting key developments and future possibilities.",
-        f"{topic} is at the forefront of modern scientific and technological advancement. This exploration examines current trends, breakthrough discoveries, and the potential impact on various industries and aspects of daily life.",
-        f"Understanding {topic} requires a deep dive into both historical context and contemporary developments. This comprehensive overview covers essential concepts, recent innovations, and emerging challenges in this dynamic field."
-    ]
-    import random
-    return random.choice(descriptions)
-
-def generate_mock_sources(topic: str) -> List[Source]:
-    """Generate realistic sources for a topic"""
-    sources_pool = [
-        Source(title="Wikipedia", url="https://wikipedia.org", favicon="https://wikipedia.org/static/favicon/wikipedia.ico"),
-        Source(title="Nature Journal", url="https://nature.com", favicon=None),
-        Source(title="MIT Technology Review", url="https://technologyreview.com", favicon=None),
-        Source(title="Scientific American", url="https://scientificamerican.com", favicon=None),
-        Source(title="IEEE Spectrum", url="https://spectrum.ieee.org", favicon=None),
-        Source(title="Research Paper Archive", url="https://arxiv.org", favicon=None),
-        Source(title="Google Scholar", url="https://scholar.google.com", favicon=None),
-        Source(title="Academic Database", url="https://example.com", favicon=None),
-        Source(title="Science Direct", url="https://sciencedirect.com", favicon=None),
-        Source(title="PubMed", url="https://pubmed.ncbi.nlm.nih.gov", favicon=None)
-    ]
-    import random
-    return random.sample(sources_pool, min(random.randint(2, 4), len(sources_pool)))
+# --- Response compression ---
+# JSON, NDJSON and SVG bodies of at least compression_min_bytes go out as zstd, br or gzip,
+# whichever the client prefers and this install supports (br/zstd need the optional brotli
+# and zstandard packages). Responses with an ETag are compressed once per encoding and kept.
+compressed_bodies = CompressedBodyCache(max_bytes=settings.compressed_cache_bytes)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_bytes, cache=compressed_bodies)
+
+# Added last so it is outermost: latency includes compression
+app.add_middleware(MetricsMiddleware, registry=metrics, profiler=slow_profiler)
+
+# Explore cards are generated once at startup and served as precomputed JSON slices
+feed_store = FeedStore(MOCK_TOPICS, variations=settings.feed_variations)
+
+# Feed pages only change when the feed is rebuilt (new version => new ETag), so clients may
+# reuse them for a while and revalidate cheaply with If-None-Match afterwards.
+FEED_CACHE_CONTROL = "public, max-age=300"
 
 @app.get("/")
 def read_root():
@@ -102,185 +137,577 @@ def health_check():
     return {"status": "ok", "message": "API is healthy"}
 
 
+@app.get("/api/ready")
+def readiness_check():
+    """
+    Readiness probe: 503 while startup work (render workers, NetworkX, data files) is still
+    warming up, 200 once it has finished. Unlike /api/health, a load balancer should wait for
+    this before sending traffic, so no user request pays for a cold start.
+    """
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if warmup.ready else 503)
+
+
 # --- Excalidraw scene models ---
-@app.post("/api/excalidraw/parse")
-def parse_excalidraw_scene(payload: Union[dict, list] = Body(...)):
+# The scene endpoints read the raw request body and let pydantic-core parse and validate it
+# in one pass, instead of FastAPI decoding it to dicts first. This documents the body in
+# OpenAPI since the endpoints no longer declare a Body parameter.
+_SCENE_BODY_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "oneOf": [
+                        {"type": "object", "description": "Full Excalidraw export"},
+                        {"type": "array", "items": {"type": "object"}, "description": "Bare element list"},
+                    ]
+                }
+            }
+        },
+    }
+}
+
+
+def _parse_scene_body(body: bytes) -> ExcalidrawDocument:
+    """Parse a raw JSON request body into a document, mapping validation errors to 422."""
+    if not body.strip():
+        raise HTTPException(status_code=422, detail="Request body must be an Excalidraw scene or element list")
+    try:
+        return ExcalidrawDocument.from_json(body)
+    except ValidationError as e:
+        raise _validation_error(e)
+
+
+# Scene bodies larger than this are spooled to a temporary file and memory-mapped, so a scene
+# full of embedded images never has to sit in the API process's heap.
+SCENE_SPOOL_BYTES = settings.scene_spool_bytes
+
+
+async def _read_lazy_scene(request: Request, digest=None) -> LazyScene:
+    """
+    Stream the request body into memory (or a temp file past the spool size) and index it.
+
+    `digest`, a hashlib object, is fed every chunk as it arrives.
+    """
+    with stage("read_body"):
+        buf, spill = await _spool_body(request, digest)
+    try:
+        return await _index_body(buf, spill)
+    finally:
+        if spill is not None:
+            spill.close()  # the mapping keeps its own reference to the file
+
+
+async def _spool_body(request: Request, digest=None):
+    """Read the body into a bytearray, or into a temp file once it outgrows SCENE_SPOOL_BYTES."""
+    buf = bytearray()
+    spill = None
+    async for chunk in request.stream():
+        if digest is not None:
+            digest.update(chunk)
+        if spill is not None:
+            spill.write(chunk)
+            continue
+        buf += chunk
+        if len(buf) > SCENE_SPOOL_BYTES:
+            spill = tempfile.TemporaryFile()
+            spill.write(buf)
+            buf = bytearray()
+    return buf, spill
+
+
+async def _index_body(buf: bytearray, spill) -> LazyScene:
+    try:
+        with stage("index"):
+            if spill is None:
+                lazy = await run_in_threadpool(LazyScene, buf)
+            else:
+                lazy = await run_in_threadpool(LazyScene.from_file, spill)
+    except SceneFormatError as e:
+        raise _scene_format_error(e)
+    scene_bytes.observe(len(buf) if spill is None else spill.tell())
+    scene_elements.observe(lazy.element_count)
+    return lazy
+
+
+def _lazy_document(lazy: LazyScene) -> ExcalidrawDocument:
+    """The typed document of an indexed scene (without `files`); invalid content answers 422."""
+    try:
+        return lazy.to_document(include_files=False)
+    except ValidationError as e:
+        raise _validation_error(e)
+    except SceneFormatError as e:
+        raise _scene_format_error(e)
+
+
+def _scene_format_error(e: SceneFormatError) -> HTTPException:
+    return HTTPException(status_code=422, detail=f"Invalid scene: {e}")
+
+
+def _validation_error(e: ValidationError) -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail=e.errors(include_url=False, include_context=False, include_input=False),
+    )
+
+
+@app.post("/api/excalidraw/parse", openapi_extra=_SCENE_BODY_OPENAPI)
+async def parse_excalidraw_scene(request: Request):
     """
     Accepts a full Excalidraw export JSON or a list of elements (as seen in localStorage)
     and returns our normalized, lossless document shape.
+
+    Elements are validated one at a time from the raw body and `files` are never decoded,
+    so memory stays flat however many images the scene embeds.
     """
-    doc = ExcalidrawDocument.from_raw_scene(payload)
-    return {
-        "elementsCount": len(doc.elements),
-        "nodes": len(doc.nodes),
-        "edges": len(doc.edges),
-        "metadataKeys": list(doc.metadata.keys()),
-    }
+    with await _read_lazy_scene(request) as scene:
+        try:
+            with stage("validate"):
+                counts = await run_in_threadpool(scene.counts, True)
+        except ValidationError as e:
+            raise _validation_error(e)
+        return {
+            "elementsCount": counts["elements"],
+            "nodes": counts["nodes"],
+            "edges": counts["edges"],
+            "metadataKeys": scene.metadata_keys,
+        }
 
 
-@app.post("/api/excalidraw/echo")
-def echo_excalidraw_scene(payload: Union[dict, list] = Body(...)):
+@app.post("/api/excalidraw/echo", openapi_extra=_SCENE_BODY_OPENAPI)
+async def echo_excalidraw_scene(request: Request):
     """
     Validates and then re-serializes the scene to prove lossless reconstruction.
     """
-    doc = ExcalidrawDocument.from_raw_scene(payload)
-    return doc.to_raw_scene()
+    body = await request.body()
 
+    def echo():
+        with stage("parse"):
+            doc = _parse_scene_body(body)
+        with stage("serialize"):
+            return doc.to_raw_scene_json()
+
+    content = await run_in_threadpool(echo)
+    return Response(content=content, media_type="application/json")
+
+
+# Rendered previews keyed by scene content; repeated renders of the same scene are served
+# from memory, or from disk after a restart.
+render_cache = RenderCache(
+    max_entries=settings.render_cache_entries,
+    disk_dir=settings.cache_dir / "render",
+    max_disk_entries=settings.render_cache_disk_entries,
+)
 
-@app.post("/api/excalidraw/render")
-def render_excalidraw_scene(payload: Union[dict, list] = Body(...)):
+# Matplotlib runs in dedicated worker processes so renders scale with cores and never hold
+# the GIL of the API process. Set MAPTOPICS_RENDER_WORKERS=0 to render in-process instead.
+render_pool = RenderPool(
+    workers=settings.render_workers,
+    max_pending=settings.render_max_pending,
+    timeout=settings.render_timeout,
+    initializer=init_matplotlib,
+)
+
+
+@app.post("/api/excalidraw/render", openapi_extra=_SCENE_BODY_OPENAPI)
+async def render_excalidraw_scene(
+    request: Request,
+    format: str = Query(
+        default="json",
+        pattern="^(json|svg|" + "|".join(IMAGE_FORMATS) + ")$",
+        description="json: PNG as a data URL in a JSON body; png/webp: the image bytes themselves; svg: a vector image",
+    ),
+    thumbnail: bool = Query(default=False, description=f"Scale down to at most {THUMBNAIL_MAX_SIZE}px on the longer side"),
+):
     """
     Accepts a full Excalidraw export JSON or a list of elements, converts it to a
-    NetworkX graph, renders a simple PNG preview and returns it as a data URL.
+    NetworkX graph and renders a simple preview.
+
+    By default the PNG is returned as a data URL inside JSON. With format=png or webp the
+    response is the image itself (no base64, about a quarter smaller), with its size in the
+    X-Image-Width/X-Image-Height headers. thumbnail=true renders a small, label-light preview
+    for cards and feeds at a fraction of the cost.
+
+    format=svg draws the elements themselves (shapes, text, arrow paths) as SVG without
+    matplotlib, streamed while it is written; it suits downloads and previews that should
+    stay sharp at any zoom.
+
+    Results are cached by a hash of the render-relevant element fields plus the variant.
+    PNG and WebP are drawn on the render pool; a full queue answers 503 and a slow render
+    504. SVG bypasses the pool and its limits: it is written on the request threadpool
+    like parsing is, at roughly the cost of parsing the scene (about 0.2 s per 10k nodes).
     """
-    doc = ExcalidrawDocument.from_raw_scene(payload)
-    G = excalidraw_to_networkx(doc, directed=True, allow_multi=True, include_deleted=False)
+    image_format = "png" if format == "json" else format
+    max_size = THUMBNAIL_MAX_SIZE if thumbnail else None
+    if format == "svg":
+        with await _read_lazy_scene(request) as lazy:
+            key, result, renderer = await run_in_threadpool(_prepare_svg, lazy, max_size)
+        if result is not None:
+            return _image_response(key, result)
+        headers = {"ETag": f'"{key}"', "X-Image-Width": str(renderer.width), "X-Image-Height": str(renderer.height)}
+        return StreamingResponse(_stream_svg(key, renderer), media_type=IMAGE_MEDIA_TYPES["svg"], headers=headers)
+    with await _read_lazy_scene(request) as lazy:
+        key, result, scene = await run_in_threadpool(_prepare_render, lazy, image_format, max_size)
+    if result is None:
+        result = await _render_on_pool(render_scene, scene, image_format, max_size)
+        await run_in_threadpool(render_cache.put, key, result)
 
+    if format != "json":
+        return _image_response(key, result)
+    with stage("base64"):
+        b64 = base64.b64encode(result.data).decode("ascii")
+    return {
+        "format": result.format,
+        "width": result.width,
+        "height": result.height,
+        "dataUrl": f"data:image/png;base64,{b64}",
+    }
+
+
+# Media types of the image formats whose name is not their image/ subtype
+IMAGE_MEDIA_TYPES = {"svg": "image/svg+xml"}
+
+
+def _image_response(key: str, result: RenderResult, cache_control: Optional[str] = None) -> Response:
+    headers = {
+        "ETag": f'"{key}"',
+        "X-Image-Width": str(result.width),
+        "X-Image-Height": str(result.height),
+    }
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    media_type = IMAGE_MEDIA_TYPES.get(result.format, f"image/{result.format}")
+    return Response(content=result.data, media_type=media_type, headers=headers)
+
+
+@app.get("/api/excalidraw/render/cache")
+def render_cache_stats():
+    """Hit/miss counters and occupancy of the render cache."""
+    return render_cache.stats()
+
+
+@app.get("/api/excalidraw/render/pool")
+def render_pool_stats():
+    """Worker count, queue occupancy and outcome counters of the render pool."""
+    return render_pool.stats()
+
+
+def _prepare_render(
+    lazy: LazyScene, image_format: str = "png", max_size: Optional[int] = None
+) -> Tuple[str, Optional[RenderResult], Optional[RenderScene]]:
+    """Parse the scene (without `files`) and look it up in the cache; on a miss, build the scene to draw."""
+    with stage("parse"):
+        doc = _lazy_document(lazy)
+    with stage("cache_key"):
+        key = render_variant_key(render_cache_key(doc), image_format, max_size)
+    result = render_cache.get(key)
+    if result is not None:
+        return key, result, None
+    with stage("table"):
+        table = ElementTable.from_document(doc)
+    with stage("scene"):
+        return key, None, scene_from_table(table)
+
+
+def _prepare_svg(lazy: LazyScene, max_size: Optional[int] = None) -> Tuple[str, Optional[RenderResult], Optional[SvgRenderer]]:
+    """Like _prepare_render for SVG: the cached result, or on a miss the renderer to stream it."""
+    with stage("parse"):
+        doc = _lazy_document(lazy)
+    with stage("cache_key"):
+        key = render_variant_key(svg_cache_key(doc), "svg", max_size)
+    result = render_cache.get(key)
+    if result is not None:
+        return key, result, None
+    with stage("table"):
+        return key, None, SvgRenderer(doc, max_size)
+
+
+def _stream_svg(key: str, renderer: SvgRenderer) -> Iterator[bytes]:
+    """
+    The renderer's chunks, as they are written (StreamingResponse runs this on a worker
+    thread); once all are sent the whole SVG goes into the render cache.
+    """
+    chunks = []
+    for chunk in renderer:
+        chunks.append(chunk)
+        yield chunk
+    data = b"".join(chunks)
+    render_cache.put(key, RenderResult(format="svg", width=renderer.width, height=renderer.height, data=data, stages=()))
+
+
+async def _render_on_pool(fn, *args) -> RenderResult:
+    """
+    Run a render job on the pool, mapping a full queue to 503 and a slow render to 504.
+    The "render" stage includes waiting for a worker; the stages timed inside it are recorded too.
+    """
+    try:
+        with stage("render"):
+            result = await render_pool.run(fn, *args)
+    except RenderPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except RenderTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    for name, seconds in result.stages:
+        stage.record(name, seconds)
+    return result
+
+
+# Map tiles: fixed-size PNGs of one area at one zoom level, so a client can pan and zoom a large
+# map without a full-scene render. Tiles are cached by a hash of what they show, so unchanged
+# tiles are reused across edits of the scene and empty tiles share one entry.
+tile_cache = RenderCache(
+    max_entries=settings.tile_cache_entries,
+    disk_dir=settings.cache_dir / "tiles",
+    max_disk_entries=settings.tile_cache_disk_entries,
+)
+# Scenes registered for tiling, by render key; each tile request reuses the prepared scene.
+tilesets = TileSetCache(max_entries=settings.tileset_cache_entries)
+
+
+def _prepare_tileset(lazy: LazyScene) -> Tuple[str, TileSet]:
+    doc = _lazy_document(lazy)
+    key = render_cache_key(doc, variant="tiles")
+    tileset = tilesets.get(key)
+    if tileset is None:
+        tileset = TileSet(scene_from_table(ElementTable.from_document(doc)))
+        tilesets.put(key, tileset)
+    return key, tileset
+
+
+async def _tile_response(request: Request, tileset: TileSet, z: int, x: int, y: int, cache_control: str) -> Response:
+    """Serve tile (z, x, y) from the tile cache or the render pool, with the tile key as ETag."""
+    with stage("tile_job"):
+        key, job = await run_in_threadpool(tileset.job, z, x, y)
+    headers = {"ETag": f'"{key}"', "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    result = await run_in_threadpool(tile_cache.get, key)
+    if result is None:
+        result = await _render_on_pool(render_tile, job)
+        await run_in_threadpool(tile_cache.put, key, result)
+    return Response(content=result.data, media_type="image/png", headers=headers)
+
+
+@app.post("/api/excalidraw/tiles", openapi_extra=_SCENE_BODY_OPENAPI)
+async def register_tiled_scene(request: Request):
+    """
+    Prepare a scene for tiled viewing and return where its tiles live.
+
+    Tiles are TILE_SIZE pixel PNGs on a grid anchored at the scene origin; at zoom z one scene
+    unit is 2 ** (z - 4) pixels, so tile (z, x, y) covers x * 256 / 2 ** (z - 4) onwards.
+    `tileRange` gives the tiles that cover the scene at each zoom level. A registered scene
+    stays available while it is among the most recently used ones; after a 404 re-register it.
+    """
+    with await _read_lazy_scene(request) as lazy:
+        key, tileset = await run_in_threadpool(_prepare_tileset, lazy)
+    return {
+        "sceneKey": key,
+        "tileSize": TILE_SIZE,
+        "minZoom": MIN_ZOOM,
+        "maxZoom": MAX_ZOOM,
+        "bounds": tileset.bounds(),
+        "tileRange": {str(z): tileset.tile_range(z) for z in range(MIN_ZOOM, MAX_ZOOM + 1)},
+        "urlTemplate": f"/api/excalidraw/tiles/{key}/{{z}}/{{x}}/{{y}}.png",
+    }
+
+
+@app.get("/api/excalidraw/tiles/{scene_key}/{z}/{x}/{y}.png")
+async def get_scene_tile(
+    request: Request,
+    scene_key: str = PathParam(..., pattern=r"^[0-9a-f]{64}$"),
+    z: int = PathParam(..., ge=MIN_ZOOM, le=MAX_ZOOM),
+    x: int = PathParam(...),
+    y: int = PathParam(...),
+):
+    """One PNG tile of a registered scene. A scene key names fixed content, so tiles are cacheable forever."""
+    tileset = tilesets.get(scene_key)
+    if tileset is None:
+        raise HTTPException(status_code=404, detail="Unknown scene; register it with POST /api/excalidraw/tiles")
+    return await _tile_response(request, tileset, z, x, y, "public, max-age=31536000, immutable")
+
+
+@app.get("/api/excalidraw/tiles/cache")
+def tile_cache_stats():
+    """Hit/miss counters of the tile cache and the number of registered scenes."""
+    return {"tiles": tile_cache.stats(), "scenes": tilesets.stats()}
+
+# ---------------- Graph analytics API ----------------
+# Scene bodies as for /api/excalidraw/*. Built graphs are cached under two keys: a hash of the
+# raw body, checked while the body streams in so an identical re-post skips parsing entirely,
+# and a hash of the fields that shape the graph (ids, labels, bindings), so a map whose elements
+# only moved or changed style still skips validation and graph building.
+graph_cache = GraphCache(max_entries=settings.graph_cache_entries)
+
+
+def _scene_graph(lazy: LazyScene, body_key: str) -> SceneGraph:
     try:
-        import matplotlib
-        matplotlib.use("Agg")  # non-GUI backend
-        import matplotlib.pyplot as plt
-        from matplotlib.patches import Circle
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Matplotlib is required to render images: {e}")
-
-    # If no nodes, render a friendly placeholder
-    if G.number_of_nodes() == 0:
-        dpi = 96
-        width_px, height_px = 480, 240
-        fig_w_in, fig_h_in = width_px / dpi, height_px / dpi
-
-        fig, ax = plt.subplots(figsize=(fig_w_in, fig_h_in), dpi=dpi)
-        ax.set_facecolor("white")
-        ax.axis("off")
-        ax.text(
-            0.5,
-            0.5,
-            "No graph to render",
-            ha="center",
-            va="center",
-            fontsize=14,
-            color="#888888",
-            transform=ax.transAxes,
+        with stage("graph_key"):
+            key = graph_cache_key(lazy)
+    except SceneFormatError as e:
+        raise _scene_format_error(e)
+    graph = graph_cache.get(key)
+    if graph is None:
+        with stage("parse"):
+            doc = _lazy_document(lazy)
+        with stage("graph"):
+            graph = SceneGraph.from_document(doc)
+        graph_cache.put(key, graph)
+    graph_cache.put(body_key, graph)
+    return graph
+
+
+async def _request_graph(request: Request) -> SceneGraph:
+    digest = hashlib.sha256()
+    buf, spill = await _spool_body(request, digest)
+    try:
+        body_key = "body:" + digest.hexdigest()
+        graph = graph_cache.get(body_key)
+        if graph is not None:
+            return graph
+        with await _index_body(buf, spill) as lazy:
+            return await run_in_threadpool(_scene_graph, lazy, body_key)
+    finally:
+        if spill is not None:
+            spill.close()
+
+
+@app.post("/api/graph/centrality", openapi_extra=_SCENE_BODY_OPENAPI)
+async def graph_centrality(
+    request: Request,
+    metric: str = Query(default="degree", pattern="^(" + "|".join(analytics.CENTRALITY_METRICS) + ")$"),
+    top: int = Query(default=20, ge=1, le=1000, description="Number of top-ranked nodes to return"),
+):
+    """Hub topics: the highest-ranked nodes by degree, PageRank or betweenness."""
+    graph = await _request_graph(request)
+    try:
+        return await run_in_threadpool(analytics.centrality, graph, metric, top)
+    except GraphTooLarge as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.post("/api/graph/components", openapi_extra=_SCENE_BODY_OPENAPI)
+async def graph_components(
+    request: Request,
+    top: int = Query(default=10, ge=1, le=1000, description="Number of largest components to return"),
+    max_nodes: int = Query(default=100, ge=0, le=10000, alias="maxNodes", description="Node ids listed per component"),
+):
+    """Weakly connected components (disconnected clusters of topics), largest first."""
+    graph = await _request_graph(request)
+    return await run_in_threadpool(analytics.components, graph, top, max_nodes)
+
+
+@app.post("/api/graph/path", openapi_extra=_SCENE_BODY_OPENAPI)
+async def graph_shortest_path(
+    request: Request,
+    source: str = Query(..., description="Element id of the start node"),
+    target: str = Query(..., description="Element id of the end node"),
+    directed: bool = Query(default=True, description="Follow arrows only in their direction"),
+):
+    """Shortest chain of topics between two nodes, by number of arrows."""
+    graph = await _request_graph(request)
+    try:
+        return await run_in_threadpool(analytics.shortest_path, graph, source, target, directed)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Node not in graph: {e.args[0]}")
+
+
+@app.post("/api/graph/cycles", openapi_extra=_SCENE_BODY_OPENAPI)
+async def graph_cycles(
+    request: Request,
+    top: int = Query(default=10, ge=1, le=1000, description="Number of largest cyclic groups to return"),
+    max_nodes: int = Query(default=100, ge=0, le=10000, alias="maxNodes", description="Node ids listed per group"),
+):
+    """Cycle detection: groups of topics that reach each other, each with one example cycle."""
+    graph = await _request_graph(request)
+    return await run_in_threadpool(analytics.cycles, graph, top, max_nodes)
+
+
+@app.post("/api/graph/layout", openapi_extra=_SCENE_BODY_OPENAPI)
+async def graph_layout(
+    request: Request,
+    algorithm: str = Query(default="tree", pattern="^(" + "|".join(LAYOUT_ALGORITHMS) + ")$"),
+    new_node_ids: Optional[List[str]] = Query(
+        default=None,
+        alias="newNodeIds",
+        description="Incremental mode: only these nodes and their neighbors move (force layout)",
+    ),
+    iterations: int = Query(default=50, ge=1, le=500, description="Force layout iterations"),
+):
+    """
+    Lay out the scene's topics and return the same scene with new coordinates.
+
+    `tree` arranges each connected part as a left-to-right mind-map tree; `force` relaxes that
+    with a force-directed layout. With `newNodeIds` the existing layout is kept and only the
+    new nodes (and their neighbors) are placed. Arrows attached to moved nodes are redrawn,
+    bound text follows its container, and changed elements get a version bump.
+    """
+    body = await request.body()
+
+    def layout():
+        with stage("parse"):
+            doc = _parse_scene_body(body)
+        with stage("layout"):
+            moved = layout_document(
+                doc,
+                algorithm="force" if new_node_ids else algorithm,
+                new_node_ids=new_node_ids or None,
+                iterations=iterations,
+            )
+        with stage("serialize"):
+            content = doc.to_raw_scene_json()
+        return Response(
+            content=content,
+            media_type="application/json",
+            headers={"X-Moved-Nodes": str(moved)},
         )
-        buf = io.BytesIO()
-        plt.tight_layout(pad=0)
-        fig.savefig(buf, format="png", dpi=dpi, facecolor="white", pad_inches=0)
-        plt.close(fig)
-        buf.seek(0)
-        b64 = base64.b64encode(buf.read()).decode("ascii")
-        return {"format": "png", "width": width_px, "height": height_px, "dataUrl": f"data:image/png;base64,{b64}"}
-
-    # Build positions based on element bounding boxes
-    pos = {}
-    xs, ys = [], []
-    for n, data in G.nodes(data=True):
-        x = float(data.get("x", 0.0)) + float(data.get("width", 0.0)) / 2.0
-        y = float(data.get("y", 0.0)) + float(data.get("height", 0.0)) / 2.0
-        pos[n] = (x, y)
-        xs.append(x)
-        ys.append(y)
-
-    min_x, max_x = min(xs), max(xs)
-    min_y, max_y = min(ys), max(ys)
-    padding = 40.0
-    width_px = max(1.0, (max_x - min_x) + 2 * padding)
-    height_px = max(1.0, (max_y - min_y) + 2 * padding)
-
-    dpi = 96
-    fig_w_in = max(1.0, width_px / dpi)
-    fig_h_in = max(1.0, height_px / dpi)
-
-    fig, ax = plt.subplots(figsize=(fig_w_in, fig_h_in), dpi=dpi)
-    ax.set_facecolor("white")
-    ax.axis("off")
-
-    ax.set_xlim(min_x - padding, max_x + padding)
-    ax.set_ylim(max_y + padding, min_y - padding)
-
-    # Draw edges as straight lines between centers
-    edge_color = "#999999"
-    for u, v in G.edges():
-        x1, y1 = pos[u]
-        x2, y2 = pos[v]
-        ax.plot([x1, x2], [y1, y2], color=edge_color, linewidth=1.5, alpha=0.9)
-
-    # Draw nodes as circles, size scaled lightly by element size
-    for n, data in G.nodes(data=True):
-        x, y = pos[n]
-        w = float(data.get("width", 40.0))
-        h = float(data.get("height", 40.0))
-        r = max(6.0, min(w, h) * 0.2)
-        fill = data.get("backgroundColor") or "#ffffff"
-        stroke = data.get("strokeColor") or "#1e1e1e"
-        circle = Circle((x, y), radius=r, facecolor=fill, edgecolor=stroke, linewidth=1.5, alpha=0.95)
-        ax.add_patch(circle)
-        label = data.get("text")
-        if label:
-            ax.text(x, y, str(label), ha="center", va="center", fontsize=8, color="#222222")
-
-    # Export to PNG in-memory
-    buf = io.BytesIO()
-    plt.tight_layout(pad=0)
-    fig.savefig(buf, format="png", dpi=dpi, facecolor="white", bbox_inches="tight", pad_inches=0)
-    plt.close(fig)
-    buf.seek(0)
-    b64 = base64.b64encode(buf.read()).decode("ascii")
-    return {"format": "png", "width": int(width_px), "height": int(height_px), "dataUrl": f"data:image/png;base64,{b64}"}
+
+    return await run_in_threadpool(layout)
+
+
+@app.get("/api/graph/cache")
+def graph_cache_stats():
+    """Hit/miss counters and occupancy of the graph cache."""
+    return graph_cache.stats()
+
 
 @app.get("/api/explore", response_model=ExploreResponse)
 async def get_explore_cards(
+    request: Request,
     limit: int = Query(default=5, ge=1, le=20, description="Number of cards to return"),
     offset: int = Query(default=0, ge=0, description="Number of cards to skip"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from a previous page; overrides offset"),
+    config: Settings = Depends(get_settings),
 ):
     """
     Get explore cards with pagination support.
     
     - **limit**: Number of cards to return (1-20)
     - **offset**: Number of cards to skip for pagination
+    - **cursor**: Opaque token from `next_cursor` of the previous page
     """
-    
-    # Simulate API delay (remove in production)
-    await asyncio.sleep(0.5)
-    
-    # Calculate total available cards
-    total_count = len(MOCK_TOPICS) * 3  # Each topic can appear multiple times with variations
-    
-    # Check if we have more cards available
-    has_more = offset + limit < total_count
-    
-    # Generate cards for this page
-    cards = []
-    for i in range(limit):
-        card_index = offset + i
-        if card_index >= total_count:
-            break
-            
-        # Cycle through topics and add variation
-        topic_index = card_index % len(MOCK_TOPICS)
-        variation = (card_index // len(MOCK_TOPICS)) + 1
-        
-        base_topic = MOCK_TOPICS[topic_index]
-        topic = base_topic if variation == 1 else f"{base_topic} (Advanced Concepts)"
-        
-        card = ExploreCard(
-            id=card_index + 1,
-            topic=topic,
-            description=generate_mock_description(topic),
-            sources=generate_mock_sources(topic)
-        )
-        cards.append(card)
-    
-    return ExploreResponse(
-        cards=cards,
-        has_more=has_more,
-        total_count=total_count
-    )
+    if cursor is not None:
+        try:
+            offset = feed_store.decode_cursor(cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"ETag": feed_store.etag(offset, limit), "Cache-Control": FEED_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    # Simulated API delay, off unless MAPTOPICS_EXPLORE_DELAY_MS is set
+    if config.explore_delay_ms:
+        await asyncio.sleep(config.explore_delay_ms / 1000)
+
+    return Response(content=feed_store.page_json(offset, limit), media_type="application/json", headers=headers)
 
 @app.get("/api/explore/count")
 async def get_explore_count():
     """Get the total number of available explore cards."""
-    return {"total_count": len(MOCK_TOPICS) * 3}
+    return {"total_count": feed_store.total_count}
 
 
 # ---------------- Mind Map initial data API ----------------
@@ -290,74 +717,482 @@ class MindMapInitialData(BaseModel):
     appState: dict
 
 
-def _load_base_elements():
-    """Load base Excalidraw elements from local JSON file bundled with the backend."""
-    data_path = Path(__file__).parent / "data" / "excalidraw_base.json"
+# Starting scenes: "base" (data/excalidraw_base.json), "blank" and data/templates/*.json,
+# each serialized once; a response only splices in the topic and its label.
+scene_templates = TemplateRegistry(settings.data_dir)
+
+
+@app.get("/api/mindmap/{topic}", response_model=MindMapInitialData)
+async def get_mindmap_initial_data(
+    topic: str,
+    request: Request,
+    template: str = Query(default=DEFAULT_TEMPLATE, description="Starting scene (see /api/templates)"),
+    config: Settings = Depends(get_settings),
+):
+    """
+    Return initial Excalidraw data for a given mind map topic.
+
+    This simulates server-stored mind maps. For now it's mock up only. The ETag is a hash of
+    the content, so reloading a map revalidates with a 304 instead of downloading it again.
+    """
+    if config.mindmap_delay_ms:  # simulated latency, off unless MAPTOPICS_MINDMAP_DELAY_MS is set
+        await asyncio.sleep(config.mindmap_delay_ms / 1000)
+
     try:
-        with data_path.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        return [] # empty scene
+        scene = scene_templates.get(template)
+    except UnknownTemplate:
+        raise HTTPException(status_code=404, detail=f"Unknown template '{template}'")
+    headers = {"ETag": scene.etag(topic), "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    # Template elements plus a topic label, pre-encoded: no per-request copies or validation
+    return Response(content=scene.render(topic), media_type="application/json", headers=headers)
 
 
-BASE_ELEMENTS = _load_base_elements()
+@app.get("/api/templates")
+def list_templates():
+    """Names and element counts of the starting scenes for /api/mindmap/{topic}?template=..."""
+    return {
+        "default": DEFAULT_TEMPLATE,
+        "templates": [{"name": t.name, "elementCount": t.element_count} for t in scene_templates.load().values()],
+    }
 
 
-@app.get("/api/mindmap/{topic}", response_model=MindMapInitialData)
-async def get_mindmap_initial_data(topic: str):
+# ---------------- Stored mind maps API ----------------
+# Maps saved server-side, addressed by a URL-safe slug. Request bodies are Excalidraw scenes
+# (full export or bare element list), like the /api/excalidraw endpoints.
+mindmap_store: MindMapStore = SQLiteMindMapStore(settings.database, pool_size=settings.db_pool_size)
+
+SLUG_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_-]{0,127}$"
+
+
+@app.put("/api/mindmaps/{slug}", openapi_extra=_SCENE_BODY_OPENAPI)
+async def save_mindmap(
+    request: Request,
+    background: BackgroundTasks,
+    slug: str = PathParam(..., pattern=SLUG_PATTERN),
+    topic: str = Query(..., min_length=1, max_length=200, description="Topic the map belongs to"),
+):
+    """Create or replace a stored mind map from an Excalidraw scene body."""
+    body = await request.body()
+
+    def save():
+        with stage("parse"):
+            doc = _parse_scene_body(body)
+        records = element_records(doc.elements)
+        with stage("db_save"):
+            summary = mindmap_store.save(slug, topic, records, doc.metadata_json())
+        with stage("search_index"):
+            index_mindmap(search_index, slug, topic, records)
+        return summary
+
+    summary = await run_in_threadpool(save)
+    # Index the new version after responding, so the first viewport load is already fast
+    background.add_task(_viewport_index, slug, summary.revision, summary.updatedAt)
+    return summary.to_dict()
+
+
+@app.post("/api/mindmaps/{slug}/sync")
+async def sync_mindmap(request: Request, slug: str = PathParam(..., pattern=SLUG_PATTERN)):
     """
-    Return initial Excalidraw data for a given mind map topic.
+    Delta sync: the client sends `sinceRevision` and only the elements it changed since then.
+
+    Elements are merged by Excalidraw's rule (higher `version` wins, ties go to the lower
+    `versionNonce`). The response carries the new `revision` and only the elements the client
+    is missing; send that revision as `sinceRevision` next time.
+    """
+    body = await request.body()
+
+    def sync():
+        try:
+            sync_request = SyncRequest.model_validate_json(body)
+        except ValidationError as e:
+            raise _validation_error(e)
+        records = element_records(sync_request.elements)
+        try:
+            with stage("db_sync"):
+                result = mindmap_store.sync(slug, sync_request.sinceRevision, records)
+        except RevisionMismatch as e:
+            raise HTTPException(status_code=409, detail=f"{e}; reload the map")
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"Mind map '{slug}' not found")
+        with stage("search_index"):
+            # Only the synced elements are re-indexed; a map not indexed yet is indexed whole
+            if not update_mindmap_elements(search_index, slug, records, result.elements_json):
+                stored = mindmap_store.load(slug)
+                if stored is not None:
+                    index_stored_mindmap(search_index, stored)
+        return Response(content=result.to_json(), media_type="application/json")
+
+    return await run_in_threadpool(sync)
+
+
+def _stored_etag(summary) -> str:
+    # (revision, updatedAt) identifies the content: every change bumps the revision, and a
+    # deleted and re-created map gets a new updatedAt
+    return f'"map-{summary.revision}-{summary.updatedAt}"'
+
+
+@app.get("/api/mindmaps/{slug}")
+def load_mindmap(request: Request, slug: str = PathParam(..., pattern=SLUG_PATTERN)):
+    """
+    Return a stored mind map: slug, topic, timestamps and the saved scene (appState, files,
+    elements). The scene is served from its stored JSON without re-validation.
+
+    Revalidating with If-None-Match costs one summary lookup and returns 304 while the map
+    is unchanged.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        summary = mindmap_store.summary(slug)
+        if summary is not None and etag_matches(if_none_match, _stored_etag(summary)):
+            return Response(status_code=304, headers={"ETag": _stored_etag(summary), "Cache-Control": "no-cache"})
+    with stage("db_load"):
+        stored = mindmap_store.load(slug)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Mind map '{slug}' not found")
+    headers = {"ETag": _stored_etag(stored.summary), "Cache-Control": "no-cache"}
+    return Response(content=stored.to_json(), media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=16)
+def _viewport_index(slug: str, revision: int, updated_at: int) -> Optional[Tuple[SceneSpatialIndex, LazyScene]]:
+    """
+    Spatial index of a stored map's elements plus its indexed metadata, built once per version.
+    `updated_at` is part of the key because a deleted and re-created map restarts its revisions.
+    """
+    stored = mindmap_store.load(slug)
+    if stored is None:
+        return None
+    return SceneSpatialIndex.from_json(stored.elements_json), LazyScene(stored.metadata_json)
+
+
+@app.get("/api/mindmaps/{slug}/viewport")
+def load_mindmap_viewport(
+    slug: str = PathParam(..., pattern=SLUG_PATTERN),
+    min_x: float = Query(..., alias="minX"),
+    min_y: float = Query(..., alias="minY"),
+    max_x: float = Query(..., alias="maxX"),
+    max_y: float = Query(..., alias="maxY"),
+):
+    """
+    Load only what is on screen: the elements of a stored map that intersect the viewport
+    rectangle (scene coordinates), plus arrows bound to them, their bound text/containers and
+    the embedded files they use.
 
-    This simulates server-stored mind maps. For now it's mock up only.
-    """
-    await asyncio.sleep(0.2)  # simulated latency (remove in production)
-
-    # Start from base and add a topic marker
-    elements = list(BASE_ELEMENTS) if isinstance(BASE_ELEMENTS, list) else []
-
-    topic_label = {
-        "id": f"topic-label-{abs(hash(topic)) % 10_000_000}",
-        "type": "text",
-        "x": 600,
-        "y": -650,
-        "width": 500,
-        "height": 60,
-        "angle": 0,
-        "strokeColor": "#1e1e1e",
-        "backgroundColor": "transparent",
-        "fillStyle": "solid",
-        "strokeWidth": 1,
-        "strokeStyle": "solid",
-        "roughness": 0,
-        "opacity": 100,
-        "groupIds": [],
-        "frameId": None,
-        "index": "a0",
-        "roundness": None,
-        "seed": 123456,
-        "version": 1,
-        "versionNonce": 1,
-        "isDeleted": False,
-        "boundElements": None,
-        "updated": 0,
-        "link": None,
-        "locked": False,
-        "text": f"Server init for: {topic}",
-        "fontSize": 28,
-        "fontFamily": 5,
-        "textAlign": "left",
-        "verticalAlign": "middle",
-        "containerId": None,
-        "originalText": f"Server init for: {topic}",
-        "autoResize": True,
-        "lineHeight": 1.25,
+    `bounds` is the box around the whole map and `elementCount` its live element count, so a
+    client can open a huge map at this viewport and fetch the rest as the user pans.
+    """
+    if max_x < min_x or max_y < min_y:
+        raise HTTPException(status_code=422, detail="Viewport must have minX <= maxX and minY <= maxY")
+    summary = mindmap_store.summary(slug)
+    indexed = _viewport_index(slug, summary.revision, summary.updatedAt) if summary is not None else None
+    if indexed is None:
+        raise HTTPException(status_code=404, detail=f"Mind map '{slug}' not found")
+    index, metadata = indexed
+
+    visible = index.visible((min_x, min_y, max_x, max_y))
+    head = {
+        "slug": slug,
+        "topic": summary.topic,
+        "revision": summary.revision,
+        "bounds": index.bounds(),
+        "elementCount": len(index),
+        "visibleCount": len(visible),
     }
+    parts = [json.dumps(head, separators=(",", ":")).encode("utf-8")[:-1]]
+    app_state = metadata.raw_value("appState")
+    if app_state is not None:
+        parts.append(b',"appState":' + app_state)
+    files = [fid for fid in index.file_ids(visible) if fid in metadata.file_spans]
+    parts.append(
+        b',"files":{'
+        + b",".join(json.dumps(fid).encode("utf-8") + b":" + bytes(metadata.file_bytes(fid)) for fid in files)
+        + b"}"
+    )
+    parts.append(b',"elements":' + index.elements_json(visible) + b"}")
+    return Response(content=b"".join(parts), media_type="application/json")
+
+
+@lru_cache(maxsize=8)
+def _mindmap_scene(slug: str, revision: int, updated_at: int) -> Optional[Tuple[str, RenderScene]]:
+    """Render key and drawable scene of a stored map, built once per version (keyed like _viewport_index)."""
+    stored = mindmap_store.load(slug)
+    if stored is None:
+        return None
+    doc = ExcalidrawDocument.from_json(stored.elements_json)
+    return render_cache_key(doc), scene_from_table(ElementTable.from_document(doc))
+
+
+@lru_cache(maxsize=8)
+def _mindmap_tileset(slug: str, revision: int, updated_at: int) -> Optional[TileSet]:
+    prepared = _mindmap_scene(slug, revision, updated_at)
+    return TileSet(prepared[1]) if prepared is not None else None
+
 
-    elements = elements + [topic_label]
+@app.get("/api/mindmaps/{slug}/thumbnail")
+async def get_mindmap_thumbnail(
+    request: Request,
+    slug: str = PathParam(..., pattern=SLUG_PATTERN),
+    format: str = Query(default="webp", pattern="^(" + "|".join(IMAGE_FORMATS) + ")$"),
+):
+    """
+    A small preview image of a stored map (at most THUMBNAIL_MAX_SIZE px on the longer side),
+    for ExploreCard and feed previews. The ETag follows the rendered content, so clients
+    revalidate cheaply and saves that do not change the picture keep it.
+    """
+    summary = await run_in_threadpool(mindmap_store.summary, slug)
+    prepared = None
+    if summary is not None:
+        prepared = await run_in_threadpool(_mindmap_scene, slug, summary.revision, summary.updatedAt)
+    if prepared is None:
+        raise HTTPException(status_code=404, detail=f"Mind map '{slug}' not found")
+    scene_key, scene = prepared
+    key = render_variant_key(scene_key, format, THUMBNAIL_MAX_SIZE)
+    if etag_matches(request.headers.get("if-none-match"), f'"{key}"'):
+        return Response(status_code=304, headers={"ETag": f'"{key}"', "Cache-Control": "no-cache"})
+    result = await run_in_threadpool(render_cache.get, key)
+    if result is None:
+        result = await _render_on_pool(render_scene, scene, format, THUMBNAIL_MAX_SIZE)
+        await run_in_threadpool(render_cache.put, key, result)
+    return _image_response(key, result, "no-cache")
+
+
+@app.get("/api/mindmaps/{slug}/tiles/{z}/{x}/{y}.png")
+async def get_mindmap_tile(
+    request: Request,
+    slug: str = PathParam(..., pattern=SLUG_PATTERN),
+    z: int = PathParam(..., ge=MIN_ZOOM, le=MAX_ZOOM),
+    x: int = PathParam(...),
+    y: int = PathParam(...),
+):
+    """
+    One PNG tile of a stored map's current version (grid as for /api/excalidraw/tiles).
+    Clients should revalidate: the ETag stays the same across saves that do not touch the tile.
+    """
+    summary = await run_in_threadpool(mindmap_store.summary, slug)
+    tileset = None
+    if summary is not None:
+        tileset = await run_in_threadpool(_mindmap_tileset, slug, summary.revision, summary.updatedAt)
+    if tileset is None:
+        raise HTTPException(status_code=404, detail=f"Mind map '{slug}' not found")
+    return await _tile_response(request, tileset, z, x, y, "no-cache")
 
-    app_state = {
-        "viewBackgroundColor": "#ffffff",
-        "theme": "light",
+
+@app.get("/api/mindmaps")
+def list_mindmaps(
+    topic: Optional[str] = Query(default=None, description="Only maps with exactly this topic"),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+):
+    """List stored mind maps, most recently updated first."""
+    return {"mindmaps": [s.to_dict() for s in mindmap_store.list(topic=topic, limit=limit, offset=offset)]}
+
+
+@app.delete("/api/mindmaps/{slug}", status_code=204)
+def delete_mindmap(slug: str = PathParam(..., pattern=SLUG_PATTERN)):
+    """Delete a stored mind map."""
+    if not mindmap_store.delete(slug):
+        raise HTTPException(status_code=404, detail=f"Mind map '{slug}' not found")
+    search_index.remove(mindmap_doc_id(slug))
+    return Response(status_code=204)
+
+
+# ---------------- Search API ----------------
+# One in-memory inverted index over topics, explore cards and stored mind maps (topic and
+# element text). Saves, syncs and deletes update it in place; the warmup fills it at startup.
+search_index = SearchIndex()
+
+
+def _build_search_index() -> None:
+    index_topics(search_index, MOCK_TOPICS)
+    index_feed(search_index, feed_store)
+    index_store(search_index, mindmap_store)
+
+
+@app.get("/api/search")
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search words; the last one also matches as a prefix"),
+    kind: Optional[List[str]] = Query(default=None, description="Only these kinds: " + ", ".join(SEARCH_KINDS)),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+):
+    """
+    Ranked full-text search for the Search view. Every word must match a topic, card
+    (topic and description) or stored mind map (topic and element text); the last word is
+    treated as a prefix, so results update while typing. `ref` is the topic, the card id or
+    the mind map slug.
+    """
+    if kind and not set(kind) <= set(SEARCH_KINDS):
+        raise HTTPException(status_code=422, detail=f"kind must be one of {', '.join(SEARCH_KINDS)}")
+    total, hits = search_index.search(q, kinds=kind, limit=limit, offset=offset)
+    has_more = offset + limit < total
+    return {
+        "query": q,
+        "total": total,
+        "results": [hit.to_dict() for hit in hits],
+        "has_more": has_more,
+        "next_offset": offset + limit if has_more else None,
     }
 
-    return MindMapInitialData(topic=topic, elements=elements, appState=app_state)
+
+@app.get("/api/search/suggest")
+def search_suggest(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=10, ge=1, le=50),
+):
+    """Typeahead completions for the last word of `q`, most widespread first."""
+    return {"query": q, "suggestions": search_index.suggest(q, limit=limit)}
+
+
+@app.get("/api/search/stats")
+def search_stats():
+    """Indexed documents by kind, distinct terms and postings."""
+    return search_index.stats()
+
+
+# ---------------- Batch API ----------------
+# Many scenes in one request, processed on the render pool as they stream in; results stream
+# back one NDJSON line per scene, in completion order. Rendered images go into the render
+# cache too, so a batch run also warms the previews the render and thumbnail endpoints serve.
+async def _process_batch_item(index: int, raw: bytes, options: BatchOptions) -> SceneOutcome:
+    while True:
+        try:
+            return await render_pool.run(process_scene, index, raw, options)
+        except RenderPoolBusy:
+            # Other requests hold the queue; the batch waits for room instead of failing
+            await asyncio.sleep(0.05)
+        except RenderTimeout as e:
+            return SceneOutcome(index, index, False, render_pool.timeout, error=str(e))
+        except Exception as e:
+            # One broken scene (or worker) must not end the whole batch
+            return SceneOutcome(index, index, False, 0.0, error=f"{type(e).__name__}: {e}")
+
+
+def _batch_concurrency(config: Settings) -> int:
+    # Enough to keep every worker busy, leaving half the queue to interactive requests
+    if config.batch_concurrency:
+        return config.batch_concurrency
+    return max(1, min(max(render_pool.workers, 1) * 2, render_pool.max_pending // 2))
+
+
+@app.post(
+    "/api/batch",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+            },
+        }
+    },
+)
+async def process_batch(
+    request: Request,
+    operation: str = Query(default="render", pattern="^(parse|convert|render)$"),
+    format: str = Query(default="png", pattern="^(" + "|".join(IMAGE_FORMATS) + ")$"),
+    thumbnail: bool = Query(default=False, description=f"Render at most {THUMBNAIL_MAX_SIZE}px on the longer side"),
+    images: bool = Query(default=True, description="Include rendered images as data URLs; false only fills the render cache"),
+    config: Settings = Depends(get_settings),
+):
+    """
+    Parse, convert or render many scenes at once.
+
+    The body is NDJSON (one scene per line) or a JSON array of scenes; each scene may be
+    wrapped as `{"id": ..., "scene": ...}` to label its result. The response is NDJSON with
+    one line per scene as soon as it is done: `index`, `id`, `ok`, `seconds` and element,
+    graph and image sizes, or `error` for a scene that failed (the others carry on).
+    """
+    options = BatchOptions(operation=operation, format=format, thumbnail=thumbnail)
+    content_type = request.headers.get("content-type", "")
+    ndjson = True if ("ndjson" in content_type or "jsonl" in content_type) else (False if "json" in content_type else None)
+
+    async def process(index: int, raw: bytes) -> SceneOutcome:
+        outcome = await _process_batch_item(index, raw, options)
+        if outcome.image is not None:
+            await run_in_threadpool(render_cache.put, outcome.cache_key, outcome.image)
+        return outcome
+
+    body_read = asyncio.Event()
+
+    async def results():
+        try:
+            async for outcome in fan_out(scene_items(request_chunks(request, body_read), ndjson), process, _batch_concurrency(config)):
+                row = outcome.to_dict()
+                if images and outcome.image is not None:
+                    b64 = base64.b64encode(outcome.image.data).decode("ascii")
+                    row["dataUrl"] = f"data:image/{outcome.image.format};base64,{b64}"
+                yield json.dumps(row).encode("utf-8") + b"\n"
+        except BatchFormatError as e:
+            yield json.dumps({"ok": False, "error": str(e)}).encode("utf-8") + b"\n"
+
+    # Results start flowing while the body is still arriving, so the response must not
+    # compete with the body for receive() messages
+    return DuplexStreamingResponse(results(), body_read, media_type="application/x-ndjson")
+
+
+# ---------------- Metrics API ----------------
+def _component_metrics():
+    """Scrape-time metrics of the caches, the render pool and startup (see MetricsRegistry.add_collector)."""
+    caches = {"render": render_cache.stats(), "tiles": tile_cache.stats()}
+    graph = graph_cache.stats()
+    compressed = compressed_bodies.stats()
+    viewport = _viewport_index.cache_info()
+    hits = [({"cache": name}, s["memoryHits"] + s["diskHits"]) for name, s in caches.items()]
+    hits += [({"cache": "graph"}, graph["hits"]), ({"cache": "viewport"}, viewport.hits)]
+    hits += [({"cache": "compressed"}, compressed["hits"])]
+    misses = [({"cache": name}, s["misses"]) for name, s in caches.items()]
+    misses += [({"cache": "graph"}, graph["misses"]), ({"cache": "viewport"}, viewport.misses)]
+    misses += [({"cache": "compressed"}, compressed["misses"])]
+    entries = [({"cache": name}, s["memoryEntries"]) for name, s in caches.items()]
+    entries += [({"cache": "graph"}, graph["entries"]), ({"cache": "viewport"}, viewport.currsize)]
+    entries += [({"cache": "compressed"}, compressed["entries"])]
+    evictions = [({"cache": name}, s["evictions"]) for name, s in caches.items()]
+    evictions += [({"cache": "graph"}, graph["evictions"]), ({"cache": "compressed"}, compressed["evictions"])]
+    pool = render_pool.stats()
+    outcomes = [({"outcome": k}, pool[k]) for k in ("completed", "rejected", "timeouts", "failed")]
+    return [
+        ("maptopics_cache_hits_total", "counter", "Cache hits (memory or disk)", hits),
+        ("maptopics_cache_misses_total", "counter", "Cache misses", misses),
+        ("maptopics_cache_evictions_total", "counter", "Entries evicted from memory", evictions),
+        ("maptopics_cache_entries", "gauge", "Entries held in memory", entries),
+        ("maptopics_render_jobs_total", "counter", "Render pool jobs by outcome", outcomes),
+        ("maptopics_render_pending", "gauge", "Render jobs queued or running", [({}, pool["pending"])]),
+        ("maptopics_render_workers", "gauge", "Render worker processes", [({}, pool["workers"])]),
+        ("maptopics_ready", "gauge", "1 once startup warmup has finished", [({}, 1 if warmup.ready else 0)]),
+    ]
+
+
+metrics.add_collector(_component_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus text exposition of request, stage, cache and pool metrics."""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/profiler")
+def profiler_stats():
+    """Slow-request profiler settings and counters; 404 unless MAPTOPICS_PROFILE_SLOW_MS is set."""
+    if slow_profiler is None:
+        raise HTTPException(status_code=404, detail="Slow-request profiling is off (set MAPTOPICS_PROFILE_SLOW_MS)")
+    return slow_profiler.stats()
+
+
+# ---------------- Startup warmup ----------------
+# Slow initialization runs after the server starts listening instead of at import time or
+# before the first request: the render workers spawn and load matplotlib and its font cache,
+# NetworkX is imported for scene conversion, the scene templates are serialized and the search
+# index is built. /api/ready reports progress; requests that arrive earlier just do the work
+# they need themselves.
+def _import_networkx() -> None:
+    import networkx  # noqa: F401
+
+
+warmup = Warmup()
+warmup.add("renderPool", render_pool.start)
+warmup.add("networkx", _import_networkx)
+warmup.add("templates", scene_templates.load)
+warmup.add("searchIndex", _build_search_index)
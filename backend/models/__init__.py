@@ -1,7 +1,11 @@
 """Models package for MapTopics backend.
 
 Convenience exports:
-	from backend.models import ExcalidrawDocument, Element, Node, Edge
+	from backend.models import ExcalidrawDocument, Element, Node, Edge, SceneElement
+	from backend.models import LazyScene
+	from backend.models import SyncRequest
+	from backend.models import SpatialIndex, SceneSpatialIndex
+	from backend.models import ElementTable, SceneRelations
 """
 
 from .excalidraw_models import (
@@ -9,11 +13,28 @@ from .excalidraw_models import (
 	Element,
 	Node,
 	Edge,
+	SceneElement,
+	binding_target,
 )
+from .lazy_scene import LazyScene, SceneFormatError
+from .sync_models import SyncRequest
+from .spatial import SceneSpatialIndex, SpatialIndex, element_bounds
+from .columnar import ElementTable
+from .relations import SceneRelations
 
 __all__ = [
 	"ExcalidrawDocument",
 	"Element",
 	"Node",
 	"Edge",
+	"SceneElement",
+	"binding_target",
+	"LazyScene",
+	"SceneFormatError",
+	"SyncRequest",
+	"SpatialIndex",
+	"SceneSpatialIndex",
+	"element_bounds",
+	"ElementTable",
+	"SceneRelations",
 ]
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .excalidraw_models import ExcalidrawDocument
+from .spatial import Rect
+
+# Element types Excalidraw ships, with fixed type codes; any other type gets the next free
+# code in the table that contains it.
+ELEMENT_TYPES = (
+    "rectangle",
+    "ellipse",
+    "diamond",
+    "text",
+    "arrow",
+    "line",
+    "freedraw",
+    "image",
+    "frame",
+    "magicframe",
+    "embeddable",
+    "iframe",
+    "selection",
+)
+ARROW = ELEMENT_TYPES.index("arrow")
+
+# Row references (containerId, arrow bindings) that do not point at a row
+NO_ROW = -1  # the field is not set
+MISSING_ROW = -2  # the field names an element that is not in the scene
+
+_NO_EXTRA: Dict[str, object] = {}
+
+
+@dataclass
+class ElementTable:
+    """
+    Struct-of-arrays view of a document's elements, for geometry-heavy passes.
+
+    Row i is `doc.elements[i]`. Geometry and references are numpy columns, so bounding boxes,
+    extents and arrow endpoints are a few array operations over the whole scene instead of a
+    walk over pydantic models; ids and colors are interned strings, types small int codes.
+    The table is a snapshot: it is built once from the lossless models (which stay the source
+    of truth for everything else) and does not follow later edits to them.
+
+    - ids / index: element id of each row, and the first row of each id.
+    - types: (n,) type codes into `type_names` (ELEMENT_TYPES first).
+    - x, y, width, height, angle: (n,) float64; opacity: (n,) float32, 0..100.
+    - deleted: (n,) bool.
+    - container / start / end: (n,) int32 rows of the containerId and of the arrow's bound
+      elements, NO_ROW or MISSING_ROW when there is none.
+    - points / point_offsets: the points of linear elements (relative to x/y) as one (p, 2)
+      array; the points of row i are `points[point_offsets[i]:point_offsets[i + 1]]`.
+    - texts, stroke_colors, background_colors: per-row values (None when unset).
+    """
+
+    ids: List[str]
+    type_names: List[str]
+    types: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    width: np.ndarray
+    height: np.ndarray
+    angle: np.ndarray
+    opacity: np.ndarray
+    deleted: np.ndarray
+    container: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    points: np.ndarray
+    point_offsets: np.ndarray
+    texts: List[Optional[str]]
+    stroke_colors: List[Optional[str]]
+    background_colors: List[Optional[str]]
+    index: Dict[str, int] = field(init=False, repr=False)
+    first: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        index: Dict[str, int] = {}
+        for i, element_id in enumerate(self.ids):
+            index.setdefault(element_id, i)
+        self.index = index
+        # Rows that are the first with their id; later duplicates are ignored as graph nodes
+        first = np.zeros(len(self.ids), dtype=bool)
+        first[list(index.values())] = True
+        self.first = first
+
+    @classmethod
+    def from_document(cls, doc: ExcalidrawDocument) -> "ElementTable":
+        """Build the table with one pass over the document's elements."""
+        intern = sys.intern
+        ids: List[str] = []
+        type_names = list(ELEMENT_TYPES)
+        codes = {name: code for code, name in enumerate(type_names)}
+        types: List[int] = []
+        geometry: List[tuple] = []
+        deleted: List[bool] = []
+        refs: List[tuple] = []  # containerId, start element id, end element id
+        points: List[Sequence[float]] = []
+        counts: List[int] = []
+        texts: List[Optional[str]] = []
+        strokes: List[Optional[str]] = []
+        backgrounds: List[Optional[str]] = []
+
+        for el in doc.elements:
+            # Field values straight from the instance dict: getattr on a field a model class
+            # does not declare goes through pydantic's slow __getattr__.
+            d = el.__dict__
+            extra = el.__pydantic_extra__ or _NO_EXTRA
+            ids.append(intern(d["id"]))
+            code = codes.get(d["type"])
+            if code is None:
+                code = codes[d["type"]] = len(type_names)
+                type_names.append(d["type"])
+            types.append(code)
+            opacity = d["opacity"]
+            geometry.append((d["x"], d["y"], d["width"], d["height"], d["angle"] or 0.0, 100.0 if opacity is None else opacity))
+            deleted.append(d["isDeleted"] is True)
+            start = d.get("startBinding")
+            end = d.get("endBinding")
+            refs.append((d.get("containerId") or extra.get("containerId"), start.elementId if start else None, end.elementId if end else None))
+            element_points = d.get("points")
+            if element_points is None:
+                element_points = _extra_points(extra.get("points"))
+            points.extend(element_points)
+            counts.append(len(element_points))
+            texts.append(d.get("text") or extra.get("text") or None)
+            stroke, background = d["strokeColor"], d["backgroundColor"]
+            strokes.append(intern(stroke) if stroke else None)
+            backgrounds.append(intern(background) if background else None)
+
+        n = len(ids)
+        columns = np.array(geometry, dtype=np.float64).reshape(n, 6).T.copy()
+        table = cls(
+            ids=ids,
+            type_names=type_names,
+            types=np.array(types, dtype=np.uint8 if len(type_names) <= 256 else np.int32),
+            x=columns[0],
+            y=columns[1],
+            width=columns[2],
+            height=columns[3],
+            angle=columns[4],
+            opacity=columns[5].astype(np.float32),
+            deleted=np.array(deleted, dtype=bool),
+            container=np.full(n, NO_ROW, dtype=np.int32),
+            start=np.full(n, NO_ROW, dtype=np.int32),
+            end=np.full(n, NO_ROW, dtype=np.int32),
+            points=np.array(points, dtype=np.float64).reshape(-1, 2),
+            point_offsets=np.concatenate(([0], np.cumsum(counts, dtype=np.int64))),
+            texts=texts,
+            stroke_colors=strokes,
+            background_colors=backgrounds,
+        )
+        # References resolve to the first row of an id, like every other lookup by id
+        for column, refs_of in zip((table.container, table.start, table.end), zip(*refs) if n else ((), (), ())):
+            column[:] = [table.index.get(ref, MISSING_ROW) if ref else NO_ROW for ref in refs_of]
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the columns: the arrays plus one pointer per row of each list column."""
+        arrays = (self.types, self.x, self.y, self.width, self.height, self.angle, self.opacity)
+        arrays += (self.deleted, self.container, self.start, self.end, self.points, self.point_offsets)
+        return sum(a.nbytes for a in arrays) + 8 * len(self.ids) * 4
+
+    def type_mask(self, *names: str) -> np.ndarray:
+        """Rows whose type is one of `names`."""
+        codes = [self.type_names.index(name) for name in names if name in self.type_names]
+        return np.isin(self.types, codes)
+
+    def node_rows(self, include_deleted: bool = False, include_bound_text: bool = True) -> np.ndarray:
+        """
+        Rows that are graph nodes, in document order: every non-arrow element, once per id.
+        With `include_bound_text=False`, text inside a container is left out.
+        """
+        mask = (self.types != ARROW) & self.first
+        if not include_deleted:
+            mask &= ~self.deleted
+        if not include_bound_text:
+            mask &= self.container == NO_ROW
+        return np.flatnonzero(mask)
+
+    def bound_text(self, include_deleted: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows of the text bound to a container present in the scene, and their containers' rows."""
+        rows = np.flatnonzero(self.container >= 0)
+        containers = self.container[rows].astype(np.int64)
+        if not include_deleted:
+            keep = ~self.deleted[rows] & ~self.deleted[containers]
+            rows, containers = rows[keep], containers[keep]
+        return rows, containers
+
+    def merged_node_rows(self, include_deleted: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Node rows once bound text is merged into its container (see bound_text), and the
+        `redirect` for bound_arrows that sends each bound text row to its container's row
+        (None when no text is bound). The renderer and the graph adapter both merge this way.
+        """
+        rows = self.node_rows(include_deleted)
+        text_rows, container_rows = self.bound_text(include_deleted)
+        if not len(text_rows):
+            return rows, None
+        redirect = np.arange(len(self))
+        redirect[text_rows] = container_rows
+        return rows[~np.isin(rows, text_rows)], redirect
+
+    def labels(self, rows: np.ndarray, redirect: Optional[np.ndarray] = None) -> List[Optional[str]]:
+        """
+        Label of each of `rows`: its own text, or else the text merged into it through
+        `redirect` (from merged_node_rows), one line per bound text in document order.
+        """
+        texts = self.texts
+        bound: Dict[int, List[str]] = {}
+        if redirect is not None:
+            moved = np.flatnonzero(redirect != np.arange(len(self)))
+            for t, c in zip(moved.tolist(), redirect[moved].tolist()):
+                if texts[t]:
+                    bound.setdefault(c, []).append(texts[t])
+        return [texts[i] or ("\n".join(bound[i]) if i in bound else None) for i in rows.tolist()]
+
+    def bound_arrows(
+        self,
+        node_rows: np.ndarray,
+        include_deleted: bool = False,
+        redirect: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Arrows bound at both ends to one of `node_rows`, in document order: their rows, and an
+        (m, 2) array of the positions in `node_rows` of their start and end elements.
+
+        `redirect` (n,) maps every row to the row that stands for it, e.g. bound text to its
+        container once labels are merged into containers.
+        """
+        position = np.full(len(self) + 1, -1, dtype=np.int64)  # last slot catches NO_ROW/MISSING_ROW
+        position[node_rows] = np.arange(len(node_rows))
+        if redirect is not None:
+            position[:-1] = position[redirect]
+        arrows = self.types == ARROW
+        if not include_deleted:
+            arrows &= ~self.deleted
+        s = position[np.where(self.start >= 0, self.start, len(self))]
+        t = position[np.where(self.end >= 0, self.end, len(self))]
+        keep = arrows & (s >= 0) & (t >= 0)
+        return np.flatnonzero(keep), np.stack([s[keep], t[keep]], axis=1)
+
+    def bounds(self) -> np.ndarray:
+        """
+        (n, 4) axis-aligned bounding boxes (min_x, min_y, max_x, max_y) of every row, the same
+        as element_bounds of each element: linear elements are bounded by their points,
+        rotated elements by their corners rotated around the center of the unrotated box.
+        """
+        x, y, w, h = self.x, self.y, self.width, self.height
+        min_x, max_x = np.minimum(x, x + w), np.maximum(x, x + w)
+        min_y, max_y = np.minimum(y, y + h), np.maximum(y, y + h)
+
+        counts = np.diff(self.point_offsets)
+        linear = np.flatnonzero(counts)
+        if len(linear):
+            owner = np.repeat(linear, counts[linear])
+            px = x[owner] + self.points[:, 0]
+            py = y[owner] + self.points[:, 1]
+            starts = self.point_offsets[linear]
+            min_x[linear], max_x[linear] = np.minimum.reduceat(px, starts), np.maximum.reduceat(px, starts)
+            min_y[linear], max_y[linear] = np.minimum.reduceat(py, starts), np.maximum.reduceat(py, starts)
+
+        rotated = np.flatnonzero(self.angle)
+        if len(rotated):
+            # Center of the unrotated box: of the points, for linear elements
+            cx = ((min_x[rotated] + max_x[rotated]) / 2)[:, None]
+            cy = ((min_y[rotated] + max_y[rotated]) / 2)[:, None]
+            cos = np.cos(self.angle[rotated])[:, None]
+            sin = np.sin(self.angle[rotated])[:, None]
+            px = np.stack([min_x[rotated], max_x[rotated], max_x[rotated], min_x[rotated]], axis=1)
+            py = np.stack([min_y[rotated], min_y[rotated], max_y[rotated], max_y[rotated]], axis=1)
+            rx = cx + (px - cx) * cos - (py - cy) * sin
+            ry = cy + (px - cx) * sin + (py - cy) * cos
+            min_x[rotated], max_x[rotated] = rx.min(axis=1), rx.max(axis=1)
+            min_y[rotated], max_y[rotated] = ry.min(axis=1), ry.max(axis=1)
+        return np.stack([min_x, min_y, max_x, max_y], axis=1)
+
+    def scene_bounds(self, rows: Optional[np.ndarray] = None) -> Optional[Rect]:
+        """Bounding box of the given rows (default: every live element), or None if there are none."""
+        if rows is None:
+            rows = np.flatnonzero(~self.deleted)
+        if not len(rows):
+            return None
+        b = self.bounds()[rows]
+        return float(b[:, 0].min()), float(b[:, 1].min()), float(b[:, 2].max()), float(b[:, 3].max())
+
+
+def _extra_points(points) -> Sequence[Sequence[float]]:
+    """Points kept as an unvalidated extra field (lines, freedraw), or () if they are not (x, y) pairs."""
+    if not points:
+        return ()
+    try:
+        return [(float(p[0]), float(p[1])) for p in points]
+    except (TypeError, ValueError, IndexError, KeyError):
+        return ()
@@ -1,7 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple, Union
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Union
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Discriminator,
+    Field,
+    PrivateAttr,
+    SerializeAsAny,
+    Tag,
+    TypeAdapter,
+    field_validator,
+)
+
+
+# Excalidraw writes whole numbers as JSON integers (fontSize 20, x 0); keeping int as a union
+# member lets them validate and serialize unchanged instead of coming back as 20.0.
+Number = Union[int, float]
 
 
 # --- Small helper models used by elements ---
@@ -15,9 +30,9 @@ class BoundElement(BaseModel):
 class ArrowBinding(BaseModel):
     # e.g. { elementId, focus, gap, fixedPoint? }
     elementId: str
-    focus: Optional[float] = None
-    gap: Optional[float] = None
-    fixedPoint: Optional[Tuple[float, float]] = None
+    focus: Optional[Number] = None
+    gap: Optional[Number] = None
+    fixedPoint: Optional[Tuple[Number, Number]] = None
 
 
 class Element(BaseModel):
@@ -32,17 +47,17 @@ class Element(BaseModel):
     # Identity and positioning
     id: str
     type: str
-    x: float
-    y: float
-    width: float
-    height: float
-    angle: float = 0
+    x: Number
+    y: Number
+    width: Number
+    height: Number
+    angle: Number = 0
 
     # Styling
     strokeColor: Optional[str] = None
     backgroundColor: Optional[str] = None
     fillStyle: Optional[str] = None  # solid, cross-hatch, etc.
-    strokeWidth: Optional[float] = None
+    strokeWidth: Optional[Number] = None
     strokeStyle: Optional[str] = None  # solid, dashed, dotted
     roughness: Optional[int] = None
     opacity: Optional[int] = None  # 0..100
@@ -81,14 +96,14 @@ class Node(Element):
 
     # Text-related (only present for text elements or container texts)
     text: Optional[str] = None
-    fontSize: Optional[float] = None
+    fontSize: Optional[Number] = None
     fontFamily: Optional[int] = None
     textAlign: Optional[str] = None  # left | center | right
     verticalAlign: Optional[str] = None  # top | middle | bottom
     containerId: Optional[str] = None  # id of the containing element
     originalText: Optional[str] = None
     autoResize: Optional[bool] = None
-    lineHeight: Optional[float] = None
+    lineHeight: Optional[Number] = None
 
 
 class Edge(Element):
@@ -100,7 +115,7 @@ class Edge(Element):
     model_config = ConfigDict(extra="allow", populate_by_name=True)
 
     # Geometry of the polyline making the edge
-    points: List[Tuple[float, float]] = Field(default_factory=list)
+    points: List[Tuple[Number, Number]] = Field(default_factory=list)
 
     # Bindings to elements (for arrows)
     startBinding: Optional[ArrowBinding] = None
@@ -118,37 +133,105 @@ class Edge(Element):
     endIsSpecial: Optional[bool] = None
 
 
+def binding_target(binding: Any) -> Optional[str]:
+    """Id of the element an arrow binding points at; bindings may be models (Edge) or raw dicts."""
+    if binding is None:
+        return None
+    if isinstance(binding, dict):
+        return binding.get("elementId")
+    return getattr(binding, "elementId", None)
+
+
+def _element_kind(value: Any) -> str:
+    # Arrows are edges, everything else (including unknown/new types) is a node
+    el_type = value.get("type") if isinstance(value, dict) else getattr(value, "type", None)
+    return "edge" if el_type == "arrow" else "node"
+
+
+# A raw element validated straight into its final class in a single pass.
+SceneElement = Annotated[
+    Union[Annotated[Edge, Tag("edge")], Annotated[Node, Tag("node")]],
+    Discriminator(_element_kind),
+]
+
+_SCENE_ELEMENT = TypeAdapter(SceneElement)
+_SCENE_ELEMENTS = TypeAdapter(List[SceneElement])
+_ELEMENTS_OUT = TypeAdapter(List[SerializeAsAny[Element]])
+_METADATA = TypeAdapter(Dict[str, Any])
+
+
+class _RawSceneObject(BaseModel):
+    """Shape of a full export for JSON parsing: typed elements, every other key kept as extra."""
+
+    model_config = ConfigDict(extra="allow")
+
+    elements: List[SceneElement] = Field(default_factory=list)
+
+
 class ExcalidrawDocument(BaseModel):
     """
     A full Excalidraw scene/document.
 
-    - elements: list of elements (Nodes and Edges). We keep them as Element to allow unknown/new types.
+    - elements: list of elements. Raw dicts are validated once, directly into Edge (arrows)
+      or Node (everything else); plain Element instances are accepted as-is.
     - metadata: dict holding appState, files, version, source, type, and any other top-level keys so
       we can reconstruct the original JSON without loss.
     """
 
     model_config = ConfigDict(extra="allow")
 
-    elements: List[Element] = Field(default_factory=list)
+    elements: List[SerializeAsAny[Element]] = Field(default_factory=list)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
+    # Cached (nodes, edges) partition plus the list identity/length it was computed for
+    _views: Optional[Tuple[int, int, List[Node], List[Edge]]] = PrivateAttr(default=None)
+
+    @field_validator("elements", mode="before")
+    @classmethod
+    def _type_raw_elements(cls, value: Any) -> Any:
+        if isinstance(value, list) and any(isinstance(e, dict) for e in value):
+            return [_SCENE_ELEMENT.validate_python(e) if isinstance(e, dict) else e for e in value]
+        return value
+
     @property
     def nodes(self) -> List[Node]:
-        """Return elements that are considered nodes (i.e., non-arrow types) coerced as Node."""
-        result: List[Node] = []
-        for el in self.elements:
-            if el.type != "arrow":
-                result.append(Node(**el.model_dump()))
-        return result
+        """Return elements that are considered nodes (i.e., non-arrow types) as Node."""
+        return self._partition()[0]
 
     @property
     def edges(self) -> List[Edge]:
-        """Return elements that are connections (type == 'arrow') coerced as Edge."""
-        result: List[Edge] = []
-        for el in self.elements:
+        """Return elements that are connections (type == 'arrow') as Edge."""
+        return self._partition()[1]
+
+    @property
+    def node_count(self) -> int:
+        return len(self._partition()[0])
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._partition()[1])
+
+    def _partition(self) -> Tuple[List[Node], List[Edge]]:
+        """
+        Split elements into nodes and edges once and cache the result.
+
+        The cache is keyed on the elements list identity and length, so replacing or
+        growing the list recomputes it; in-place edits of element fields do not need to.
+        """
+        elements = self.elements
+        views = self._views
+        if views is not None and views[0] == id(elements) and views[1] == len(elements):
+            return views[2], views[3]
+
+        nodes: List[Node] = []
+        edges: List[Edge] = []
+        for el in elements:
             if el.type == "arrow":
-                result.append(Edge(**el.model_dump()))
-        return result
+                edges.append(el if isinstance(el, Edge) else Edge.model_validate(el.model_dump()))
+            else:
+                nodes.append(el if isinstance(el, Node) else Node.model_validate(el.model_dump()))
+        self._views = (id(elements), len(elements), nodes, edges)
+        return nodes, edges
 
     @classmethod
     def from_raw_scene(cls, data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> "ExcalidrawDocument":
@@ -156,22 +239,62 @@ class ExcalidrawDocument(BaseModel):
         Build a document from either:
         - a full Excalidraw export dict with keys: elements, appState, files, etc.
         - a bare list of elements
+
+        Each element is validated exactly once, into Node or Edge depending on its type.
         """
         if isinstance(data, list):
-            elements = [Element(**e) for e in data]
+            elements = _SCENE_ELEMENTS.validate_python(data)
             metadata: Dict[str, Any] = {}
-            return cls(elements=elements, metadata=metadata)
+            return cls.model_construct(elements=elements, metadata=metadata)
 
         # dict case
         raw = dict(data)  # shallow copy
         raw_elements = raw.pop("elements", [])
-        elements = [Element(**e) for e in raw_elements]
+        elements = _SCENE_ELEMENTS.validate_python(raw_elements)
         # Everything else is stored as metadata
         metadata = raw
-        return cls(elements=elements, metadata=metadata)
+        return cls.model_construct(elements=elements, metadata=metadata)
+
+    @classmethod
+    def from_json(cls, data: Union[bytes, str]) -> "ExcalidrawDocument":
+        """
+        Build a document straight from raw JSON (a full export object or a bare element list).
+
+        Parsing and element validation happen in a single pass inside pydantic-core, without
+        building an intermediate dict for every element. Raises pydantic.ValidationError on
+        malformed JSON or invalid elements.
+        """
+        head = data.lstrip()[:1]
+        if head in (b"[", "["):
+            elements = _SCENE_ELEMENTS.validate_json(data)
+            return cls.model_construct(elements=elements, metadata={})
+
+        raw = _RawSceneObject.model_validate_json(data)
+        return cls.model_construct(elements=raw.elements, metadata=dict(raw.model_extra or {}))
 
     def to_raw_scene(self) -> Dict[str, Any]:
         """Reconstruct a full Excalidraw JSON payload (dict) from this document."""
         out: Dict[str, Any] = {**self.metadata}
         out["elements"] = [e.model_dump(exclude_none=True) for e in self.elements]
         return out
+
+    def to_raw_scene_json(self) -> bytes:
+        """
+        Same payload as to_raw_scene, serialized directly to JSON bytes.
+
+        Elements are dumped with exclude_none while metadata is kept verbatim (appState
+        legitimately contains nulls), so the two parts are serialized separately and spliced.
+        """
+        elements = self.elements_json()
+        metadata = self.metadata_json()
+        if metadata == b"{}":
+            return b'{"elements":' + elements + b"}"
+        return metadata[:-1] + b',"elements":' + elements + b"}"
+
+    def elements_json(self) -> bytes:
+        """The elements array as JSON bytes (None-valued fields omitted, like to_raw_scene)."""
+        return _ELEMENTS_OUT.dump_json(self.elements, exclude_none=True)
+
+    def metadata_json(self) -> bytes:
+        """The top-level keys other than `elements` as a JSON object, verbatim."""
+        return _METADATA.dump_json({k: v for k, v in self.metadata.items() if k != "elements"})
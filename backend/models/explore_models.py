@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+# Pydantic models for the explore feed API responses
+class Source(BaseModel):
+    title: str
+    url: str
+    favicon: Optional[str] = None
+
+
+class ExploreCard(BaseModel):
+    id: int
+    topic: str
+    description: str
+    sources: List[Source]
+
+
+class ExploreResponse(BaseModel):
+    cards: List[ExploreCard]
+    has_more: bool
+    total_count: int
+    # Opaque token for the page after this one; None on the last page
+    next_cursor: Optional[str] = None
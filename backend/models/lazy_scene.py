@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import json
+import mmap
+import re
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .excalidraw_models import ExcalidrawDocument, Element, _SCENE_ELEMENT
+
+# Anything that supports slicing and the buffer protocol: bytes, bytearray, mmap
+Buffer = Union[bytes, bytearray, mmap.mmap]
+Span = Tuple[int, int]
+
+_WS = re.compile(rb"[ \t\n\r]*")
+# Unrolled string pattern: runs of plain characters, then escape + run, never one char at a time,
+# so multi-megabyte base64 strings are skipped in a single match.
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+# Everything up to the next bracket that changes nesting depth: plain characters, whole
+# strings and flat arrays of scalars (e.g. point pairs) are consumed in one match.
+_UNTIL_BRACKET = re.compile(rb'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*"|\[[^"{}\[\]]*\])*', re.S)
+_SCALAR = re.compile(rb"[^,}\]\s]+")
+
+_QUOTE, _LBRACE, _RBRACE, _LBRACKET, _RBRACKET, _COMMA, _COLON = b'"{}[],:'
+
+
+class SceneFormatError(ValueError):
+    """The body is not a well-formed Excalidraw scene (export object or element list)."""
+
+
+class LazyScene:
+    """
+    Byte-range index over a raw Excalidraw scene, built without parsing it.
+
+    One scan over the buffer records where each element object, each embedded file and each
+    other top-level value starts and ends. Nothing is decoded until asked for, and elements
+    are then decoded one at a time, so memory stays bounded by the largest single element
+    rather than the whole object tree. `files` (base64 images) are never decoded unless a
+    caller asks for a specific file.
+
+    The buffer can be bytes or an mmap (see `from_file`), so large request bodies spooled
+    to disk are scanned without being read into memory at all.
+    """
+
+    def __init__(self, buffer: Buffer):
+        self._buf = buffer
+        self._mmap: Optional[mmap.mmap] = buffer if isinstance(buffer, mmap.mmap) else None
+        self.is_list = False
+        self.has_files = False
+        self.element_spans: List[Span] = []
+        self.file_spans: Dict[str, Span] = {}
+        self.key_spans: Dict[str, Span] = {}
+        self._keys: List[str] = []  # top-level keys in document order
+        self._scan()
+
+    @classmethod
+    def from_file(cls, f: IO[bytes]) -> "LazyScene":
+        """Map an on-disk file (e.g. a spooled request body) instead of reading it."""
+        f.flush()
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file cannot be mapped
+            raise SceneFormatError("empty body")
+        return cls(mapped)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "LazyScene":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # --- queries ---
+
+    @property
+    def element_count(self) -> int:
+        return len(self.element_spans)
+
+    @property
+    def metadata_keys(self) -> List[str]:
+        """Top-level keys other than `elements`, in document order."""
+        return [k for k in self._keys if k != "elements"]
+
+    def raw_element(self, i: int) -> bytes:
+        start, end = self.element_spans[i]
+        return bytes(self._buf[start:end])
+
+    def iter_elements(self, fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Decode elements one at a time, keeping only `fields` when given."""
+        keep = set(fields) if fields is not None else None
+        for start, end in self.element_spans:
+            el = self._decode(start, end)
+            if keep is not None:
+                el = {k: v for k, v in el.items() if k in keep}
+            yield el
+
+    def counts(self, validate: bool = False) -> Dict[str, int]:
+        """
+        Element, node and edge counts.
+
+        By default only each element's `type` is looked at. With `validate`, every element
+        is fully validated (one at a time, then dropped), raising pydantic.ValidationError
+        on the first invalid one.
+        """
+        if validate:
+            types = (el.type for el in self.elements())
+        else:
+            types = (el.get("type") for el in self.iter_elements(("type",)))
+        edges = sum(1 for t in types if t == "arrow")
+        return {"elements": self.element_count, "nodes": self.element_count - edges, "edges": edges}
+
+    def metadata(self, include_files: bool = False) -> Dict[str, Any]:
+        """Decode the top-level keys other than `elements`; `files` only when asked."""
+        out: Dict[str, Any] = {}
+        for key in self.metadata_keys:
+            if key == "files" and self.has_files:
+                if include_files:
+                    out[key] = {fid: self._decode(s, e) for fid, (s, e) in self.file_spans.items()}
+            elif key in self.key_spans:
+                out[key] = self._decode(*self.key_spans[key])
+        return out
+
+    def raw_value(self, key: str) -> Optional[bytes]:
+        """Raw JSON of a top-level value other than `elements` and `files`, or None if absent."""
+        if key not in self.key_spans:
+            return None
+        start, end = self.key_spans[key]
+        return bytes(self._buf[start:end])
+
+    def file_bytes(self, file_id: str) -> memoryview:
+        """Raw JSON of one embedded file entry, as a view into the buffer (no copy)."""
+        start, end = self.file_spans[file_id]
+        return memoryview(self._buf)[start:end]
+
+    def elements(self) -> Iterator[Element]:
+        """Validate elements one at a time straight from their byte ranges."""
+        for start, end in self.element_spans:
+            yield _SCENE_ELEMENT.validate_json(self._buf[start:end])
+
+    def to_document(self, include_files: bool = False) -> ExcalidrawDocument:
+        """Fully typed document; `files` are left out unless `include_files` is set."""
+        return ExcalidrawDocument.model_construct(
+            elements=list(self.elements()),
+            metadata=self.metadata(include_files=include_files),
+        )
+
+    def _decode(self, start: int, end: int) -> Any:
+        # The scan only balances brackets and quotes, so a value can still be invalid inside
+        try:
+            return json.loads(self._buf[start:end])
+        except ValueError as e:  # JSONDecodeError, or UnicodeDecodeError on bad UTF-8
+            raise SceneFormatError(f"invalid JSON at byte {start}: {e}") from None
+
+    # --- scanning ---
+
+    def _scan(self) -> None:
+        buf = self._buf
+        pos = self._ws(0)
+        if pos >= len(buf):
+            raise SceneFormatError("empty body")
+        head = buf[pos]
+        if head == _LBRACKET:
+            self.is_list = True
+            pos = self._scan_elements(pos)
+        elif head == _LBRACE:
+            pos = self._scan_object(pos)
+        else:
+            raise SceneFormatError("expected a scene object or an element list")
+        if self._ws(pos) != len(buf):
+            raise SceneFormatError(f"unexpected data after the scene at byte {pos}")
+
+    def _scan_object(self, pos: int) -> int:
+        buf = self._buf
+        pos = self._ws(pos + 1)
+        if pos < len(buf) and buf[pos] == _RBRACE:
+            return pos + 1
+        while True:
+            key, pos = self._key(pos)
+            self._keys.append(key)
+            head = buf[pos] if pos < len(buf) else None
+            if key == "elements":
+                if head != _LBRACKET:
+                    raise SceneFormatError(f"'elements' at byte {pos} is not an array")
+                pos = self._scan_elements(pos)
+            elif key == "files" and head == _LBRACE:
+                self.has_files = True
+                pos = self._scan_files(pos)
+            else:
+                end = self._skip_value(pos)
+                # Metadata values are small (appState, source, ...), so they are checked here
+                # rather than on first use; only elements and files stay undecoded
+                self._decode(pos, end)
+                self.key_spans[key] = (pos, end)
+                pos = end
+            pos, closed = self._next(pos, _RBRACE)
+            if closed:
+                return pos
+
+    def _scan_files(self, pos: int) -> int:
+        buf = self._buf
+        pos = self._ws(pos + 1)
+        if pos < len(buf) and buf[pos] == _RBRACE:
+            return pos + 1
+        while True:
+            file_id, pos = self._key(pos)
+            end = self._skip_value(pos)
+            self.file_spans[file_id] = (pos, end)
+            pos, closed = self._next(end, _RBRACE)
+            if closed:
+                return pos
+
+    def _scan_elements(self, pos: int) -> int:
+        buf = self._buf
+        pos = self._ws(pos + 1)
+        if pos < len(buf) and buf[pos] == _RBRACKET:
+            return pos + 1
+        while True:
+            if pos >= len(buf):
+                raise SceneFormatError("unterminated element list")
+            if buf[pos] != _LBRACE:
+                raise SceneFormatError(f"element at byte {pos} is not an object")
+            end = self._skip_value(pos)
+            self.element_spans.append((pos, end))
+            pos, closed = self._next(end, _RBRACKET)
+            if closed:
+                return pos
+
+    def _key(self, pos: int) -> Tuple[str, int]:
+        """Parse `"key":` at `pos`; return the key and the start of its value."""
+        buf = self._buf
+        m = _STRING.match(buf, pos)
+        if m is None:
+            raise SceneFormatError(f"expected a key at byte {pos}")
+        pos = self._ws(m.end())
+        if pos >= len(buf) or buf[pos] != _COLON:
+            raise SceneFormatError(f"expected ':' at byte {pos}")
+        try:
+            key = json.loads(m.group())
+        except ValueError as e:  # bad escape, or UnicodeDecodeError on bad UTF-8
+            raise SceneFormatError(f"invalid key at byte {m.start()}: {e}") from None
+        return key, self._ws(pos + 1)
+
+    def _next(self, pos: int, close: int) -> Tuple[int, bool]:
+        """After a member/item: skip a ',' (not closed) or the closing bracket (closed)."""
+        buf = self._buf
+        pos = self._ws(pos)
+        if pos < len(buf):
+            if buf[pos] == _COMMA:
+                return self._ws(pos + 1), False
+            if buf[pos] == close:
+                return pos + 1, True
+        raise SceneFormatError(f"expected ',' or {chr(close)!r} at byte {pos}")
+
+    def _skip_value(self, pos: int) -> int:
+        """Return the position just past the JSON value starting at `pos`."""
+        buf = self._buf
+        if pos >= len(buf):
+            raise SceneFormatError("unexpected end of body")
+        head = buf[pos]
+        if head == _QUOTE:
+            m = _STRING.match(buf, pos)
+            if m is None:
+                raise SceneFormatError(f"unterminated string at byte {pos}")
+            return m.end()
+        if head == _LBRACE or head == _LBRACKET:
+            depth = 0
+            i = pos
+            end = len(buf)
+            while True:
+                i = _UNTIL_BRACKET.match(buf, i).end()
+                if i >= end:
+                    raise SceneFormatError(f"unterminated value starting at byte {pos}")
+                ch = buf[i]
+                if ch == _QUOTE:
+                    raise SceneFormatError(f"unterminated string at byte {i}")
+                depth += 1 if ch in (_LBRACE, _LBRACKET) else -1
+                i += 1
+                if depth == 0:
+                    return i
+        m = _SCALAR.match(buf, pos)
+        if m is None:
+            raise SceneFormatError(f"expected a value at byte {pos}")
+        return m.end()
+
+    def _ws(self, pos: int) -> int:
+        return _WS.match(self._buf, pos).end()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .excalidraw_models import ExcalidrawDocument
+
+
+@dataclass
+class SceneRelations:
+    """
+    Who belongs to whom in a scene, indexed once so each lookup is a dict access.
+
+    - containers: bound text id -> id of its container (a shape, or an arrow for arrow labels).
+    - texts: container id -> ids of the text bound to it.
+    - groups: group id -> member ids. An element lists its groups innermost first, so the
+      last of its groupIds is the outermost group it belongs to.
+    - frames: frame id -> ids of the elements inside it.
+    - arrows: element id -> ids of the arrows bound to it, from the arrows' start/end
+      bindings and from the element's own `boundElements`.
+
+    Only references between elements present in the scene are kept; deleted elements are
+    left out unless `include_deleted` is set. Every list is in document order.
+    """
+
+    containers: Dict[str, str] = field(default_factory=dict)
+    texts: Dict[str, List[str]] = field(default_factory=dict)
+    groups: Dict[str, List[str]] = field(default_factory=dict)
+    frames: Dict[str, List[str]] = field(default_factory=dict)
+    arrows: Dict[str, List[str]] = field(default_factory=dict)
+    _text: Dict[str, str] = field(default_factory=dict, repr=False)
+    _outer_group: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_document(cls, doc: ExcalidrawDocument, include_deleted: bool = False) -> "SceneRelations":
+        """Build the index with one pass over the elements (references may point forward)."""
+        present: Dict[str, str] = {}  # id -> type, first element of each id
+        contained: List[Tuple[str, str]] = []
+        framed: List[Tuple[str, str]] = []
+        bindings: List[Tuple[str, str]] = []  # (element id, arrow id)
+        rel = cls()
+        for el in doc.elements:
+            d = el.__dict__
+            extra = el.__pydantic_extra__ or {}
+            if d["isDeleted"] and not include_deleted:
+                continue
+            element_id = d["id"]
+            if element_id in present:
+                continue
+            present[element_id] = d["type"]
+            text = d.get("text") or extra.get("text")
+            if text:
+                rel._text[element_id] = text
+            container_id = d.get("containerId") or extra.get("containerId")
+            if container_id:
+                contained.append((element_id, container_id))
+            if d["frameId"]:
+                framed.append((element_id, d["frameId"]))
+            group_ids = d["groupIds"]
+            if group_ids:
+                for group_id in group_ids:
+                    rel.groups.setdefault(group_id, []).append(element_id)
+                rel._outer_group[element_id] = group_ids[-1]
+            if d["type"] == "arrow":
+                for binding in (d.get("startBinding"), d.get("endBinding")):
+                    if binding is not None:
+                        bindings.append((binding.elementId, element_id))
+            for bound in d["boundElements"] or ():
+                if bound.type == "arrow":
+                    bindings.append((element_id, bound.id))
+
+        for text_id, container_id in contained:
+            if container_id in present:
+                rel.containers[text_id] = container_id
+                rel.texts.setdefault(container_id, []).append(text_id)
+        for element_id, frame_id in framed:
+            if frame_id in present:
+                rel.frames.setdefault(frame_id, []).append(element_id)
+        seen = set()
+        for element_id, arrow_id in bindings:
+            # Both sides usually record the same binding; boundElements can also be stale
+            if (element_id, arrow_id) in seen or present.get(arrow_id) != "arrow" or element_id not in present:
+                continue
+            seen.add((element_id, arrow_id))
+            rel.arrows.setdefault(element_id, []).append(arrow_id)
+        return rel
+
+    def container(self, text_id: str) -> Optional[str]:
+        return self.containers.get(text_id)
+
+    def bound_texts(self, container_id: str) -> List[str]:
+        return self.texts.get(container_id, [])
+
+    def label(self, element_id: str) -> Optional[str]:
+        """The element's own text, or else the text bound to it (one line per bound text)."""
+        own = self._text.get(element_id)
+        if own:
+            return own
+        bound = [self._text[t] for t in self.texts.get(element_id, ()) if t in self._text]
+        return "\n".join(bound) if bound else None
+
+    def members(self, group_id: str) -> List[str]:
+        return self.groups.get(group_id, [])
+
+    def children(self, frame_id: str) -> List[str]:
+        return self.frames.get(frame_id, [])
+
+    def bound_arrows(self, element_id: str) -> List[str]:
+        return self.arrows.get(element_id, [])
+
+    def outermost_group(self, element_id: str) -> Optional[str]:
+        return self._outer_group.get(element_id)
+
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .excalidraw_models import binding_target
+from .lazy_scene import LazyScene
+
+# Element fields read to place an element and find what is bound to it.
+SPATIAL_FIELDS = (
+    "id",
+    "type",
+    "x",
+    "y",
+    "width",
+    "height",
+    "angle",
+    "points",
+    "isDeleted",
+    "containerId",
+    "startBinding",
+    "endBinding",
+    "fileId",
+)
+
+# Grid cells per axis at most; queries are clamped to the indexed extent, so cell numbers
+# stay within [0, MAX_CELLS_PER_AXIS] and fit the 32-bit halves of a cell key.
+MAX_CELLS_PER_AXIS = 1 << 30
+
+# Elements covering more grid cells than this are kept in a side list checked by every query,
+# so one huge frame or background shape does not flood the grid.
+MAX_CELLS_PER_ELEMENT = 64
+
+Rect = Tuple[float, float, float, float]  # min_x, min_y, max_x, max_y
+
+
+def element_bounds(el: Mapping[str, Any]) -> Rect:
+    """
+    Axis-aligned bounding box of a raw element, in scene coordinates.
+
+    Linear elements (arrows, lines, freedraw) are bounded by their points, which are
+    relative to x/y. Rotated elements are bounded by their rotated corners; Excalidraw
+    rotates around the center of the unrotated box, which for a linear element is the box
+    of its points (they may extend left of or above x/y).
+    """
+    x = float(el.get("x") or 0.0)
+    y = float(el.get("y") or 0.0)
+    points = el.get("points")
+    if points:
+        xs = [x + float(p[0]) for p in points]
+        ys = [y + float(p[1]) for p in points]
+        min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+    else:
+        w = float(el.get("width") or 0.0)
+        h = float(el.get("height") or 0.0)
+        min_x, max_x = min(x, x + w), max(x, x + w)
+        min_y, max_y = min(y, y + h), max(y, y + h)
+
+    angle = float(el.get("angle") or 0.0)
+    if angle:
+        cx, cy = (min_x + max_x) / 2, (min_y + max_y) / 2
+        cos, sin = math.cos(angle), math.sin(angle)
+        corners = [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)]
+        xs = [cx + (px - cx) * cos - (py - cy) * sin for px, py in corners]
+        ys = [cy + (px - cx) * sin + (py - cy) * cos for px, py in corners]
+        min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+    return min_x, min_y, max_x, max_y
+
+
+class SpatialIndex:
+    """
+    Uniform-grid index over axis-aligned boxes.
+
+    Every box is registered in each grid cell it overlaps; the (cell, box) pairs are kept as
+    sorted numpy arrays, so building is a few array operations and a query is a binary
+    search per visited cell plus an exact overlap test on the candidates. The cell size
+    defaults to twice the median box extent, which keeps most boxes in 1-4 cells.
+
+    A query whose rectangle covers more cells than there are occupied cells just tests
+    every box, which is what a zoomed-out viewport needs anyway.
+    """
+
+    def __init__(self, bounds: np.ndarray, cell_size: Optional[float] = None):
+        self.bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        n = len(self.bounds)
+        extent = np.maximum(self.bounds[:, 2] - self.bounds[:, 0], self.bounds[:, 3] - self.bounds[:, 1])
+        if cell_size is None:
+            cell_size = 2.0 * float(np.median(extent)) if n else 1.0
+        self.origin = self.bounds[:, :2].min(axis=0) if n else np.zeros(2)
+        self._extent = (*self.origin, *self.bounds[:, 2:].max(axis=0)) if n else None
+        # Cells are numbered from the origin and packed two per int64 key (see _key), so a
+        # widely spread scene gets coarser cells rather than cell numbers that overflow
+        reach = float(max(self._extent[2] - self._extent[0], self._extent[3] - self._extent[1])) if n else 0.0
+        self.cell_size = max(float(cell_size), 1e-6, reach / MAX_CELLS_PER_AXIS)
+
+        c0 = self._cells(self.bounds[:, :2])
+        c1 = self._cells(self.bounds[:, 2:])
+        span = c1 - c0 + 1
+        counts = span[:, 0] * span[:, 1]
+        self._oversized = np.flatnonzero(counts > MAX_CELLS_PER_ELEMENT)
+        small = np.flatnonzero(counts <= MAX_CELLS_PER_ELEMENT)
+
+        # One (cell key, box) pair per covered cell, enumerated without a Python loop
+        reps = counts[small]
+        box = np.repeat(small, reps)
+        rank = np.arange(int(reps.sum())) - np.repeat(np.cumsum(reps) - reps, reps)
+        width = span[box, 0]
+        cx = c0[box, 0] + rank % width
+        cy = c0[box, 1] + rank // width
+        keys = self._key(cx, cy)
+        order = np.argsort(keys, kind="stable")
+        self._boxes = box[order]
+        self._keys, self._starts = np.unique(keys[order], return_index=True)
+        self._ends = np.append(self._starts[1:], len(self._boxes))
+
+    @classmethod
+    def from_elements(cls, elements: Iterable[Mapping[str, Any]], cell_size: Optional[float] = None) -> "SpatialIndex":
+        return cls(np.array([element_bounds(el) for el in elements], dtype=np.float64), cell_size)
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def query(self, rect: Rect) -> np.ndarray:
+        """Indices of the boxes overlapping `rect` (edges touching count), ascending."""
+        min_x, min_y, max_x, max_y = rect
+        if self._extent is None:
+            return np.empty(0, dtype=np.int64)
+        e_min_x, e_min_y, e_max_x, e_max_y = self._extent
+        # Also false for NaN coordinates
+        if not (min_x <= e_max_x and max_x >= e_min_x and min_y <= e_max_y and max_y >= e_min_y):
+            return np.empty(0, dtype=np.int64)
+        # Only the part of the rectangle over the boxes is looked up, so far-out (or infinite)
+        # viewport coordinates cannot overflow the cell numbers
+        corners = np.array([[max(min_x, e_min_x), max(min_y, e_min_y)], [min(max_x, e_max_x), min(max_y, e_max_y)]])
+        (cx0, cy0), (cx1, cy1) = self._cells(corners)
+        # Python ints: a wide query over a fine grid covers more cells than an int64 holds
+        n_cells = max(0, int(cx1) - int(cx0) + 1) * max(0, int(cy1) - int(cy0) + 1)
+        if n_cells > len(self._keys):
+            candidates = np.arange(len(self.bounds))
+        else:
+            gx, gy = np.meshgrid(np.arange(cx0, cx1 + 1), np.arange(cy0, cy1 + 1), indexing="ij")
+            keys = self._key(gx.ravel(), gy.ravel())
+            slot = np.searchsorted(self._keys, keys)
+            found = slot < len(self._keys)
+            found[found] = self._keys[slot[found]] == keys[found]
+            slot = slot[found]
+            starts, ends = self._starts[slot], self._ends[slot]
+            lengths = ends - starts
+            positions = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(int(lengths.sum()))
+            candidates = np.unique(np.concatenate([self._boxes[positions], self._oversized]))
+        b = self.bounds[candidates]
+        hit = (b[:, 0] <= max_x) & (b[:, 2] >= min_x) & (b[:, 1] <= max_y) & (b[:, 3] >= min_y)
+        return candidates[hit]
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    @staticmethod
+    def _key(cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        # Cells left of/above the origin (query rectangles may extend there) stay distinct
+        return (cx + (1 << 31)) << 32 | (cy + (1 << 31))
+
+
+class SceneSpatialIndex:
+    """
+    Spatial index over the live elements of a raw scene, for viewport loading.
+
+    Built from a LazyScene: only the placement and binding fields of each element are
+    decoded, and visible elements are returned as their original JSON bytes. Besides the
+    elements overlapping the viewport, a query returns the arrows bound to any of them and
+    the container/bound-text partner of any of them, so the client never receives half of
+    a labeled box or a box without its connections.
+    """
+
+    def __init__(self, lazy: LazyScene, cell_size: Optional[float] = None):
+        raw: List[bytes] = []
+        elements: List[Dict[str, Any]] = []
+        for i, el in enumerate(lazy.iter_elements(SPATIAL_FIELDS)):
+            if el.get("isDeleted"):
+                continue
+            raw.append(lazy.raw_element(i))
+            elements.append(el)
+        self._raw = raw
+        self.ids = [el.get("id") for el in elements]
+        self._file_ids = {i: el["fileId"] for i, el in enumerate(elements) if el.get("fileId")}
+        self.index = SpatialIndex.from_elements(elements, cell_size)
+
+        position = {element_id: i for i, element_id in enumerate(self.ids)}
+        related: Dict[int, List[int]] = {}
+        for i, el in enumerate(elements):
+            partners = [el.get("containerId")]
+            if el.get("type") == "arrow":
+                partners += [binding_target(el.get("startBinding")), binding_target(el.get("endBinding"))]
+            for partner_id in partners:
+                j = position.get(partner_id) if partner_id else None
+                if j is not None:
+                    related.setdefault(j, []).append(i)  # arrow / bound text of j
+                    if el.get("containerId") == partner_id:
+                        related.setdefault(i, []).append(j)  # text -> its container
+        self._related = related
+
+    @classmethod
+    def from_json(cls, data: bytes, cell_size: Optional[float] = None) -> "SceneSpatialIndex":
+        """Index a serialized scene or element array."""
+        return cls(LazyScene(data), cell_size)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def visible(self, rect: Rect) -> List[int]:
+        """Elements overlapping `rect` plus their bound arrows and text/containers, in z-order."""
+        hits = self.index.query(rect).tolist()
+        extra = {j for i in hits for j in self._related.get(i, ())}
+        return sorted(extra.union(hits))
+
+    def elements_json(self, indices: Sequence[int]) -> bytes:
+        """The selected elements as a JSON array, from their original bytes."""
+        return b"[" + b",".join(self._raw[i] for i in indices) + b"]"
+
+    def file_ids(self, indices: Sequence[int]) -> List[str]:
+        """Ids of the embedded files (images) used by the selected elements."""
+        return sorted({self._file_ids[i] for i in indices if i in self._file_ids})
+
+    def bounds(self) -> Optional[Rect]:
+        """Bounding box of the whole scene, or None if it is empty."""
+        if not len(self.index):
+            return None
+        b = self.index.bounds
+        return float(b[:, 0].min()), float(b[:, 1].min()), float(b[:, 2].max()), float(b[:, 3].max())
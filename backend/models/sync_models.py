@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from .excalidraw_models import SceneElement
+
+
+# Request body of POST /api/mindmaps/{slug}/sync
+class SyncRequest(BaseModel):
+    # Revision the client last synced to (0 = has nothing yet)
+    sinceRevision: int = Field(default=0, ge=0)
+    # Elements whose version changed locally since then; deletions are sent as isDeleted=true
+    elements: List[SceneElement] = Field(default_factory=list)
@@ -0,0 +1,52 @@
+"""Rendering utilities for MapTopics backend.
+
+Convenience exports:
+    from backend.render import RenderCache, RenderPool, render_scene, scene_from_table, scene_from_graph
+    from backend.render import TileSet, render_tile
+    from backend.render import SvgRenderer, render_svg
+"""
+
+from .cache import RenderCache, RenderResult, render_cache_key, render_variant_key
+from .matplotlib_renderer import (
+    IMAGE_FORMATS,
+    THUMBNAIL_MAX_SIZE,
+    RenderScene,
+    draw_scene,
+    init_matplotlib,
+    render_scene,
+    scene_from_graph,
+    scene_from_table,
+)
+from .pool import RenderPool, RenderPoolBusy, RenderTimeout
+from .svg import SvgRenderer, render_svg, svg_cache_key
+from .tiles import MAX_ZOOM, MIN_ZOOM, TILE_SIZE, TileJob, TileSet, TileSetCache, render_tile, tile_rect, tile_scale
+
+__all__ = [
+    "RenderCache",
+    "RenderResult",
+    "render_cache_key",
+    "render_variant_key",
+    "IMAGE_FORMATS",
+    "THUMBNAIL_MAX_SIZE",
+    "RenderScene",
+    "draw_scene",
+    "init_matplotlib",
+    "render_scene",
+    "scene_from_graph",
+    "scene_from_table",
+    "RenderPool",
+    "RenderPoolBusy",
+    "RenderTimeout",
+    "SvgRenderer",
+    "render_svg",
+    "svg_cache_key",
+    "TILE_SIZE",
+    "MIN_ZOOM",
+    "MAX_ZOOM",
+    "TileJob",
+    "TileSet",
+    "TileSetCache",
+    "render_tile",
+    "tile_rect",
+    "tile_scale",
+]
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import ExcalidrawDocument, binding_target
+
+# Bump whenever the drawing code or the disk format changes so stale images on disk are never served.
+RENDERER_VERSION = 4
+
+# Fields of non-arrow elements that influence the rendered image.
+_NODE_RENDER_FIELDS = ("id", "type", "x", "y", "width", "height", "text", "containerId", "backgroundColor", "strokeColor")
+
+# Disk entries are stored as a fixed header (width, height, format padded with NULs) followed
+# by the image bytes.
+_DISK_HEADER = struct.Struct(">II8s")
+
+
+@dataclass(frozen=True)
+class RenderResult:
+    """
+    A rendered image plus the logical size reported back to clients.
+
+    `stages` holds (name, seconds) timings measured while rendering, possibly in a worker
+    process, so the API process can record them; results read back from disk have none.
+    """
+
+    format: str
+    width: int
+    height: int
+    data: bytes
+    stages: Tuple[Tuple[str, float], ...] = field(default=(), compare=False)
+
+
+def render_cache_key(doc: ExcalidrawDocument, variant: str = "png") -> str:
+    """
+    Compute a content hash of everything in the scene that influences the rendered image.
+
+    Only non-deleted elements are considered, and only the fields the renderer reads, so
+    unrelated edits (seed, version bumps, appState, files) still hit the cache.
+    """
+    canonical: List[Any] = [RENDERER_VERSION, variant]
+    for el in doc.elements:
+        if el.isDeleted:
+            continue
+        if el.type == "arrow":
+            start = getattr(el, "startBinding", None)
+            end = getattr(el, "endBinding", None)
+            canonical.append([
+                "e",
+                el.id,
+                binding_target(start),
+                binding_target(end),
+            ])
+        else:
+            canonical.append(["n"] + [getattr(el, f, None) for f in _NODE_RENDER_FIELDS])
+
+    blob = json.dumps(canonical, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def render_variant_key(key: str, format: str = "png", max_size: Optional[int] = None) -> str:
+    """
+    Cache key of one encoding/size of a scene, derived from its render_cache_key.
+
+    The full-size PNG keeps the plain key and other variants get a suffix, so every variant
+    of a scene is found without hashing the scene again.
+    """
+    suffix = format if format != "png" else ""
+    if max_size:
+        suffix += f"{'-' if suffix else ''}max{max_size}"
+    return f"{key}-{suffix}" if suffix else key
+
+
+def _mtime_or_zero(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+class RenderCache:
+    """
+    Two-tier cache for rendered scenes.
+
+    - memory: bounded LRU of the most recent results.
+    - disk: optional directory of previously rendered images, evicted least recently used
+      first once it holds more than `max_disk_entries` files. Disk hits are promoted to
+      memory. Which files exist, in LRU order, is tracked in memory: the directory is listed
+      once (by modification time, which reads refresh) on first use, not on every write.
+
+    All operations are thread-safe; sync endpoints call into it from the threadpool.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        disk_dir: Optional[Path] = None,
+        max_disk_entries: int = 2048,
+    ):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, RenderResult]" = OrderedDict()
+        self._disk: "Optional[OrderedDict[str, None]]" = None  # keys on disk, least recent first
+        self._lock = threading.Lock()
+        self._stats = {"memoryHits": 0, "diskHits": 0, "misses": 0, "evictions": 0, "diskErrors": 0}
+
+    def get(self, key: str) -> Optional[RenderResult]:
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self._stats["memoryHits"] += 1
+                return result
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["diskHits"] += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: RenderResult) -> None:
+        with self._lock:
+            self._remember(key, result)
+        self._write_disk(key, result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._disk = None
+        if self.disk_dir and self.disk_dir.is_dir():
+            for path in self.disk_dir.glob("*.render"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["memoryEntries"] = len(self._memory)
+            stats["maxEntries"] = self.max_entries
+        lookups = stats["memoryHits"] + stats["diskHits"] + stats["misses"]
+        stats["hitRatio"] = (stats["memoryHits"] + stats["diskHits"]) / lookups if lookups else 0.0
+        stats["diskEnabled"] = self.disk_dir is not None
+        return stats
+
+    # --- internals ---
+
+    def _remember(self, key: str, result: RenderResult) -> None:
+        # Caller holds the lock
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _path_for(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / f"{key}.render"
+
+    def _read_disk(self, key: str) -> Optional[RenderResult]:
+        if self.disk_dir is None:
+            return None
+        path = self._path_for(key)
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._disk_keys().pop(key, None)  # removed behind our back
+            return None
+        except OSError:
+            self._count_disk_error()
+            return None
+        if len(raw) < _DISK_HEADER.size:
+            return None
+        width, height, format = _DISK_HEADER.unpack_from(raw)
+        with self._lock:
+            self._disk_keys()[key] = None
+            self._disk_keys().move_to_end(key)
+        try:
+            os.utime(path)  # so the LRU order survives a restart
+        except OSError:
+            pass
+        return RenderResult(
+            format=format.rstrip(b"\0").decode("ascii"),
+            width=width,
+            height=height,
+            data=raw[_DISK_HEADER.size:],
+        )
+
+    def _write_disk(self, key: str, result: RenderResult) -> None:
+        if self.disk_dir is None or self.max_disk_entries <= 0:
+            return
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path_for(key)
+            # Write to a temp file first so concurrent readers never see a partial image
+            tmp = path.with_suffix(f".tmp{os.getpid()}-{threading.get_ident()}")
+            tmp.write_bytes(_DISK_HEADER.pack(result.width, result.height, result.format.encode("ascii")) + result.data)
+            os.replace(tmp, path)
+            self._evict_disk(key)
+        except OSError:
+            self._count_disk_error()
+
+    def _disk_keys(self) -> "OrderedDict[str, None]":
+        # Caller holds the lock. Lists the directory only the first time.
+        if self._disk is None:
+            assert self.disk_dir is not None
+            paths = sorted(self.disk_dir.glob("*.render"), key=_mtime_or_zero) if self.disk_dir.is_dir() else []
+            self._disk = OrderedDict((path.stem, None) for path in paths)
+        return self._disk
+
+    def _evict_disk(self, key: str) -> None:
+        """Record `key` as the most recent disk entry and delete the oldest past the limit."""
+        with self._lock:
+            keys = self._disk_keys()
+            keys[key] = None
+            keys.move_to_end(key)
+            evicted = [keys.popitem(last=False)[0] for _ in range(len(keys) - self.max_disk_entries)]
+        for old in evicted:
+            try:
+                self._path_for(old).unlink()
+            except OSError:
+                pass
+
+    def _count_disk_error(self) -> None:
+        with self._lock:
+            self._stats["diskErrors"] += 1
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import io
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from models.columnar import ElementTable
+
+from .cache import RenderResult
+
+# Encodings render_scene can produce (WebP goes through Pillow, which matplotlib requires).
+# WebP roughly halves thumbnails; for large full-size renders PNG is about as small and faster.
+IMAGE_FORMATS = ("png", "webp")
+# Longest side of a thumbnail, in pixels (ExploreCard and feed previews).
+THUMBNAIL_MAX_SIZE = 320
+# Label size in points at full size; scaled-down renders drop labels smaller than MIN_LABEL_FONT.
+LABEL_FONT = 8.0
+MIN_LABEL_FONT = 3.0
+
+
+@dataclass
+class RenderScene:
+    """
+    Minimal, picklable description of what to draw, stored as arrays.
+
+    Built from the document's element table (or a NetworkX graph) in the API process and shipped to render workers, so the
+    workers never need the full document or graph.
+
+    - centers: (n, 2) float array of node centers.
+    - radii: (n,) float array of node circle radii.
+    - fills / strokes: per-node colors.
+    - labels: per-node text (None for unlabeled nodes).
+    - edges: (m, 2) int array of indices into the node arrays.
+    """
+
+    centers: np.ndarray = field(default_factory=lambda: np.zeros((0, 2), dtype=np.float64))
+    radii: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float64))
+    fills: List[str] = field(default_factory=list)
+    strokes: List[str] = field(default_factory=list)
+    labels: List[Optional[str]] = field(default_factory=list)
+    edges: np.ndarray = field(default_factory=lambda: np.zeros((0, 2), dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.radii)
+
+
+def scene_from_table(table: ElementTable, merge_bound_text: bool = True) -> RenderScene:
+    """
+    Node boxes, colors, labels and edge endpoints straight from a document's element table:
+    the same nodes and edges as scene_from_graph(excalidraw_to_networkx(doc)), without
+    building the graph.
+
+    With `merge_bound_text`, text bound to a container is drawn as the container's label
+    rather than as a node of its own, and arrows bound to it connect to the container.
+    """
+    if merge_bound_text:
+        rows, redirect = table.merged_node_rows()
+    else:
+        rows, redirect = table.node_rows(), None
+    width, height = table.width[rows], table.height[rows]
+    centers = np.stack([table.x[rows] + width / 2.0, table.y[rows] + height / 2.0], axis=1)
+    radii = np.maximum(6.0, np.minimum(width, height) * 0.2)
+    fills = [_mpl_color(table.background_colors[i], "#ffffff") for i in rows.tolist()]
+    strokes = [_mpl_color(table.stroke_colors[i], "#1e1e1e") for i in rows.tolist()]
+    labels = table.labels(rows, redirect)
+    _, edges = table.bound_arrows(rows, redirect=redirect)
+    return RenderScene(centers=centers, radii=radii, fills=fills, strokes=strokes, labels=labels, edges=edges)
+
+
+def scene_from_graph(G) -> RenderScene:
+    """Extract node boxes, colors, labels and edge endpoints from an excalidraw_to_networkx graph."""
+    n = G.number_of_nodes()
+    boxes = np.empty((n, 4), dtype=np.float64)  # x, y, width, height
+    sizes = np.empty((n, 2), dtype=np.float64)  # width/height used for the radius (default 40)
+    fills: List[str] = []
+    strokes: List[str] = []
+    labels: List[Optional[str]] = []
+    index = {}
+    for i, (node, data) in enumerate(G.nodes(data=True)):
+        index[node] = i
+        boxes[i] = (data.get("x", 0.0), data.get("y", 0.0), data.get("width", 0.0), data.get("height", 0.0))
+        sizes[i] = (data.get("width", 40.0), data.get("height", 40.0))
+        fills.append(_mpl_color(data.get("backgroundColor"), "#ffffff"))
+        strokes.append(_mpl_color(data.get("strokeColor"), "#1e1e1e"))
+        label = data.get("text")
+        labels.append(str(label) if label else None)
+
+    centers = boxes[:, :2] + boxes[:, 2:] / 2.0
+    radii = np.maximum(6.0, sizes.min(axis=1) * 0.2) if n else np.zeros(0)
+    edges = np.fromiter(
+        (index[x] for u, v in G.edges() for x in (u, v)),
+        dtype=np.int64,
+        count=2 * G.number_of_edges(),
+    ).reshape(-1, 2)
+    return RenderScene(centers=centers, radii=radii, fills=fills, strokes=strokes, labels=labels, edges=edges)
+
+
+def _mpl_color(value: Optional[str], default: str) -> str:
+    # Excalidraw uses the CSS keyword "transparent", which matplotlib spells "none"
+    if not value:
+        return default
+    return "none" if value == "transparent" else value
+
+
+def init_matplotlib() -> None:
+    """Select the non-GUI Agg backend and load the font cache."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib import font_manager  # noqa: F401  (builds/loads the font cache)
+    from matplotlib.figure import Figure  # noqa: F401
+
+
+def render_scene(scene: RenderScene, format: str = "png", max_size: Optional[int] = None) -> RenderResult:
+    """
+    Draw the scene to PNG or WebP bytes.
+
+    With `max_size`, the image is scaled down (never up) so its longer side fits: the figure
+    is saved at a proportionally lower DPI, so strokes and text shrink with it, and labels
+    that would come out smaller than MIN_LABEL_FONT points are left out.
+
+    Uses the object-oriented Figure API rather than pyplot so no global state is shared
+    between renders; it is safe to call from threads as well as from pool workers.
+    """
+    if format not in IMAGE_FORMATS:
+        raise ValueError(f"unsupported image format {format!r}; expected one of {', '.join(IMAGE_FORMATS)}")
+    try:
+        from matplotlib.figure import Figure
+    except Exception as e:
+        raise RuntimeError(f"Matplotlib is required to render images: {e}") from e
+
+    started = time.perf_counter()
+    dpi = 96
+    # If no nodes, render a friendly placeholder
+    if len(scene) == 0:
+        width_px, height_px = 480, 240
+        fig = Figure(figsize=(width_px / dpi, height_px / dpi), dpi=dpi)
+        ax = fig.add_subplot()
+        ax.set_facecolor("white")
+        ax.axis("off")
+        ax.text(
+            0.5,
+            0.5,
+            "No graph to render",
+            ha="center",
+            va="center",
+            fontsize=14,
+            color="#888888",
+            transform=ax.transAxes,
+        )
+        fig.tight_layout(pad=0)
+        return _export(fig, format, _output_scale(width_px, height_px, max_size), started)
+
+    centers = scene.centers
+    min_x, min_y = centers.min(axis=0)
+    max_x, max_y = centers.max(axis=0)
+    padding = 40.0
+    width_px = max(1.0, (max_x - min_x) + 2 * padding)
+    height_px = max(1.0, (max_y - min_y) + 2 * padding)
+
+    fig_w_in = max(1.0, width_px / dpi)
+    fig_h_in = max(1.0, height_px / dpi)
+    scale = _output_scale(fig_w_in * dpi, fig_h_in * dpi, max_size)
+
+    fig = Figure(figsize=(fig_w_in, fig_h_in), dpi=dpi)
+    # Axes span the whole figure, so the image is already tight and savefig needs no
+    # bbox_inches="tight" (which draws the entire figure twice).
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.set_facecolor("white")
+    ax.axis("off")
+
+    ax.set_xlim(min_x - padding, max_x + padding)
+    ax.set_ylim(max_y + padding, min_y - padding)
+
+    if LABEL_FONT * scale < MIN_LABEL_FONT:
+        scene = RenderScene(scene.centers, scene.radii, scene.fills, scene.strokes, [None] * len(scene), scene.edges)
+    draw_scene(ax, scene, fontsize=LABEL_FONT)
+    return _export(fig, format, scale, started)
+
+
+def _output_scale(width_px: float, height_px: float, max_size: Optional[int]) -> float:
+    """Factor that fits a width_px x height_px image into max_size (1.0 when it already fits)."""
+    if not max_size:
+        return 1.0
+    return min(1.0, max_size / max(width_px, height_px))
+
+
+def _export(fig, format: str, scale: float, started: float) -> RenderResult:
+    """
+    Encode the figure in memory; the reported size is that of the encoded image. Figure
+    setup since `started` is reported as the "draw" stage, savefig (which rasterizes the
+    artists and compresses) as "encode".
+    """
+    dpi = fig.dpi * scale
+    width_in, height_in = fig.get_size_inches()
+    encode_start = time.perf_counter()
+    buf = io.BytesIO()
+    fig.savefig(buf, format=format, dpi=dpi, facecolor="white")
+    stages = (("draw", encode_start - started), ("encode", time.perf_counter() - encode_start))
+    # Agg truncates the canvas size the same way
+    return RenderResult(
+        format=format,
+        width=int(width_in * dpi),
+        height=int(height_in * dpi),
+        data=buf.getvalue(),
+        stages=stages,
+    )
+
+
+def draw_scene(ax, scene: RenderScene, fontsize: float = LABEL_FONT) -> None:
+    """
+    Add the scene's edges, node circles and labels to a matplotlib Axes, in data coordinates
+    (scene units). Callers set the limits and the figure; render_scene and the tile renderer
+    draw through this.
+    """
+    from matplotlib.collections import EllipseCollection, LineCollection
+
+    centers = scene.centers
+    # Draw all edges as one collection of straight segments between centers.
+    # zorder 2 keeps edges above the nodes, as individual Line2D artists used to be.
+    if len(scene.edges):
+        segments = centers[scene.edges]  # (m, 2, 2)
+        ax.add_collection(
+            LineCollection(segments, colors="#999999", linewidths=1.5, alpha=0.9, zorder=2),
+            autolim=False,
+        )
+
+    # Draw all nodes as one collection of circles, size scaled lightly by element size
+    if len(scene):
+        diameters = 2.0 * scene.radii
+        ax.add_collection(
+            EllipseCollection(
+                diameters,
+                diameters,
+                np.zeros(len(scene)),
+                units="xy",
+                offsets=centers,
+                offset_transform=ax.transData,
+                facecolors=scene.fills,
+                edgecolors=scene.strokes,
+                linewidths=1.5,
+                alpha=0.95,
+                zorder=1,
+            ),
+            autolim=False,
+        )
+
+    # Text has no collection equivalent; only labeled nodes get an artist
+    for (x, y), label in zip(centers, scene.labels):
+        if label:
+            ax.text(x, y, label, ha="center", va="center", fontsize=fontsize, color="#222222")
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+
+class RenderPoolBusy(Exception):
+    """Raised when the pool already holds `max_pending` jobs; callers should answer 503."""
+
+
+class RenderTimeout(Exception):
+    """Raised when a job does not finish within the per-request timeout."""
+
+
+def _warm_worker() -> int:
+    # Submitted once per worker at startup so every process is spawned and initialized
+    # before the first real request arrives.
+    return os.getpid()
+
+
+class RenderPool:
+    """
+    Dedicated process pool for CPU-bound rendering.
+
+    - workers: number of worker processes. 0 runs jobs on the server's threadpool instead
+      (useful for development and tests).
+    - max_pending: bound on queued + running jobs. Submitting beyond it raises RenderPoolBusy
+      instead of letting work pile up behind the workers.
+    - timeout: seconds to wait for a single job before raising RenderTimeout.
+    - initializer: run once in every worker process (e.g. import matplotlib, select Agg).
+
+    Workers are started with the "spawn" method: forking a process that already runs an
+    event loop and threads is not safe, and spawned workers only import what they need.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        timeout: float,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self.initializer = initializer
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"submitted": 0, "completed": 0, "rejected": 0, "timeouts": 0, "failed": 0}
+
+    def start(self) -> None:
+        """Spawn the worker processes and wait until each has run its initializer."""
+        try:
+            executor = self._ensure_executor()
+        except BaseException:
+            self._release()
+            raise
+        if executor is None:
+            if self.initializer is not None:
+                self.initializer()
+            return
+        warmups = [executor.submit(_warm_worker) for _ in range(self.workers)]
+        for f in warmups:
+            f.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` on the pool, enforcing the queue bound and timeout."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise RenderPoolBusy(f"render queue is full ({self.max_pending} pending)")
+            self._pending += 1
+            self._stats["submitted"] += 1
+
+        try:
+            executor = self._ensure_executor()
+        except BaseException:
+            self._release()
+            raise
+        if executor is None:
+            try:
+                result = await asyncio.wait_for(run_in_threadpool(fn, *args), self.timeout)
+            except asyncio.TimeoutError:
+                self._count("timeouts")
+                raise RenderTimeout(f"render did not finish within {self.timeout:g}s")
+            except Exception:
+                self._count("failed")
+                raise
+            finally:
+                self._release()
+            self._count("completed")
+            return result
+
+        # A worker dying (e.g. OOM-killed) breaks the whole executor; drop it so the next job
+        # gets a fresh one
+        try:
+            future: Future = executor.submit(fn, *args)
+        except BaseException as e:
+            # Nothing was queued (broken pool, or shut down in the meantime): give the slot back
+            self._release()
+            if isinstance(e, BrokenProcessPool):
+                self._reset(executor)
+            raise
+        # Release the slot only once the worker is really done, not when the caller gives up:
+        # a timed-out job still occupies a process until it finishes.
+        future.add_done_callback(self._on_done)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise RenderTimeout(f"render did not finish within {self.timeout:g}s")
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = self._pending
+        stats["workers"] = self.workers
+        stats["maxPending"] = self.max_pending
+        stats["timeoutSeconds"] = self.timeout
+        return stats
+
+    # --- internals ---
+
+    def _ensure_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers == 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer,
+                )
+            return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():
+            pass
+        elif future.exception() is not None:
+            self._count("failed")
+        else:
+            self._count("completed")
+        self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from models import ExcalidrawDocument
+from models.columnar import ElementTable
+
+from .cache import RENDERER_VERSION, RenderResult
+
+# Bump whenever the SVG drawing changes, so cached SVGs are regenerated.
+SVG_VERSION = 3
+# Streamed SVG is sent in pieces of about this many bytes rather than one per element.
+SVG_CHUNK_BYTES = 64 * 1024
+# Margin around the drawing, in scene units.
+PADDING = 10.0
+# Text that would come out smaller than this many pixels is left out of scaled-down previews.
+MIN_TEXT_PX = 3.0
+# Likewise, elements whose whole box would be smaller than this many pixels are left out.
+MIN_ELEMENT_PX = 0.5
+DEFAULT_STROKE = "#1e1e1e"
+DEFAULT_STROKE_WIDTH = 2.0
+DEFAULT_FONT_SIZE = 20.0
+DEFAULT_LINE_HEIGHT = 1.25
+# Excalidraw fontFamily codes; viewers without the hand-drawn fonts fall back to the next ones.
+FONT_FAMILIES = {
+    1: "Virgil, Segoe UI Emoji, sans-serif",
+    2: "Helvetica, Arial, sans-serif",
+    3: "Cascadia, Consolas, monospace",
+    5: "Excalifont, Segoe UI Emoji, sans-serif",
+    6: "Nunito, sans-serif",
+    7: "Lilita One, sans-serif",
+    8: "Comic Shanns, monospace",
+}
+_TEXT_ANCHORS = {"left": "start", "center": "middle", "right": "end"}
+# Dash and gap lengths per unit of stroke width
+_DASHES = {"dashed": (4.0, 4.0), "dotted": (0.75, 3.0)}
+# Hachure and cross-hatch fills are drawn as a translucent solid fill of the same color
+_SKETCH_FILL_OPACITY = 0.35
+# Frame names are drawn at this size above the frame
+FRAME_FONT_SIZE = 14.0
+# Element types drawn as closed shapes (frames and images as outlined boxes)
+_SHAPE_TYPES = {"rectangle", "ellipse", "diamond", "image", "embeddable", "iframe", "frame", "magicframe"}
+
+# Characters XML 1.0 does not allow anywhere in a document, even escaped: C0 controls other
+# than tab, newline and carriage return, lone surrogates, and U+FFFE/U+FFFF.
+_NOT_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+# Element fields that influence the SVG, for svg_cache_key.
+_SVG_FIELDS = (
+    "id",
+    "type",
+    "x",
+    "y",
+    "width",
+    "height",
+    "angle",
+    "strokeColor",
+    "backgroundColor",
+    "fillStyle",
+    "strokeWidth",
+    "strokeStyle",
+    "roundness",
+    "opacity",
+    "text",
+    "fontSize",
+    "fontFamily",
+    "textAlign",
+    "lineHeight",
+    "points",
+    "startArrowhead",
+    "endArrowhead",
+    "name",
+)
+
+
+def svg_cache_key(doc: ExcalidrawDocument) -> str:
+    """
+    Content hash of everything that influences a scene's SVG (a superset of what the
+    raster preview reads: SVG draws real shapes, strokes, text and arrow paths).
+    """
+    canonical: List[Any] = [RENDERER_VERSION, "svg", SVG_VERSION, _background(doc)]
+    for el in doc.elements:
+        if el.isDeleted:
+            continue
+        d = el.__dict__
+        extra = el.__pydantic_extra__ or {}
+        canonical.append([d[f] if f in d else extra.get(f) for f in _SVG_FIELDS])
+    blob = json.dumps(canonical, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class SvgRenderer:
+    """
+    Streams a scene as SVG straight from element geometry, without matplotlib.
+
+    Iterating yields the document as UTF-8 chunks (about SVG_CHUNK_BYTES each), so a large
+    map can be sent while it is being written; `render()` collects it into a RenderResult.
+    Elements are drawn in scene order as Excalidraw shows them: rectangles (rounded when
+    they have roundness), ellipses, diamonds, text, lines and arrows along their points with
+    their arrowheads, freedraw strokes, and frames and images as outlined boxes.
+
+    With `max_size` the picture is scaled down (never up) so its longer side fits; the
+    vector content is unchanged, except that text too small to read and elements smaller
+    than half a pixel are left out.
+    """
+
+    def __init__(self, doc: ExcalidrawDocument, max_size: Optional[int] = None, table: Optional[ElementTable] = None):
+        self.doc = doc
+        self.table = table if table is not None else ElementTable.from_document(doc)
+        self.rows = np.flatnonzero(~self.table.deleted)
+        bounds = self.table.bounds()[self.rows]
+        if len(self.rows):
+            min_x, min_y = bounds[:, :2].min(axis=0) - PADDING
+            max_x, max_y = bounds[:, 2:].max(axis=0) + PADDING
+            self.view_box = (float(min_x), float(min_y), float(max_x - min_x), float(max_y - min_y))
+        else:
+            self.view_box = (0.0, 0.0, 480.0, 240.0)
+        _, _, width, height = self.view_box
+        self.scale = min(1.0, max_size / max(width, height)) if max_size else 1.0
+        if self.scale < 1.0:
+            size = np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1])
+            self.rows = self.rows[size * self.scale >= MIN_ELEMENT_PX]
+        self.width = max(1, int(round(width * self.scale)))
+        self.height = max(1, int(round(height * self.scale)))
+
+    def __iter__(self) -> Iterator[bytes]:
+        return _chunked(self._parts(), SVG_CHUNK_BYTES)
+
+    def render(self) -> RenderResult:
+        started = time.perf_counter()
+        data = b"".join(self)
+        return RenderResult(format="svg", width=self.width, height=self.height, data=data, stages=(("draw", time.perf_counter() - started),))
+
+    def _parts(self) -> Iterator[str]:
+        min_x, min_y, width, height = self.view_box
+        yield (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+            f'viewBox="{_n(min_x)} {_n(min_y)} {_n(width)} {_n(height)}">'
+            f'<rect x="{_n(min_x)}" y="{_n(min_y)}" width="{_n(width)}" height="{_n(height)}" fill={_attr(_background(self.doc))}/>'
+            '<g stroke-linecap="round" stroke-linejoin="round">'
+        )
+        table = self.table
+        elements = self.doc.elements
+        # Absolute coordinates of every linear element's points, converted to floats in one go
+        counts = np.diff(table.point_offsets)
+        owner = np.repeat(np.arange(len(table)), counts)
+        coords = (table.points + np.stack([table.x[owner], table.y[owner]], axis=1)).tolist()
+        offsets = table.point_offsets.tolist()
+        min_font = MIN_TEXT_PX / self.scale if self.scale < 1.0 else 0.0
+        if not len(self.rows):
+            yield f'<text x="240" y="120" text-anchor="middle" font-family="{FONT_FAMILIES[2]}" font-size="14" fill="#888888">Empty scene</text>'
+        for i in self.rows.tolist():
+            d = elements[i].__dict__
+            kind = d["type"]
+            x, y = float(table.x[i]), float(table.y[i])
+            w, h = float(table.width[i]), float(table.height[i])
+            if kind == "text":
+                part = _text(d, table.texts[i], x, y, w, table.stroke_colors[i], min_font)
+            elif kind in ("arrow", "line", "freedraw"):
+                points = coords[offsets[i] : offsets[i + 1]]
+                part = _linear(d, kind, points, table.stroke_colors[i], table.background_colors[i])
+            elif kind in _SHAPE_TYPES:
+                # A frame's name is not a declared field, so it lives in the model's extras
+                name = (elements[i].__pydantic_extra__ or {}).get("name") if kind in ("frame", "magicframe") else None
+                part = _shape(d, kind, x, y, w, h, table.stroke_colors[i], table.background_colors[i], name, min_font)
+            else:
+                continue
+            if not part:
+                continue
+            angle = float(table.angle[i])
+            cx, cy = x + w / 2, y + h / 2
+            if angle and kind in ("arrow", "line", "freedraw"):
+                # Linear elements turn around the center of their points, which may lie left of or above x/y
+                xs, ys = [p[0] for p in points], [p[1] for p in points]
+                cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+            wrap = _wrapper(angle, float(table.opacity[i]), cx, cy)
+            yield f"<g{wrap}>{part}</g>" if wrap else part
+        yield "</g></svg>"
+
+
+def render_svg(doc: ExcalidrawDocument, max_size: Optional[int] = None) -> RenderResult:
+    """The whole SVG of `doc` at once (see SvgRenderer)."""
+    return SvgRenderer(doc, max_size).render()
+
+
+def _chunked(parts: Iterable[str], size: int) -> Iterator[bytes]:
+    buffer: List[str] = []
+    length = 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            length = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _n(value: float) -> str:
+    # One decimal is well below a pixel at any zoom a map is viewed at, and keeps files small
+    text = f"{value:.1f}"
+    return text[:-2] if text.endswith(".0") else text
+
+
+@lru_cache(maxsize=1024)
+def _attr(value: str) -> str:
+    return '"' + escape(_NOT_XML.sub("", value), {'"': "&quot;"}) + '"'
+
+
+def _xml_text(value: str) -> str:
+    return escape(_NOT_XML.sub("", value))
+
+
+def _background(doc: ExcalidrawDocument) -> str:
+    app_state = doc.metadata.get("appState")
+    color = app_state.get("viewBackgroundColor") if isinstance(app_state, dict) else None
+    return color if isinstance(color, str) and color else "#ffffff"
+
+
+def _wrapper(angle: float, opacity: float, cx: float, cy: float) -> str:
+    """Attributes of the group around a rotated or translucent element ("" if it needs none)."""
+    out = ""
+    if angle:
+        out += f' transform="rotate({_n(math.degrees(angle))} {_n(cx)} {_n(cy)})"'
+    if opacity < 100:
+        out += f' opacity="{max(0.0, opacity) / 100:.2f}"'
+    return out
+
+
+def _stroke(d: Dict[str, Any], color: Optional[str]) -> Tuple[str, float]:
+    """Stroke attributes of an element, and its stroke width."""
+    width = d.get("strokeWidth") or DEFAULT_STROKE_WIDTH
+    return _stroke_attrs(color or DEFAULT_STROKE, width, d.get("strokeStyle") or ""), width
+
+
+def _fill(d: Dict[str, Any], color: Optional[str]) -> str:
+    if not color or color == "transparent":
+        return ' fill="none"'
+    return _fill_attrs(color, d.get("fillStyle") in (None, "solid"))
+
+
+# A scene uses a handful of color and style combinations, so their attribute strings are
+# built (and escaped) once rather than per element.
+@lru_cache(maxsize=1024)
+def _stroke_attrs(color: str, width: float, style: str) -> str:
+    out = f' stroke={_attr(color)} stroke-width="{_n(width)}"'
+    dash = _DASHES.get(style)
+    if dash:
+        out += f' stroke-dasharray="{_n(dash[0] * width)} {_n(dash[1] * width)}"'
+    return out
+
+
+@lru_cache(maxsize=1024)
+def _fill_attrs(color: str, solid: bool) -> str:
+    out = f" fill={_attr(color)}"
+    if not solid:
+        out += f' fill-opacity="{_SKETCH_FILL_OPACITY}"'
+    return out
+
+
+def _shape(
+    d: Dict[str, Any],
+    kind: str,
+    x: float,
+    y: float,
+    w: float,
+    h: float,
+    stroke: Optional[str],
+    background: Optional[str],
+    name: Optional[str],
+    min_font: float,
+) -> str:
+    # Boxes may be stored with a negative size when drawn right-to-left or bottom-up
+    if w < 0:
+        x, w = x + w, -w
+    if h < 0:
+        y, h = y + h, -h
+    if kind in ("frame", "magicframe"):
+        out = f'<rect x="{_n(x)}" y="{_n(y)}" width="{_n(w)}" height="{_n(h)}" rx="8" fill="none" stroke="#bbbbbb" stroke-width="1"/>'
+        if name and FRAME_FONT_SIZE >= min_font:
+            out += (
+                f'<text x="{_n(x)}" y="{_n(y - 6)}" font-family="{FONT_FAMILIES[2]}" font-size="{_n(FRAME_FONT_SIZE)}" '
+                f'fill="#888888">{_xml_text(str(name))}</text>'
+            )
+        return out
+    if kind == "image":
+        return f'<rect x="{_n(x)}" y="{_n(y)}" width="{_n(w)}" height="{_n(h)}" fill="#f1f3f5" stroke="#ced4da" stroke-width="1"/>'
+    fill_attrs = _fill(d, background)
+    stroke_attrs, _ = _stroke(d, stroke)
+    if kind == "ellipse":
+        return f'<ellipse cx="{_n(x + w / 2)}" cy="{_n(y + h / 2)}" rx="{_n(w / 2)}" ry="{_n(h / 2)}"{fill_attrs}{stroke_attrs}/>'
+    if kind == "diamond":
+        cx, cy = x + w / 2, y + h / 2
+        points = f"{_n(cx)},{_n(y)} {_n(x + w)},{_n(cy)} {_n(cx)},{_n(y + h)} {_n(x)},{_n(cy)}"
+        return f'<polygon points="{points}"{fill_attrs}{stroke_attrs}/>'
+    radius = f' rx="{_n(min(32.0, 0.25 * min(w, h)))}"' if d.get("roundness") else ""
+    return f'<rect x="{_n(x)}" y="{_n(y)}" width="{_n(w)}" height="{_n(h)}"{radius}{fill_attrs}{stroke_attrs}/>'
+
+
+def _text(d: Dict[str, Any], text: Optional[str], x: float, y: float, w: float, color: Optional[str], min_font: float) -> str:
+    if not text:
+        return ""
+    size = d.get("fontSize") or DEFAULT_FONT_SIZE
+    if size < min_font:
+        return ""
+    line_height = size * (d.get("lineHeight") or DEFAULT_LINE_HEIGHT)
+    align = d.get("textAlign") or "left"
+    anchor_x = x + w / 2 if align == "center" else (x + w if align == "right" else x)
+    family = FONT_FAMILIES.get(d.get("fontFamily") or 0, FONT_FAMILIES[1])
+    head = (
+        f'<text font-family="{family}" font-size="{_n(size)}" fill={_attr(color or DEFAULT_STROKE)} '
+        f'text-anchor="{_TEXT_ANCHORS.get(align, "start")}" dominant-baseline="central">'
+    )
+    lines = [
+        f'<tspan x="{_n(anchor_x)}" y="{_n(y + (row + 0.5) * line_height)}">{_xml_text(line)}</tspan>'
+        for row, line in enumerate(text.split("\n"))
+        if line
+    ]
+    return head + "".join(lines) + "</text>"
+
+
+def _linear(d: Dict[str, Any], kind: str, points: List[List[float]], stroke: Optional[str], background: Optional[str]) -> str:
+    if len(points) < 2:
+        return ""
+    stroke_attrs, width = _stroke(d, stroke)
+    coords = [(px, py) for px, py in points]
+    path = "M" + "L".join(f"{_n(px)} {_n(py)}" for px, py in coords)
+    closed = kind == "line" and len(coords) > 2 and coords[0] == coords[-1]
+    fill_attrs = _fill(d, background) if closed else ' fill="none"'
+    out = f'<path d="{path}"{fill_attrs}{stroke_attrs}/>'
+    if kind == "arrow":
+        color = stroke or DEFAULT_STROKE
+        out += _arrowhead(d.get("endArrowhead"), coords[-1], _previous(coords, -1), width, color)
+        out += _arrowhead(d.get("startArrowhead"), coords[0], _previous(coords, 0), width, color)
+    return out
+
+
+def _previous(coords: Sequence[Tuple[float, float]], tip: int) -> Tuple[float, float]:
+    """The nearest point before the tip (end of the path) or after it (start) that differs from it."""
+    step = -1 if tip == -1 else 1
+    index = len(coords) - 1 if tip == -1 else 0
+    point = coords[index]
+    while 0 <= index + step < len(coords):
+        index += step
+        if coords[index] != point:
+            return coords[index]
+    return point
+
+
+def _arrowhead(kind: Optional[str], tip: Tuple[float, float], base: Tuple[float, float], width: float, color: str) -> str:
+    if not kind or tip == base:
+        return ""
+    dx, dy = tip[0] - base[0], tip[1] - base[1]
+    length = math.hypot(dx, dy)
+    ux, uy = dx / length, dy / length
+    size = min(10.0 + 2.0 * width, length / 2)
+    colour = _attr(color)
+    if kind in ("dot", "circle", "circle_outline"):
+        r = size / 3
+        fill = colour if kind != "circle_outline" else '"none"'
+        return f'<circle cx="{_n(tip[0] - ux * r)}" cy="{_n(tip[1] - uy * r)}" r="{_n(r)}" fill={fill} stroke={colour} stroke-width="{_n(width)}"/>'
+    if kind == "bar":
+        half = size / 2
+        return f'<path d="M{_n(tip[0] - uy * half)} {_n(tip[1] + ux * half)}L{_n(tip[0] + uy * half)} {_n(tip[1] - ux * half)}" fill="none" stroke={colour} stroke-width="{_n(width)}"/>'
+    # Both wings of the head, at +/-25 degrees from the shaft
+    cos, sin = math.cos(math.radians(25)), math.sin(math.radians(25))
+    left = (tip[0] - size * (ux * cos - uy * sin), tip[1] - size * (uy * cos + ux * sin))
+    right = (tip[0] - size * (ux * cos + uy * sin), tip[1] - size * (uy * cos - ux * sin))
+    if kind in ("diamond", "diamond_outline"):
+        # Half-size wings, closed by a point twice as far back along the shaft
+        left = ((tip[0] + left[0]) / 2, (tip[1] + left[1]) / 2)
+        right = ((tip[0] + right[0]) / 2, (tip[1] + right[1]) / 2)
+        back = (tip[0] - ux * size * cos, tip[1] - uy * size * cos)
+        corners = (tip, left, back, right)
+    elif kind in ("triangle", "triangle_outline"):
+        corners = (tip, left, right)
+    else:
+        corners = ()
+    if corners:
+        fill = '"none"' if kind.endswith("_outline") else colour
+        points = " ".join(f"{_n(px)},{_n(py)}" for px, py in corners)
+        return f'<polygon points="{points}" fill={fill} stroke={colour} stroke-width="{_n(width)}"/>'
+    return f'<path d="M{_n(left[0])} {_n(left[1])}L{_n(tip[0])} {_n(tip[1])}L{_n(right[0])} {_n(right[1])}" fill="none" stroke={colour} stroke-width="{_n(width)}"/>'
+
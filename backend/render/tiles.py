@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from models.spatial import SpatialIndex
+
+from .cache import RENDERER_VERSION, RenderResult
+from .matplotlib_renderer import LABEL_FONT, MIN_LABEL_FONT, RenderScene, draw_scene
+
+# Tiles are square images of this many pixels.
+TILE_SIZE = 256
+# Zoom levels: at BASE_ZOOM one scene unit is one pixel; each level doubles/halves that.
+MIN_ZOOM = 0
+MAX_ZOOM = 6
+BASE_ZOOM = 4
+# Rough half-width of a label per character, in scene units at LABEL_FONT (8pt at 96 dpi is
+# ~10.7 px, and an average glyph is ~0.6 em wide).
+_LABEL_CHAR_HALF_WIDTH = 3.2
+
+Rect = Tuple[float, float, float, float]
+
+
+def tile_scale(z: int) -> float:
+    """Pixels per scene unit at zoom `z`."""
+    return 2.0 ** (z - BASE_ZOOM)
+
+
+def tile_rect(z: int, x: int, y: int) -> Rect:
+    """
+    Scene-space rectangle covered by tile (z, x, y).
+
+    The grid is anchored at the scene origin, not at the drawing, so a tile keeps covering
+    the same area however the rest of the map changes. x and y may be negative.
+    """
+    span = TILE_SIZE / tile_scale(z)
+    return x * span, y * span, (x + 1) * span, (y + 1) * span
+
+
+@dataclass
+class TileJob:
+    """What a worker needs to draw one tile: the relevant part of the scene and its rectangle."""
+
+    scene: RenderScene
+    rect: Rect
+    fontsize: float
+
+
+class TileSet:
+    """
+    A RenderScene prepared for tiling.
+
+    Node circles (with room for their labels) and edge segments are indexed spatially, so a
+    tile only looks at what overlaps it. Each tile gets a content key: a hash of exactly what
+    would be drawn, in tile-local pixels. Editing one corner of a map therefore changes the
+    keys of the tiles in that corner only; every other tile keeps its key and stays cached,
+    and identical tiles (e.g. all empty ones at a zoom level) share a single cache entry.
+    """
+
+    def __init__(self, scene: RenderScene):
+        self.scene = scene
+        centers, radii = scene.centers, scene.radii
+        label_half = np.array([_LABEL_CHAR_HALF_WIDTH * len(label) + 2.0 if label else 0.0 for label in scene.labels])
+        half_w = np.maximum(radii, label_half)
+        half_h = np.maximum(radii, LABEL_FONT)
+        self._nodes = SpatialIndex(np.column_stack([centers[:, 0] - half_w, centers[:, 1] - half_h, centers[:, 0] + half_w, centers[:, 1] + half_h]))
+        a, b = centers[scene.edges[:, 0]], centers[scene.edges[:, 1]]
+        self._edges = SpatialIndex(np.column_stack([np.minimum(a, b), np.maximum(a, b)]))
+
+    def bounds(self) -> Optional[Rect]:
+        if not len(self.scene):
+            return None
+        b = self._nodes.bounds
+        return float(b[:, 0].min()), float(b[:, 1].min()), float(b[:, 2].max()), float(b[:, 3].max())
+
+    def tile_range(self, z: int) -> Optional[Tuple[int, int, int, int]]:
+        """Inclusive (min_x, min_y, max_x, max_y) tile coordinates covering the scene at zoom `z`."""
+        bounds = self.bounds()
+        if bounds is None:
+            return None
+        span = TILE_SIZE / tile_scale(z)
+        return (
+            int(np.floor(bounds[0] / span)),
+            int(np.floor(bounds[1] / span)),
+            int(np.floor(bounds[2] / span)),
+            int(np.floor(bounds[3] / span)),
+        )
+
+    def job(self, z: int, x: int, y: int) -> Tuple[str, TileJob]:
+        """The cache key and draw job for tile (z, x, y)."""
+        rect = tile_rect(z, x, y)
+        scale = tile_scale(z)
+        # Margin for stroke widths that stick out of the exact geometry
+        margin = 2.0 / scale
+        query = (rect[0] - margin, rect[1] - margin, rect[2] + margin, rect[3] + margin)
+        edges = self._edges.query(query)
+        nodes = np.union1d(self._nodes.query(query), self.scene.edges[edges].ravel())
+
+        remap = np.full(len(self.scene), -1, dtype=np.int64)
+        remap[nodes] = np.arange(len(nodes))
+        sub = RenderScene(
+            centers=self.scene.centers[nodes],
+            radii=self.scene.radii[nodes],
+            fills=[self.scene.fills[i] for i in nodes],
+            strokes=[self.scene.strokes[i] for i in nodes],
+            labels=[self.scene.labels[i] for i in nodes],
+            edges=remap[self.scene.edges[edges]].reshape(-1, 2),
+        )
+        fontsize = LABEL_FONT * scale
+        if fontsize < MIN_LABEL_FONT:
+            sub.labels = [None] * len(nodes)
+
+        # Content in tile-local pixels, rounded to what can change the image
+        local = np.round((sub.centers - rect[:2]) * scale * 4) / 4
+        digest = hashlib.sha256()
+        digest.update(json.dumps([RENDERER_VERSION, "tile", TILE_SIZE, round(fontsize, 3)]).encode("utf-8"))
+        for arr in (local, np.round(sub.radii * scale * 4) / 4, sub.edges):
+            digest.update(np.ascontiguousarray(arr).tobytes())
+        digest.update(json.dumps([sub.fills, sub.strokes, sub.labels], ensure_ascii=False).encode("utf-8"))
+        return "tile-" + digest.hexdigest(), TileJob(scene=sub, rect=rect, fontsize=fontsize)
+
+
+def render_tile(job: TileJob) -> RenderResult:
+    """Draw one TILE_SIZE x TILE_SIZE PNG tile (runs on the render pool like render_scene)."""
+    try:
+        from matplotlib.figure import Figure
+    except Exception as e:
+        raise RuntimeError(f"Matplotlib is required to render images: {e}") from e
+
+    started = time.perf_counter()
+    dpi = 96
+    fig = Figure(figsize=(TILE_SIZE / dpi, TILE_SIZE / dpi), dpi=dpi)
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.set_facecolor("white")
+    ax.axis("off")
+    min_x, min_y, max_x, max_y = job.rect
+    ax.set_xlim(min_x, max_x)
+    ax.set_ylim(max_y, min_y)
+    draw_scene(ax, job.scene, fontsize=job.fontsize)
+
+    encode_start = time.perf_counter()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, facecolor="white")
+    stages = (("tile_draw", encode_start - started), ("tile_encode", time.perf_counter() - encode_start))
+    return RenderResult(format="png", width=TILE_SIZE, height=TILE_SIZE, data=buf.getvalue(), stages=stages)
+
+
+class TileSetCache:
+    """Bounded LRU of TileSets by scene key, so the tiles of one scene share a single parse. Thread-safe."""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._tilesets: "OrderedDict[str, TileSet]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[TileSet]:
+        with self._lock:
+            tileset = self._tilesets.get(key)
+            if tileset is not None:
+                self._tilesets.move_to_end(key)
+            return tileset
+
+    def put(self, key: str, tileset: TileSet) -> None:
+        with self._lock:
+            self._tilesets[key] = tileset
+            self._tilesets.move_to_end(key)
+            while len(self._tilesets) > self.max_entries:
+                self._tilesets.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._tilesets), "maxEntries": self.max_entries}
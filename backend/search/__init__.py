@@ -0,0 +1,32 @@
+"""Full-text search for MapTopics backend.
+
+Convenience exports:
+    from backend.search import SearchIndex, SearchHit, tokenize
+    from backend.search import index_topics, index_feed, index_store, index_mindmap, update_mindmap_elements
+"""
+
+from .index import SEARCH_KINDS, SearchHit, SearchIndex, element_texts, tokenize
+from .sources import (
+    index_feed,
+    index_mindmap,
+    index_store,
+    index_stored_mindmap,
+    index_topics,
+    mindmap_doc_id,
+    update_mindmap_elements,
+)
+
+__all__ = [
+    "SEARCH_KINDS",
+    "SearchHit",
+    "SearchIndex",
+    "element_texts",
+    "tokenize",
+    "index_feed",
+    "index_mindmap",
+    "index_store",
+    "index_stored_mindmap",
+    "index_topics",
+    "mindmap_doc_id",
+    "update_mindmap_elements",
+]
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_WORD = re.compile(r"\w+")
+
+SEARCH_KINDS = ("topic", "card", "mindmap")
+
+# Weight of a term by where it occurs: titles (topics, card and map topics) outrank body text.
+TITLE_WEIGHT = 3.0
+TEXT_WEIGHT = 1.0
+
+# A prefix matching more terms than this only expands to the first ones in sort order, which
+# keeps one-letter typeahead queries bounded.
+MAX_PREFIX_EXPANSIONS = 256
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of `text` with accents removed ("Café" -> "cafe")."""
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _WORD.findall(folded)
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    id: str
+    kind: str
+    title: str
+    score: float
+    ref: Any  # card id, map slug, or the topic itself
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "kind": self.kind, "title": self.title, "score": round(self.score, 4), "ref": self.ref}
+
+
+class _Document:
+    __slots__ = ("kind", "title", "ref", "title_terms", "parts", "weights")
+
+    def __init__(self, kind: str, title: str, ref: Any):
+        self.kind = kind
+        self.title = title
+        self.ref = ref
+        self.title_terms: Counter = Counter()
+        # Body text by part (card description, map element id), so one part can change alone
+        self.parts: Dict[str, Tuple[str, ...]] = {}
+        self.weights: Dict[str, float] = {}
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over topics, explore cards and stored mind maps, for ranked
+    search and typeahead.
+
+    Each document is a title plus body text split into parts (for mind maps: one part per
+    element with text). Postings map a term to the documents containing it with a weight
+    (title hits count TITLE_WEIGHT, body hits TEXT_WEIGHT, summed over occurrences). The
+    sorted term list makes prefix lookups a bisect.
+
+    Updates are incremental: changing one element of a map re-tokenizes that element only
+    and touches the postings of the terms whose weight changed. Thread-safe; searches and
+    updates take one lock for their (short) duration.
+
+    Scoring is tf-idf-like: a query token contributes weight * log(1 + N / df) for each
+    matching term; the last token also matches as a prefix (typeahead), at half weight
+    unless it is the whole term. All tokens must match.
+    """
+
+    def __init__(self) -> None:
+        self._docs: Dict[str, _Document] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []  # sorted keys of _postings
+        self._lock = threading.Lock()
+
+    # --- updates ---
+
+    def set_document(
+        self,
+        doc_id: str,
+        kind: str,
+        title: str,
+        ref: Any = None,
+        parts: Optional[Dict[str, str]] = None,
+        replace: bool = True,
+    ) -> bool:
+        """
+        Add or replace a document with its title and body parts ({part id: text}). With
+        replace=False an existing document is left alone (e.g. a bulk load racing with live
+        updates must not overwrite them); returns whether the document was written.
+        """
+        with self._lock:
+            doc = self._docs.get(doc_id)
+            if doc is not None and not replace:
+                return False
+            if doc is None:
+                doc = self._docs[doc_id] = _Document(kind, title, ref)
+            doc.kind, doc.title, doc.ref = kind, title, ref
+            doc.title_terms = Counter(tokenize(title))
+            doc.parts = {}
+            for part_id, text in (parts or {}).items():
+                terms = tuple(tokenize(text)) if text else ()
+                if terms:
+                    doc.parts[part_id] = terms
+            self._reweigh(doc_id, doc)
+            return True
+
+    def update_parts(self, doc_id: str, changes: Dict[str, Optional[str]]) -> bool:
+        """Set or (with None) remove body parts of an existing document; False if it is unknown."""
+        with self._lock:
+            doc = self._docs.get(doc_id)
+            if doc is None:
+                return False
+            changed = False
+            for part_id, text in changes.items():
+                terms = tuple(tokenize(text)) if text else ()
+                if doc.parts.get(part_id, ()) == terms:
+                    continue
+                changed = True
+                if terms:
+                    doc.parts[part_id] = terms
+                else:
+                    doc.parts.pop(part_id, None)
+            if changed:
+                self._reweigh(doc_id, doc)
+            return True
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            doc = self._docs.pop(doc_id, None)
+            if doc is None:
+                return False
+            for term in doc.weights:
+                self._unpost(term, doc_id)
+            return True
+
+    def _reweigh(self, doc_id: str, doc: _Document) -> None:
+        weights: Dict[str, float] = {term: count * TITLE_WEIGHT for term, count in doc.title_terms.items()}
+        for terms in doc.parts.values():
+            for term in terms:
+                weights[term] = weights.get(term, 0.0) + TEXT_WEIGHT
+        for term in doc.weights.keys() - weights.keys():
+            self._unpost(term, doc_id)
+        for term, weight in weights.items():
+            if doc.weights.get(term) == weight:
+                continue
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[doc_id] = weight
+        doc.weights = weights
+
+    def _unpost(self, term: str, doc_id: str) -> None:
+        postings = self._postings.get(term)
+        if postings is None:
+            return
+        postings.pop(doc_id, None)
+        if not postings:
+            del self._postings[term]
+            i = bisect.bisect_left(self._terms, term)
+            if i < len(self._terms) and self._terms[i] == term:
+                del self._terms[i]
+
+    # --- queries ---
+
+    def search(self, query: str, kinds: Optional[Sequence[str]] = None, limit: int = 20, offset: int = 0) -> Tuple[int, List[SearchHit]]:
+        """(total matches, hits for the page), best first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return 0, []
+        with self._lock:
+            total_docs = len(self._docs) or 1
+            scores: Optional[Dict[str, float]] = None
+            # Rarest tokens first, so the intersection shrinks as early as possible
+            for token, prefix in sorted(((t, i == len(tokens) - 1) for i, t in enumerate(tokens)), key=lambda tp: self._df(*tp)):
+                token_scores = self._token_scores(token, prefix, total_docs)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+                if not scores:
+                    return 0, []
+            if kinds:
+                scores = {d: s for d, s in scores.items() if self._docs[d].kind in kinds}
+            # Only the top offset + limit need ordering, not every match
+            top = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            hits = [SearchHit(d, self._docs[d].kind, self._docs[d].title, s, self._docs[d].ref) for d, s in top[offset:]]
+        return len(scores), hits
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Indexed terms starting with the last word of `prefix`, most widespread first."""
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        with self._lock:
+            terms = self._expand(tokens[-1])
+            ranked = sorted(terms, key=lambda t: (-len(self._postings[t]), t))
+        return ranked[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = Counter(doc.kind for doc in self._docs.values())
+            return {
+                "documents": len(self._docs),
+                "terms": len(self._terms),
+                "postings": sum(len(p) for p in self._postings.values()),
+                "byKind": dict(kinds),
+            }
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._terms, prefix)
+        terms = []
+        for term in self._terms[start : start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _df(self, token: str, prefix: bool) -> int:
+        if not prefix:
+            return len(self._postings.get(token, ()))
+        return sum(len(self._postings[t]) for t in self._expand(token))
+
+    def _token_scores(self, token: str, prefix: bool, total_docs: int) -> Dict[str, float]:
+        scores: Dict[str, float] = {}
+        for term in self._expand(token) if prefix else [token]:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + total_docs / len(postings))
+            boost = 1.0 if term == token else 0.5
+            for doc_id, weight in postings.items():
+                score = weight * idf * boost
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+
+def element_texts(elements: Iterable[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """{element id: searchable text} for index parts; None for deleted or text-less elements."""
+    texts: Dict[str, Optional[str]] = {}
+    for element in elements:
+        element_id = element.get("id")
+        if not isinstance(element_id, str):
+            continue
+        text = None
+        if not element.get("isDeleted"):
+            text = element.get("originalText") or element.get("text") or element.get("name")
+        texts[element_id] = text if isinstance(text, str) else None
+    return texts
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from typing import Iterable, Optional, Sequence
+
+from feed import FeedStore
+from storage import ElementRecord, MindMapStore, StoredMindMap
+
+from .index import SearchIndex, element_texts
+
+# How many stored maps to list per query when indexing the whole store
+_STORE_PAGE = 500
+
+
+def topic_doc_id(topic: str) -> str:
+    return f"topic:{topic}"
+
+
+def card_doc_id(card_id: int) -> str:
+    return f"card:{card_id}"
+
+
+def mindmap_doc_id(slug: str) -> str:
+    return f"mindmap:{slug}"
+
+
+def index_topics(index: SearchIndex, topics: Iterable[str]) -> None:
+    for topic in topics:
+        index.set_document(topic_doc_id(topic), "topic", topic, ref=topic)
+
+
+def index_feed(index: SearchIndex, feed: FeedStore) -> None:
+    """One document per explore card: its topic as title, its description as body."""
+    for card in feed.cards():
+        index.set_document(card_doc_id(card["id"]), "card", card["topic"], ref=card["id"], parts={"description": card["description"]})
+
+
+def _record_texts(records: Iterable[ElementRecord]):
+    elements = []
+    for record in records:
+        # Only elements that can carry text need parsing; the rest just clear their part
+        if b'"text"' in record.data or b'"originalText"' in record.data or b'"name"' in record.data:
+            elements.append(json.loads(record.data))
+        else:
+            elements.append({"id": record.id, "isDeleted": True})
+    return element_texts(elements)
+
+
+def index_mindmap(index: SearchIndex, slug: str, topic: str, records: Sequence[ElementRecord]) -> None:
+    """(Re)index a whole stored map, e.g. after a save replaced it."""
+    texts = {k: v for k, v in _record_texts(records).items() if v}
+    index.set_document(mindmap_doc_id(slug), "mindmap", topic, ref=slug, parts=texts)
+
+
+def index_stored_mindmap(index: SearchIndex, stored: StoredMindMap, replace: bool = True) -> bool:
+    texts = {k: v for k, v in element_texts(stored.elements).items() if v}
+    summary = stored.summary
+    return index.set_document(mindmap_doc_id(summary.slug), "mindmap", summary.topic, ref=summary.slug, parts=texts, replace=replace)
+
+
+def update_mindmap_elements(
+    index: SearchIndex,
+    slug: str,
+    records: Sequence[ElementRecord],
+    server_elements_json: Optional[bytes] = None,
+) -> bool:
+    """
+    Apply a delta sync: re-index only the elements the client sent, then the server's copies
+    returned by the sync (which include any sent element that lost the merge, so the index
+    ends up matching the stored map). False if the map is not indexed yet.
+    """
+    changes = _record_texts(records)
+    if server_elements_json:
+        changes.update(element_texts(json.loads(server_elements_json)))
+    return index.update_parts(mindmap_doc_id(slug), changes)
+
+
+def index_store(index: SearchIndex, store: MindMapStore) -> int:
+    """
+    Index every stored map not indexed yet; returns how many were added. Maps saved or
+    synced while this runs index themselves, and their newer entries are kept.
+    """
+    count = 0
+    offset = 0
+    while True:
+        summaries = store.list(limit=_STORE_PAGE, offset=offset)
+        for summary in summaries:
+            stored = store.load(summary.slug)
+            if stored is not None and index_stored_mindmap(index, stored, replace=False):
+                count += 1
+        if len(summaries) < _STORE_PAGE:
+            return count
+        offset += len(summaries)
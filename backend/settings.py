@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+import threading
+import warnings
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+ENV_PREFIX = "MAPTOPICS_"
+# Read before the environment, if it exists; MAPTOPICS_ENV_FILE points elsewhere.
+DEFAULT_ENV_FILE = BACKEND_DIR / ".env"
+
+
+class Settings(BaseModel):
+    """
+    Deployment knobs of the API, one field per MAPTOPICS_<FIELD> environment variable.
+
+    Values come from a `.env` file (KEY=VALUE lines) overridden by the process environment,
+    validated and converted once at startup (see get_settings). Instances are frozen, so
+    one can be shared by every request and thread without locking.
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    # --- simulated latency (for demos of the loading states; 0 = off) ---
+    explore_delay_ms: float = Field(default=0.0, ge=0)
+    mindmap_delay_ms: float = Field(default=0.0, ge=0)
+
+    # --- HTTP ---
+    # Comma-separated in the environment
+    cors_origins: Tuple[str, ...] = ("http://localhost:5173", "http://127.0.0.1:5173")
+    # Smaller text responses are sent uncompressed
+    compression_min_bytes: int = Field(default=1024, ge=0)
+    # Compressed bodies of responses with an ETag, kept for reuse
+    compressed_cache_bytes: int = Field(default=32 * 1024 * 1024, ge=0)
+
+    # --- paths ---
+    data_dir: Path = BACKEND_DIR / "data"
+    cache_dir: Path = BACKEND_DIR / ".cache"
+    # ":memory:" for a throwaway database; defaults to <data_dir>/mindmaps.sqlite3
+    db_path: Optional[str] = None
+    db_pool_size: int = Field(default=4, ge=1)
+
+    # --- render worker pool (0 workers renders in-process) ---
+    render_workers: int = Field(default_factory=lambda: min(4, os.cpu_count() or 1), ge=0)
+    render_max_pending: int = Field(default=16, ge=1)
+    render_timeout: float = Field(default=30.0, gt=0)
+
+    # --- caches and limits ---
+    render_cache_entries: int = Field(default=128, ge=1)
+    render_cache_disk_entries: int = Field(default=2048, ge=0)
+    tile_cache_entries: int = Field(default=1024, ge=1)
+    tile_cache_disk_entries: int = Field(default=4096, ge=0)
+    tileset_cache_entries: int = Field(default=16, ge=1)
+    graph_cache_entries: int = Field(default=32, ge=1)
+    # Scene bodies past this size are spooled to a temporary file instead of memory
+    scene_spool_bytes: int = Field(default=8 * 1024 * 1024, ge=0)
+    feed_variations: int = Field(default=3, ge=1)
+    # Scenes of one /api/batch request processed at once (0 = twice the render workers,
+    # at most half the render queue)
+    batch_concurrency: int = Field(default=0, ge=0)
+
+    # --- slow-request profiler (off unless profile_slow_ms is set) ---
+    profile_slow_ms: Optional[float] = Field(default=None, ge=0)
+    profile_dir: Optional[Path] = None  # defaults to <cache_dir>/profiles
+    profile_interval_ms: float = Field(default=5.0, gt=0)
+
+    @field_validator("cors_origins", mode="before")
+    @classmethod
+    def _split_origins(cls, value):
+        if isinstance(value, str):
+            return tuple(origin.strip() for origin in value.split(",") if origin.strip())
+        return value
+
+    @property
+    def database(self) -> str:
+        return self.db_path or str(self.data_dir / "mindmaps.sqlite3")
+
+    @property
+    def profiles_dir(self) -> Path:
+        return self.profile_dir or self.cache_dir / "profiles"
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None, env_file: Optional[Path] = None) -> "Settings":
+        """
+        Build settings from `env_file` and then `environ` (default: os.environ), later
+        values winning. Unknown MAPTOPICS_ variables are reported with a warning rather
+        than ignored silently, since they are usually typos.
+        """
+        environ = os.environ if environ is None else environ
+        if env_file is None:
+            env_file = Path(environ.get(ENV_PREFIX + "ENV_FILE", DEFAULT_ENV_FILE))
+        values = {**read_env_file(env_file), **environ}
+
+        fields = {}
+        for key, value in values.items():
+            if not key.startswith(ENV_PREFIX) or key == ENV_PREFIX + "ENV_FILE":
+                continue
+            name = key[len(ENV_PREFIX):].lower()
+            if name not in cls.model_fields:
+                warnings.warn(f"{key} is not a MapTopics setting; ignored", stacklevel=2)
+                continue
+            if value != "":  # an empty value means "use the default"
+                fields[name] = value
+        return cls.model_validate(fields)
+
+
+def read_env_file(path: Path) -> dict:
+    """KEY=VALUE pairs of a dotenv-style file ('#' comments, optional quotes); {} if it is missing."""
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return {}
+    values = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        key = key.strip()
+        if key.startswith("export "):
+            key = key[len("export "):].strip()
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        values[key] = value
+    return values
+
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """
+    The process-wide settings, loaded on first call.
+
+    Also the FastAPI dependency through which endpoints read the knobs that apply per
+    request: explore_delay_ms, mindmap_delay_ms and batch_concurrency. Those can be swapped
+    in tests with `app.dependency_overrides[get_settings]`. Every other field sizes
+    something `main` builds once at import (CORS and compression middleware, render pool,
+    caches, body spooling, feed, templates, database, profiler), so it only takes effect
+    through the environment or .env file read before `main` is imported.
+    """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings.from_env()
+    return _settings
@@ -0,0 +1,23 @@
+"""Mind map persistence for MapTopics backend.
+
+Convenience exports:
+    from backend.storage import MindMapStore, SQLiteMindMapStore
+    from backend.storage import element_records, reconcile
+"""
+
+from .base import ElementRecord, MindMapStore, MindMapSummary, RevisionMismatch, StoredMindMap, SyncResult
+from .sqlite_store import SQLiteMindMapStore
+from .sync import element_records, incoming_wins, reconcile
+
+__all__ = [
+    "MindMapStore",
+    "MindMapSummary",
+    "StoredMindMap",
+    "ElementRecord",
+    "SyncResult",
+    "RevisionMismatch",
+    "SQLiteMindMapStore",
+    "element_records",
+    "incoming_wins",
+    "reconcile",
+]
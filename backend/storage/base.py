@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class MindMapSummary:
+    """Listing entry for a stored mind map (no scene payload)."""
+
+    slug: str
+    topic: str
+    elementCount: int
+    createdAt: int  # epoch ms
+    updatedAt: int  # epoch ms
+    revision: int  # bumped by every save or sync that changes elements
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "slug": self.slug,
+            "topic": self.topic,
+            "elementCount": self.elementCount,
+            "createdAt": self.createdAt,
+            "updatedAt": self.updatedAt,
+            "revision": self.revision,
+        }
+
+
+@dataclass(frozen=True)
+class ElementRecord:
+    """One element as stored: its id, Excalidraw version stamp and serialized JSON."""
+
+    id: str
+    version: int
+    version_nonce: int
+    data: bytes
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    """
+    Outcome of a delta sync.
+
+    `elements_json` holds the elements the client is missing: everything changed after its
+    `sinceRevision` by other clients, plus the server's copy of any element it sent that lost
+    the merge. Elements the client sent and that were accepted are not echoed back.
+    """
+
+    revision: int
+    accepted: int
+    elements_json: bytes
+
+    def to_json(self) -> bytes:
+        head = json.dumps({"revision": self.revision, "accepted": self.accepted}, separators=(",", ":"))
+        return head.encode("utf-8")[:-1] + b',"elements":' + self.elements_json + b"}"
+
+
+class RevisionMismatch(ValueError):
+    """The client claims a revision the stored map has not reached (e.g. it was replaced)."""
+
+
+@dataclass(frozen=True)
+class StoredMindMap:
+    """
+    A stored mind map.
+
+    The scene is kept as the JSON bytes it was saved with (`elements_json` is the element
+    array, `metadata_json` the object holding appState, files, ...), so serving it never
+    re-parses or re-validates the elements.
+    """
+
+    summary: MindMapSummary
+    elements_json: bytes
+    metadata_json: bytes
+
+    @property
+    def elements(self) -> List[Dict[str, Any]]:
+        return json.loads(self.elements_json)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return json.loads(self.metadata_json)
+
+    def to_json(self) -> bytes:
+        """
+        Response body: summary fields, then the scene's metadata keys and elements, i.e. a
+        valid Excalidraw export with slug/topic/timestamps added.
+        """
+        head = json.dumps(self.summary.to_dict(), separators=(",", ":")).encode("utf-8")[:-1]
+        meta = self.metadata_json.strip()[1:-1].strip()
+        if meta:
+            head += b"," + meta
+        return head + b',"elements":' + self.elements_json + b"}"
+
+
+class MindMapStore(ABC):
+    """
+    Server-side persistence for mind maps, addressed by slug.
+
+    Implementations must be safe to call from multiple threads (the API calls them from
+    the server threadpool).
+    """
+
+    @abstractmethod
+    def save(
+        self,
+        slug: str,
+        topic: str,
+        elements: Sequence[ElementRecord],
+        metadata_json: bytes,
+    ) -> MindMapSummary:
+        """Create or replace the mind map at `slug` with `elements`, in z-order."""
+
+    @abstractmethod
+    def load(self, slug: str) -> Optional[StoredMindMap]:
+        """Return the mind map at `slug`, or None."""
+
+    @abstractmethod
+    def summary(self, slug: str) -> Optional[MindMapSummary]:
+        """Return the summary of the mind map at `slug` without its scene, or None."""
+
+    @abstractmethod
+    def list(self, topic: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[MindMapSummary]:
+        """Summaries ordered by most recently updated, optionally filtered by exact topic."""
+
+    @abstractmethod
+    def sync(self, slug: str, since_revision: int, elements: Sequence[ElementRecord]) -> Optional[SyncResult]:
+        """
+        Merge `elements` into the map at `slug` (see storage.sync.reconcile) and return what the
+        client is missing since `since_revision`; None if there is no such map.
+
+        Raises RevisionMismatch if `since_revision` is ahead of the stored revision.
+        """
+
+    @abstractmethod
+    def delete(self, slug: str) -> bool:
+        """Delete the mind map at `slug`; return whether it existed."""
+
+    def close(self) -> None:
+        """Release connections or other resources."""
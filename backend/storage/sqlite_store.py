@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from .base import ElementRecord, MindMapStore, MindMapSummary, RevisionMismatch, StoredMindMap, SyncResult
+from .sync import VersionStamp, reconcile
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mindmaps (
+    slug TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    elements BLOB NOT NULL,        -- zlib-compressed JSON array of elements
+    metadata BLOB NOT NULL,        -- zlib-compressed JSON object (appState, files, ...)
+    element_count INTEGER NOT NULL,
+    created_at INTEGER NOT NULL,   -- epoch ms
+    updated_at INTEGER NOT NULL,   -- epoch ms
+    revision INTEGER NOT NULL DEFAULT 0,
+    snapshot_revision INTEGER NOT NULL DEFAULT 0  -- revision `elements` was last rebuilt at
+);
+CREATE INDEX IF NOT EXISTS idx_mindmaps_topic_updated ON mindmaps (topic, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_mindmaps_updated ON mindmaps (updated_at DESC);
+
+-- Per-element rows for delta sync. `mindmaps.elements` is a snapshot of these rows,
+-- valid while snapshot_revision == revision and rebuilt lazily on load otherwise.
+CREATE TABLE IF NOT EXISTS mindmap_elements (
+    slug TEXT NOT NULL,
+    element_id TEXT NOT NULL,
+    position INTEGER NOT NULL,      -- z-order within the map
+    version INTEGER NOT NULL,
+    version_nonce INTEGER NOT NULL,
+    revision INTEGER NOT NULL,      -- map revision that last changed this element
+    data BLOB NOT NULL,             -- element JSON
+    PRIMARY KEY (slug, element_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_mindmap_elements_revision ON mindmap_elements (slug, revision);
+"""
+
+_SUMMARY_COLUMNS = "slug, topic, element_count, created_at, updated_at, revision"
+
+# Stay well under SQLite's bound-parameter limit in `IN (...)` lists
+_IN_CHUNK = 500
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class SQLiteMindMapStore(MindMapStore):
+    """
+    MindMapStore backed by a single SQLite database file.
+
+    - WAL journal mode: readers never block the writer and vice versa, so loads stay fast
+      while maps are being saved.
+    - A fixed pool of `pool_size` connections, created lazily and handed out per call;
+      callers block (up to `timeout` seconds) when all are in use.
+    - Scene JSON is stored zlib-compressed; element arrays typically shrink 5-10x.
+    - Elements are also kept one row each with their version stamp and the map revision
+      that last changed them, so a delta sync reads and writes only the elements involved.
+      The compressed array is a snapshot of those rows, rebuilt on the next load after a sync.
+
+    `path` may be ":memory:" for an in-process database shared by all pooled connections.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        pool_size: int = 4,
+        timeout: float = 5.0,
+        compression_level: int = 6,
+    ):
+        self.path = str(path)
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.compression_level = compression_level
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._created = 0
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._memory = self.path == ":memory:"
+        # Shared-cache URI so every pooled connection sees the same in-memory database
+        self._uri = f"file:maptopics-{id(self)}?mode=memory&cache=shared" if self._memory else None
+
+    # --- MindMapStore ---
+
+    def save(
+        self,
+        slug: str,
+        topic: str,
+        elements: Sequence[ElementRecord],
+        metadata_json: bytes,
+    ) -> MindMapSummary:
+        now = _now_ms()
+        elements_json = b"[" + b",".join(r.data for r in elements) + b"]"
+        with self._connection(write=True) as conn:
+            row = conn.execute("SELECT revision FROM mindmaps WHERE slug = ?", (slug,)).fetchone()
+            revision = (row[0] if row else 0) + 1
+            conn.execute(
+                """
+                INSERT INTO mindmaps (slug, topic, elements, metadata, element_count, created_at, updated_at,
+                                      revision, snapshot_revision)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (slug) DO UPDATE SET
+                    topic = excluded.topic,
+                    elements = excluded.elements,
+                    metadata = excluded.metadata,
+                    element_count = excluded.element_count,
+                    updated_at = excluded.updated_at,
+                    revision = excluded.revision,
+                    snapshot_revision = excluded.snapshot_revision
+                """,
+                (
+                    slug,
+                    topic,
+                    zlib.compress(elements_json, self.compression_level),
+                    zlib.compress(metadata_json, self.compression_level),
+                    len(elements),
+                    now,
+                    now,
+                    revision,
+                    revision,
+                ),
+            )
+            conn.execute("DELETE FROM mindmap_elements WHERE slug = ?", (slug,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO mindmap_elements "
+                "(slug, element_id, position, version, version_nonce, revision, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((slug, r.id, i, r.version, r.version_nonce, revision, r.data) for i, r in enumerate(elements)),
+            )
+            row = conn.execute(f"SELECT {_SUMMARY_COLUMNS} FROM mindmaps WHERE slug = ?", (slug,)).fetchone()
+        return MindMapSummary(*row)
+
+    def load(self, slug: str) -> Optional[StoredMindMap]:
+        query = f"SELECT {_SUMMARY_COLUMNS}, snapshot_revision, elements, metadata FROM mindmaps WHERE slug = ?"
+        with self._connection() as conn:
+            row = conn.execute(query, (slug,)).fetchone()
+        if row is None:
+            return None
+        if row[6] == row[5]:
+            elements_json = zlib.decompress(row[7])
+        else:
+            # The snapshot is stale: rebuild it in a write transaction of its own. A read
+            # transaction cannot be upgraded once a sync has committed behind it under WAL.
+            with self._connection(write=True) as conn:
+                row = conn.execute(query, (slug,)).fetchone()
+                if row is None:
+                    return None
+                elements_json = zlib.decompress(row[7]) if row[6] == row[5] else self._rebuild_snapshot(conn, slug, row[5])
+        return StoredMindMap(
+            summary=MindMapSummary(*row[:6]),
+            elements_json=elements_json,
+            metadata_json=zlib.decompress(row[8]),
+        )
+
+    def summary(self, slug: str) -> Optional[MindMapSummary]:
+        with self._connection() as conn:
+            row = conn.execute(f"SELECT {_SUMMARY_COLUMNS} FROM mindmaps WHERE slug = ?", (slug,)).fetchone()
+        return MindMapSummary(*row) if row is not None else None
+
+    def list(self, topic: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[MindMapSummary]:
+        with self._connection() as conn:
+            if topic is None:
+                rows = conn.execute(
+                    f"SELECT {_SUMMARY_COLUMNS} FROM mindmaps ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+                    (limit, offset),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    f"SELECT {_SUMMARY_COLUMNS} FROM mindmaps WHERE topic = ? "
+                    "ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+                    (topic, limit, offset),
+                ).fetchall()
+        return [MindMapSummary(*row) for row in rows]
+
+    def sync(self, slug: str, since_revision: int, elements: Sequence[ElementRecord]) -> Optional[SyncResult]:
+        # BEGIN IMMEDIATE takes the write lock up front, so the stamps read below cannot change
+        # before the merge is written
+        with self._connection(write=True) as conn:
+            row = conn.execute("SELECT revision FROM mindmaps WHERE slug = ?", (slug,)).fetchone()
+            if row is None:
+                return None
+            revision = row[0]
+            if since_revision > revision:
+                raise RevisionMismatch(f"map is at revision {revision}, client claims {since_revision}")
+
+            current = self._version_stamps(conn, slug, [r.id for r in elements])
+            accepted, rejected = reconcile(current, elements)
+            if accepted:
+                revision += 1
+                position = conn.execute(
+                    "SELECT COALESCE(MAX(position), -1) + 1 FROM mindmap_elements WHERE slug = ?", (slug,)
+                ).fetchone()[0]
+                # New elements go on top; existing ones keep their position
+                conn.executemany(
+                    """
+                    INSERT INTO mindmap_elements (slug, element_id, position, version, version_nonce, revision, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (slug, element_id) DO UPDATE SET
+                        version = excluded.version,
+                        version_nonce = excluded.version_nonce,
+                        revision = excluded.revision,
+                        data = excluded.data
+                    """,
+                    ((slug, r.id, position + i, r.version, r.version_nonce, revision, r.data) for i, r in enumerate(accepted)),
+                )
+                added = sum(1 for r in accepted if r.id not in current)
+                conn.execute(
+                    "UPDATE mindmaps SET revision = ?, element_count = element_count + ?, updated_at = ? WHERE slug = ?",
+                    (revision, added, _now_ms(), slug),
+                )
+
+            sent = {r.id for r in accepted}
+            missing = [
+                data
+                for element_id, data in conn.execute(
+                    "SELECT element_id, data FROM mindmap_elements WHERE slug = ? AND revision > ? ORDER BY position",
+                    (slug, since_revision),
+                )
+                if element_id not in sent
+            ]
+            # Stored copies that beat the client's edit but predate its sinceRevision
+            for chunk in _chunks(rejected):
+                missing.extend(
+                    data
+                    for (data,) in conn.execute(
+                        f"SELECT data FROM mindmap_elements WHERE slug = ? AND revision <= ? "
+                        f"AND element_id IN ({','.join('?' * len(chunk))}) ORDER BY position",
+                        (slug, since_revision, *chunk),
+                    )
+                )
+        return SyncResult(
+            revision=revision,
+            accepted=len(accepted),
+            elements_json=b"[" + b",".join(missing) + b"]",
+        )
+
+    def delete(self, slug: str) -> bool:
+        with self._connection(write=True) as conn:
+            cur = conn.execute("DELETE FROM mindmaps WHERE slug = ?", (slug,))
+            conn.execute("DELETE FROM mindmap_elements WHERE slug = ?", (slug,))
+        return cur.rowcount > 0
+
+    # --- elements ---
+
+    @staticmethod
+    def _version_stamps(conn: sqlite3.Connection, slug: str, element_ids: Sequence[str]) -> Dict[str, VersionStamp]:
+        stamps: Dict[str, VersionStamp] = {}
+        for chunk in _chunks(list(dict.fromkeys(element_ids))):
+            for element_id, version, nonce in conn.execute(
+                f"SELECT element_id, version, version_nonce FROM mindmap_elements "
+                f"WHERE slug = ? AND element_id IN ({','.join('?' * len(chunk))})",
+                (slug, *chunk),
+            ):
+                stamps[element_id] = (version, nonce)
+        return stamps
+
+    def _rebuild_snapshot(self, conn: sqlite3.Connection, slug: str, revision: int) -> bytes:
+        """
+        Reassemble the element array from its rows and store it as the new snapshot. The
+        caller holds the write lock, so the rows are those of `revision`.
+        """
+        rows = conn.execute(
+            "SELECT data FROM mindmap_elements WHERE slug = ? ORDER BY position", (slug,)
+        ).fetchall()
+        elements_json = b"[" + b",".join(data for (data,) in rows) + b"]"
+        conn.execute(
+            "UPDATE mindmaps SET elements = ?, snapshot_revision = ? WHERE slug = ? AND revision = ?",
+            (zlib.compress(elements_json, self.compression_level), revision, slug, revision),
+        )
+        return elements_json
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._all = self._all, []
+            self._created = 0
+        # Drain the idle queue; connections still checked out are closed on return
+        while True:
+            try:
+                self._pool.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conns:
+            conn.close()
+
+    # --- pool ---
+
+    @contextmanager
+    def _connection(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Check a connection out of the pool for one transaction (commit on success).
+
+        `write` starts the transaction with BEGIN IMMEDIATE, for read-modify-write sequences.
+        """
+        conn = self._acquire()
+        try:
+            with conn:  # commits, or rolls back on exception
+                if write:
+                    conn.execute("BEGIN IMMEDIATE")
+                yield conn
+        finally:
+            self._release(conn)
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            with self._lock:
+                self._all.append(conn)
+            return conn
+        try:
+            return self._pool.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no SQLite connection available within {self.timeout:g}s")
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            alive = conn in self._all
+        if alive:
+            self._pool.put(conn)
+        else:
+            conn.close()  # the store was closed while this connection was checked out
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._memory:
+            conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False, timeout=self.timeout)
+        else:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # durable across app crashes in WAL mode
+        conn.executescript(_SCHEMA)
+        return conn
+
+
+def _chunks(items: Sequence[str]) -> Iterator[Sequence[str]]:
+    for i in range(0, len(items), _IN_CHUNK):
+        yield items[i : i + _IN_CHUNK]
+
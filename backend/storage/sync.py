@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from models import Element
+
+from .base import ElementRecord
+
+# (version, versionNonce) of an element
+VersionStamp = Tuple[int, int]
+
+
+def element_records(elements: Iterable[Element]) -> List[ElementRecord]:
+    """Serialize validated elements into storage records (missing version fields count as 0)."""
+    return [
+        ElementRecord(
+            id=el.id,
+            version=el.version or 0,
+            version_nonce=el.versionNonce or 0,
+            data=el.model_dump_json(exclude_none=True).encode("utf-8"),
+        )
+        for el in elements
+    ]
+
+
+def incoming_wins(incoming: VersionStamp, current: VersionStamp) -> bool:
+    """
+    Excalidraw's reconciliation rule: the higher `version` wins; on a tie the lower
+    `versionNonce` wins, so every replica picks the same element without coordination.
+    An identical stamp is the same edit and does not need to be applied again.
+    """
+    if incoming[0] != current[0]:
+        return incoming[0] > current[0]
+    return incoming[1] < current[1]
+
+
+def reconcile(
+    current: Mapping[str, VersionStamp],
+    incoming: Sequence[ElementRecord],
+) -> Tuple[List[ElementRecord], List[str]]:
+    """
+    Decide which incoming elements replace the stored ones.
+
+    `current` maps element id to the stored stamp for (at least) the incoming ids. Returns the
+    accepted records, in incoming order and one per id, and the ids whose stored copy won
+    (and must be sent back to the client).
+    """
+    winners: Dict[str, ElementRecord] = {}
+    for record in incoming:
+        best = winners.get(record.id)
+        if best is None or incoming_wins((record.version, record.version_nonce), (best.version, best.version_nonce)):
+            winners[record.id] = record
+
+    accepted: List[ElementRecord] = []
+    rejected: List[str] = []
+    for element_id, record in winners.items():
+        stamp = (record.version, record.version_nonce)
+        stored = current.get(element_id)
+        if stored is None or incoming_wins(stamp, stored):
+            accepted.append(record)
+        elif stored != stamp:  # an identical stamp means the client already has the stored copy
+            rejected.append(element_id)
+    return accepted, rejected
@@ -0,0 +1,23 @@
+"""Scene templates for new MapTopics mind maps.
+
+Convenience exports:
+    from backend.templates import SceneTemplate, TemplateRegistry
+"""
+
+from .scene_template import (
+    DEFAULT_TEMPLATE,
+    SceneTemplate,
+    TemplateRegistry,
+    UnknownTemplate,
+    topic_label,
+    topic_label_origin,
+)
+
+__all__ = [
+    "DEFAULT_TEMPLATE",
+    "SceneTemplate",
+    "TemplateRegistry",
+    "UnknownTemplate",
+    "topic_label",
+    "topic_label_origin",
+]
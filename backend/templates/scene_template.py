@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from models.excalidraw_models import ExcalidrawDocument
+
+DEFAULT_TEMPLATE = "base"
+
+DEFAULT_APP_STATE: Dict[str, Any] = {
+    "viewBackgroundColor": "#ffffff",
+    "theme": "light",
+}
+
+# Placeholder strings in the pre-encoded topic label; JSON escapes the NULs, so they cannot
+# collide with real content.
+_SLOT = "\x00slot:{}\x00"
+_SLOT_PATTERN = re.compile(rb'"\\u0000slot:(\w+)\\u0000"')
+
+
+def _dumps(value: Any) -> bytes:
+    # Same compact form as pydantic's JSON output, so spliced and model-built bodies match
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class UnknownTemplate(KeyError):
+    """No scene template is registered under the requested name."""
+
+
+def topic_label_origin(elements: Sequence[Dict[str, Any]]) -> Tuple[float, float]:
+    """Top-left for the topic label: just above the scene's bounding box."""
+    boxes = [e for e in elements if isinstance(e, dict) and not e.get("isDeleted") and e.get("type") != "arrow"]
+    if not boxes:
+        return 0.0, 0.0
+    return min(e.get("x", 0) for e in boxes), min(e.get("y", 0) for e in boxes) - 100
+
+
+def topic_label_number(topic: str) -> int:
+    # Stable across processes (unlike hash()), so every server returns the same bytes
+    return int.from_bytes(hashlib.sha256(topic.encode("utf-8")).digest()[:8], "big") % 10_000_000
+
+
+def topic_label(topic: str, origin: Tuple[float, float]) -> Dict[str, Any]:
+    """The text element naming the topic, placed at `origin`."""
+    text = f"Server init for: {topic}"
+    return {
+        "id": f"topic-label-{topic_label_number(topic)}",
+        "type": "text",
+        "x": origin[0],
+        "y": origin[1],
+        "width": 500,
+        "height": 60,
+        "angle": 0,
+        "strokeColor": "#1e1e1e",
+        "backgroundColor": "transparent",
+        "fillStyle": "solid",
+        "strokeWidth": 1,
+        "strokeStyle": "solid",
+        "roughness": 0,
+        "opacity": 100,
+        "groupIds": [],
+        "frameId": None,
+        "index": "a0",
+        "roundness": None,
+        "seed": 123456,
+        "version": 1,
+        "versionNonce": 1,
+        "isDeleted": False,
+        "boundElements": None,
+        "updated": 0,
+        "link": None,
+        "locked": False,
+        "text": text,
+        "fontSize": 28,
+        "fontFamily": 5,
+        "textAlign": "left",
+        "verticalAlign": "middle",
+        "containerId": None,
+        "originalText": text,
+        "autoResize": True,
+        "lineHeight": 1.25,
+    }
+
+
+class SceneTemplate:
+    """
+    A starting scene for new mind maps, parsed, validated and serialized once.
+
+    The response for a topic is `{"topic": ..., "elements": [...base elements, topic label],
+    "appState": {...}}`. Everything but the topic and the label's id and text is fixed, so it
+    is kept as pre-encoded bytes and `render(topic)` only encodes the few dynamic strings and
+    splices them in: one join, no element dicts copied and nothing re-validated.
+
+    - digest: content hash of the template; with the topic it determines the response, so
+      it seeds ETags.
+    """
+
+    def __init__(self, name: str, elements: List[Dict[str, Any]], app_state: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.element_count = len(elements)
+        app_state = DEFAULT_APP_STATE if app_state is None else app_state
+
+        label = topic_label("", topic_label_origin(elements))
+        label.update(id=_SLOT.format("id"), text=_SLOT.format("text"), originalText=_SLOT.format("text"))
+        self._label_parts, self._label_slots = _compile(_dumps(label))
+
+        encoded = [_dumps(e) for e in elements]
+        self._elements_head = b',"elements":[' + b",".join(encoded) + (b"," if encoded else b"")
+        self._tail = b'],"appState":' + _dumps(app_state) + b"}"
+        self.digest = hashlib.sha256(
+            b"\x00".join([name.encode("utf-8"), self._elements_head, *self._label_parts, self._tail])
+        ).hexdigest()
+
+    @classmethod
+    def from_json(cls, name: str, raw: bytes) -> "SceneTemplate":
+        """
+        Build from an Excalidraw file: a full export (its appState is merged over the
+        default) or a bare element list. Raises ValidationError if it is not a valid scene.
+        """
+        ExcalidrawDocument.from_json(raw)
+        data = json.loads(raw)
+        if isinstance(data, list):
+            return cls(name, data)
+        app_state = {**DEFAULT_APP_STATE, **(data.get("appState") or {})}
+        return cls(name, list(data.get("elements") or []), app_state)
+
+    def render(self, topic: str) -> bytes:
+        """The complete JSON response body for `topic`."""
+        values = {
+            "id": _dumps(f"topic-label-{topic_label_number(topic)}"),
+            "text": _dumps(f"Server init for: {topic}"),
+        }
+        label = [self._label_parts[0]]
+        for slot, part in zip(self._label_slots, self._label_parts[1:]):
+            label += (values[slot], part)
+        return b"".join([b'{"topic":', _dumps(topic), self._elements_head, *label, self._tail])
+
+    def etag(self, topic: str) -> str:
+        return '"mindmap-' + hashlib.sha256(f"{self.digest}:{topic}".encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def _compile(encoded: bytes) -> Tuple[List[bytes], List[str]]:
+    """Split encoded JSON at its slot placeholders: (n + 1 literal parts, n slot names)."""
+    parts: List[bytes] = []
+    slots: List[str] = []
+    position = 0
+    for match in _SLOT_PATTERN.finditer(encoded):
+        parts.append(encoded[position : match.start()])
+        slots.append(match.group(1).decode("ascii"))
+        position = match.end()
+    parts.append(encoded[position:])
+    return parts, slots
+
+
+class TemplateRegistry:
+    """
+    Named scene templates, loaded together on first use (or by the startup warmup):
+
+    - "base": data/excalidraw_base.json (an empty scene if it is missing or invalid)
+    - "blank": no elements
+    - one template per data/templates/<name>.json; invalid files are skipped with a warning
+
+    Thread-safe; templates are immutable once built.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self._templates: Optional[Dict[str, SceneTemplate]] = None
+        self._lock = threading.Lock()
+
+    def get(self, name: str = DEFAULT_TEMPLATE) -> SceneTemplate:
+        try:
+            return self.load()[name]
+        except KeyError:
+            raise UnknownTemplate(name) from None
+
+    def names(self) -> List[str]:
+        return sorted(self.load())
+
+    def load(self) -> Dict[str, SceneTemplate]:
+        templates = self._templates
+        if templates is None:
+            with self._lock:
+                if self._templates is None:
+                    self._templates = self._load_all()
+                templates = self._templates
+        return templates
+
+    def _load_all(self) -> Dict[str, SceneTemplate]:
+        templates = {"blank": SceneTemplate("blank", [])}
+        for path in sorted((self.data_dir / "templates").glob("*.json")):
+            try:
+                templates[path.stem] = SceneTemplate.from_json(path.stem, path.read_bytes())
+            except (OSError, ValueError, ValidationError) as e:
+                warnings.warn(f"skipping scene template {path.name}: {e}", stacklevel=2)
+        try:
+            base = SceneTemplate.from_json(DEFAULT_TEMPLATE, (self.data_dir / "excalidraw_base.json").read_bytes())
+        except (OSError, ValueError, ValidationError):
+            base = SceneTemplate(DEFAULT_TEMPLATE, [])  # empty scene
+        templates[DEFAULT_TEMPLATE] = base
+        return templates
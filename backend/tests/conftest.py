@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when `main` is first imported: keep the tests off the real database and
+# cache directories, and render in-process.
+os.environ.setdefault("MAPTOPICS_DB_PATH", ":memory:")
+os.environ.setdefault("MAPTOPICS_RENDER_WORKERS", "0")
+os.environ.setdefault("MAPTOPICS_CACHE_DIR", tempfile.mkdtemp(prefix="maptopics-test-cache-"))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as c:
+        yield c
@@ -0,0 +1,37 @@
+import json
+
+SCENE = {
+    "type": "excalidraw",
+    "version": 2,
+    "source": "https://excalidraw.com",
+    "appState": {"gridSize": 20, "viewBackgroundColor": "#ffffff", "zoom": {"value": 1}},
+    "files": {},
+    "elements": [
+        {"id": "box", "type": "rectangle", "x": 0, "y": -12.5, "width": 232, "height": 116, "angle": 0,
+         "strokeWidth": 2, "roughness": 1, "opacity": 100, "groupIds": [], "roundness": {"type": 3},
+         "seed": 1, "version": 3, "versionNonce": 7, "isDeleted": False, "updated": 1700000000000,
+         "boundElements": [{"type": "text", "id": "label"}, {"type": "arrow", "id": "link"}]},
+        {"id": "label", "type": "text", "x": 10, "y": 20, "width": 50.5, "height": 25, "angle": 0,
+         "groupIds": [], "version": 2, "versionNonce": 11, "text": "Topic", "fontSize": 20,
+         "fontFamily": 5, "textAlign": "center", "verticalAlign": "middle", "containerId": "box",
+         "originalText": "Topic", "autoResize": True, "lineHeight": 1.25},
+        {"id": "link", "type": "arrow", "x": 232, "y": 58, "width": 100, "height": 0, "angle": 0,
+         "groupIds": [], "version": 4, "versionNonce": 13, "points": [[0, 0], [100, 0.5]],
+         "startBinding": {"elementId": "box", "focus": 0, "gap": 4, "fixedPoint": [1, 0.5]},
+         "endArrowhead": "arrow", "elbowed": False, "customField": 1},
+    ],
+}
+
+
+def test_echo_round_trips_byte_for_byte(client):
+    body = json.dumps(SCENE, separators=(",", ":")).encode("utf-8")
+    response = client.post("/api/excalidraw/echo", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == 200
+    assert response.content == body
+
+
+def test_echo_keeps_integers(client):
+    scene = [{"id": "a", "type": "text", "x": 1, "y": 2.5, "width": 3, "height": 4, "fontSize": 20}]
+    response = client.post("/api/excalidraw/echo", json=scene)
+    element = response.json()["elements"][0]
+    assert [type(element[k]) for k in ("x", "y", "width", "fontSize")] == [int, float, int, int]
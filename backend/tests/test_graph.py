@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+from benchmarks.scenes import synthetic_scene
+from graph.csr import CSRGraph
+from graph.networkx_adapter import excalidraw_to_networkx
+from models import ExcalidrawDocument
+
+BASE_SCENE = Path(__file__).resolve().parent.parent / "data" / "excalidraw_base.json"
+
+
+SCENES = [
+    pytest.param(json.loads(BASE_SCENE.read_text(encoding="utf-8")), id="base"),
+    pytest.param(synthetic_scene(300), id="synthetic"),
+]
+
+
+@pytest.mark.parametrize("scene", SCENES)
+@pytest.mark.parametrize("merge", [True, False])
+def test_csr_graph_matches_networkx(scene, merge):
+    doc = ExcalidrawDocument.from_raw_scene(scene)
+    csr = CSRGraph.from_document(doc, merge_bound_text=merge)
+    G = excalidraw_to_networkx(doc, merge_bound_text=merge)
+    assert csr.node_ids == list(G.nodes)
+    assert csr.edge_count == G.number_of_edges()
+    assert len(set(csr.weak_components().tolist())) == nx.number_weakly_connected_components(G)
+    assert csr.labels == [G.nodes[n].get("text") for n in G.nodes]
+
+
+def test_components_endpoint_merges_bound_text(client):
+    body = BASE_SCENE.read_bytes()
+    response = client.post("/api/graph/components", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == 200
+    G = excalidraw_to_networkx(ExcalidrawDocument.from_raw_scene(json.loads(body)))
+    assert response.json()["nodeCount"] == G.number_of_nodes()
+
+
+def test_layout_endpoint_runs_on_merged_graph(client):
+    response = client.post("/api/graph/layout", content=BASE_SCENE.read_bytes(), headers={"content-type": "application/json"})
+    assert response.status_code == 200
+
+
+def _box(element_id, x, **extra):
+    return {"id": element_id, "type": "rectangle", "x": x, "y": 0, "width": 100, "height": 50, "version": 1, **extra}
+
+
+def _arrow(element_id, start, end, **extra):
+    return {
+        "id": element_id,
+        "type": "arrow",
+        "x": 100,
+        "y": 25,
+        "width": 10,
+        "height": 0,
+        "points": [[0, 0], [10, 0]],
+        "startBinding": {"elementId": start, "focus": 0, "gap": 4},
+        "endBinding": {"elementId": end, "focus": 0, "gap": 4},
+        "version": 1,
+        **extra,
+    }
+
+
+def test_layout_leaves_deleted_elements_alone(client):
+    scene = {
+        "type": "excalidraw",
+        "elements": [
+            _box("a", 0),
+            _box("b", 110),
+            _arrow("live", "a", "b"),
+            _arrow("gone", "a", "b", isDeleted=True),
+            {"id": "t", "type": "text", "x": 5, "y": 5, "width": 20, "height": 20, "text": "old",
+             "containerId": "a", "version": 1, "isDeleted": True},
+        ],
+    }
+    response = client.post("/api/graph/layout?algorithm=tree", json=scene)
+    assert response.status_code == 200
+    assert int(response.headers["X-Moved-Nodes"]) > 0
+    elements = {el["id"]: el for el in response.json()["elements"]}
+    assert elements["live"]["version"] == 2
+    for element_id in ("gone", "t"):
+        original = next(el for el in scene["elements"] if el["id"] == element_id)
+        assert {k: elements[element_id][k] for k in ("x", "y", "version")} == {k: original[k] for k in ("x", "y", "version")}
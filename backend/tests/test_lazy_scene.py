@@ -0,0 +1,36 @@
+import pytest
+
+from models import LazyScene, SceneFormatError
+
+SCENE_ENDPOINTS = ["/api/excalidraw/parse", "/api/excalidraw/echo", "/api/excalidraw/render?format=png", "/api/graph/components"]
+
+MALFORMED = [
+    pytest.param(b'{"\\x": 1, "elements": []}', id="bad-escape-in-key"),
+    pytest.param(b'{"\xff\xfe": 1, "elements": []}', id="invalid-utf8-key"),
+    pytest.param(b'{"a": tru, "elements": []}', id="bad-metadata-value"),
+    pytest.param(b'{"appState": {"a": tru}, "elements": []}', id="bad-nested-metadata-value"),
+    pytest.param(b'{"elements": 5}', id="elements-not-a-list"),
+    pytest.param(b'{"elements": null}', id="elements-null"),
+    pytest.param(b'[{"id": "a", "type": "rectangle", "oops": tru}]', id="bad-element-value"),
+]
+
+
+@pytest.mark.parametrize("body", MALFORMED)
+def test_malformed_scene_is_rejected_by_every_scene_endpoint(client, body):
+    for path in SCENE_ENDPOINTS:
+        response = client.post(path, content=body, headers={"content-type": "application/json"})
+        assert response.status_code == 422, path
+
+
+def test_scan_rejects_malformed_keys_and_metadata():
+    for body in (b'{"\\x": 1, "elements": []}', b'{"a": tru, "elements": []}'):
+        with pytest.raises(SceneFormatError):
+            LazyScene(body)
+
+
+def test_elements_and_files_stay_undecoded_until_asked():
+    lazy = LazyScene(b'{"type": "excalidraw", "elements": [{"id": "a"}, {"id": "b"}], "files": {"f": {"dataURL": "x"}}}')
+    assert lazy.element_count == 2
+    assert lazy.metadata_keys == ["type", "files"]
+    assert lazy.metadata() == {"type": "excalidraw"}
+    assert lazy.metadata(include_files=True)["files"] == {"f": {"dataURL": "x"}}
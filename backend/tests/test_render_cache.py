@@ -0,0 +1,55 @@
+import os
+
+from render.cache import RenderCache, RenderResult
+
+
+def _result(n: int) -> RenderResult:
+    return RenderResult(format="png", width=n, height=n, data=b"image-%d" % n)
+
+
+def _on_disk(tmp_path):
+    return sorted(path.stem for path in tmp_path.glob("*.render"))
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(max_entries=0, disk_dir=tmp_path, max_disk_entries=2)
+    cache.put("a", _result(1))
+    cache.put("b", _result(2))
+    assert cache.get("a") == _result(1)  # "a" is now the most recent
+    cache.put("c", _result(3))
+    assert _on_disk(tmp_path) == ["a", "c"]
+    assert cache.get("b") is None
+    assert cache.stats()["diskHits"] == 1
+
+
+def test_disk_order_is_seeded_from_the_directory(tmp_path):
+    first = RenderCache(max_entries=0, disk_dir=tmp_path, max_disk_entries=3)
+    for i, key in enumerate(["old", "mid", "new"]):
+        first.put(key, _result(i))
+        os.utime(tmp_path / f"{key}.render", (1_000_000 + i, 1_000_000 + i))
+
+    # A fresh cache (e.g. after a restart) picks up the files in modification-time order
+    second = RenderCache(max_entries=0, disk_dir=tmp_path, max_disk_entries=3)
+    assert second.get("mid") == _result(1)
+    second.put("newest", _result(3))
+    assert _on_disk(tmp_path) == ["mid", "new", "newest"]
+
+
+def test_entries_removed_behind_the_cache_are_forgotten(tmp_path):
+    cache = RenderCache(max_entries=0, disk_dir=tmp_path, max_disk_entries=2)
+    cache.put("a", _result(1))
+    cache.put("b", _result(2))
+    (tmp_path / "a.render").unlink()
+    assert cache.get("a") is None
+    cache.put("c", _result(3))
+    assert _on_disk(tmp_path) == ["b", "c"]
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = RenderCache(max_entries=4, disk_dir=tmp_path, max_disk_entries=4)
+    cache.put("a", _result(1))
+    cache.clear()
+    assert _on_disk(tmp_path) == []
+    assert cache.get("a") is None
+    cache.put("b", _result(2))
+    assert _on_disk(tmp_path) == ["b"]
@@ -0,0 +1,53 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from render.pool import RenderPool, RenderPoolBusy
+
+
+def _double(x):
+    return 2 * x
+
+
+def test_inline_pool_releases_slots():
+    pool = RenderPool(workers=0, max_pending=1, timeout=5)
+    assert asyncio.run(pool.run(_double, 21)) == 42
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(pool.run(divmod, 1, 0))
+    stats = pool.stats()
+    assert stats["pending"] == 0
+    assert stats["completed"] == 1 and stats["failed"] == 1
+
+
+def test_full_pool_rejects():
+    pool = RenderPool(workers=0, max_pending=1, timeout=5)
+    pool._pending = 1
+    with pytest.raises(RenderPoolBusy):
+        asyncio.run(pool.run(_double, 1))
+    assert pool.stats()["rejected"] == 1
+
+
+def test_executor_creation_failure_releases_slot(monkeypatch):
+    pool = RenderPool(workers=1, max_pending=1, timeout=5)
+
+    def fail():
+        raise OSError("cannot spawn")
+
+    monkeypatch.setattr(pool, "_ensure_executor", fail)
+    for _ in range(3):
+        with pytest.raises(OSError):
+            asyncio.run(pool.run(_double, 1))
+    assert pool.stats()["pending"] == 0
+
+
+def test_shut_down_executor_releases_slot():
+    pool = RenderPool(workers=1, max_pending=1, timeout=5)
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    executor.shutdown()
+    pool._executor = executor
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            asyncio.run(pool.run(_double, 1))
+    assert pool.stats()["pending"] == 0
@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import pytest
+
+from models import SpatialIndex, element_bounds
+
+
+def _brute_force(bounds: np.ndarray, rect) -> np.ndarray:
+    min_x, min_y, max_x, max_y = rect
+    b = bounds
+    return np.flatnonzero((b[:, 0] <= max_x) & (b[:, 2] >= min_x) & (b[:, 1] <= max_y) & (b[:, 3] >= min_y))
+
+
+def test_query_matches_brute_force():
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(-1000, 1000, size=(500, 2))
+    bounds = np.hstack([xy, xy + rng.uniform(1, 80, size=(500, 2))])
+    index = SpatialIndex(bounds)
+    for rect in [(-100, -100, 100, 100), (-5000, -5000, 5000, 5000), (900, 900, 2000, 2000), (3000, 3000, 4000, 4000)]:
+        assert index.query(rect).tolist() == _brute_force(bounds, rect).tolist()
+
+
+@pytest.mark.parametrize("far", [1e12, 1e300])
+def test_spread_out_scene(far):
+    bounds = np.array([[0.0, 0.0, 100.0, 50.0], [far, far, far + 100.0, far + 50.0]])
+    index = SpatialIndex(bounds)
+    assert index.query((-1, -1, 2 * far, 2 * far)).tolist() == [0, 1]
+    assert index.query((-1, -1, 10, 10)).tolist() == [0]
+    assert index.query((far - 1, far - 1, far + 1, far + 1)).tolist() == [1]
+
+
+@pytest.mark.parametrize(
+    "rect, expected",
+    [
+        ((-1e300, -1e300, 1e300, 1e300), [0, 1]),
+        ((-math.inf, -math.inf, math.inf, math.inf), [0, 1]),
+        ((1e18, 1e18, 2e18, 2e18), []),
+        ((math.nan, 0, 1, 1), []),
+    ],
+)
+def test_extreme_query_rectangles(rect, expected):
+    index = SpatialIndex(np.array([[0.0, 0.0, 10.0, 10.0], [50.0, 50.0, 60.0, 60.0]]))
+    assert index.query(rect).tolist() == expected
+
+
+def test_rotated_line_turns_about_its_points():
+    # Points run left of x: a half turn about their own center leaves the box where it was
+    box = element_bounds({"x": 0, "y": 0, "width": 100, "height": 0, "angle": math.pi, "points": [[0, 0], [-100, 0]]})
+    assert box == pytest.approx((-100, 0, 0, 0), abs=1e-9)
+
+
+def test_spread_out_viewport_endpoint(client):
+    elements = [
+        {"id": "near", "type": "rectangle", "x": 0, "y": 0, "width": 100, "height": 50},
+        {"id": "far", "type": "rectangle", "x": 1e12, "y": 1e12, "width": 100, "height": 50},
+    ]
+    assert client.put("/api/mindmaps/far-apart?topic=test", json={"elements": elements}).status_code == 200
+    response = client.get("/api/mindmaps/far-apart/viewport", params={"minX": -1, "minY": -1, "maxX": 2e12, "maxY": 2e12})
+    assert response.status_code == 200
+    assert sorted(el["id"] for el in response.json()["elements"]) == ["far", "near"]
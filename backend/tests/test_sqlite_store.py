@@ -0,0 +1,60 @@
+import json
+import threading
+
+from storage import ElementRecord, SQLiteMindMapStore
+
+
+def _record(element_id: str, version: int) -> ElementRecord:
+    data = json.dumps({"id": element_id, "type": "rectangle", "version": version}).encode("utf-8")
+    return ElementRecord(id=element_id, version=version, version_nonce=0, data=data)
+
+
+def test_load_rebuilds_snapshot_after_sync(tmp_path):
+    store = SQLiteMindMapStore(tmp_path / "maps.db")
+    try:
+        store.save("m", "topic", [_record("a", 1)], b"{}")
+        store.sync("m", 1, [_record("a", 2), _record("b", 1)])
+        stored = store.load("m")
+        assert stored.summary.revision == 2
+        assert [el["version"] for el in json.loads(stored.elements_json)] == [2, 1]
+        # The rebuilt snapshot is persisted and served as is on the next load
+        assert store.load("m").elements_json == stored.elements_json
+    finally:
+        store.close()
+
+
+def test_concurrent_load_and_sync(tmp_path):
+    store = SQLiteMindMapStore(tmp_path / "maps.db", pool_size=4)
+    store.save("m", "topic", [_record(f"e{i}", 1) for i in range(50)], b"{}")
+    errors = []
+    syncs = 100
+
+    def syncer():
+        try:
+            for version in range(2, syncs + 2):
+                store.sync("m", 0, [_record(f"e{version % 50}", version)])
+        except Exception as e:  # noqa: BLE001 - reported by the assertion below
+            errors.append(e)
+
+    def loader():
+        try:
+            for _ in range(syncs):
+                stored = store.load("m")
+                elements = json.loads(stored.elements_json)
+                assert len(elements) == stored.summary.elementCount == 50
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=syncer)] + [threading.Thread(target=loader) for _ in range(3)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        stored = store.load("m")
+        assert stored.summary.revision == syncs + 1
+        versions = {el["id"]: el["version"] for el in json.loads(stored.elements_json)}
+        assert versions["e1"] == 101 and versions["e0"] == 100
+    finally:
+        store.close()
@@ -0,0 +1,33 @@
+"""HTTP helpers for MapTopics backend (conditional requests, compression, startup, metrics).
+
+Convenience exports:
+    from backend.web import etag_matches, Warmup
+    from backend.web import MetricsRegistry, MetricsMiddleware, StageTimer, SlowRequestProfiler
+    from backend.web import CompressionMiddleware, CompressedBodyCache
+    from backend.web import DuplexStreamingResponse, request_chunks
+"""
+
+from .compression import CompressedBodyCache, CompressionMiddleware, available_encodings, negotiate
+from .conditional import etag_matches
+from .metrics import Counter, Gauge, Histogram, MetricsMiddleware, MetricsRegistry, StageTimer
+from .profiling import SlowRequestProfiler
+from .startup import Warmup
+from .streaming import DuplexStreamingResponse, request_chunks
+
+__all__ = [
+    "CompressedBodyCache",
+    "CompressionMiddleware",
+    "available_encodings",
+    "negotiate",
+    "etag_matches",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "StageTimer",
+    "SlowRequestProfiler",
+    "Warmup",
+    "DuplexStreamingResponse",
+    "request_chunks",
+]
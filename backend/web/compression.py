@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Server preference when a client accepts several encodings with the same q-value: zstd and
+# brotli compress scene JSON noticeably better than gzip at similar speed.
+PREFERRED_ENCODINGS = ("zstd", "br", "gzip")
+
+# Levels chosen for per-request compression: fast enough to beat sending the bytes
+# uncompressed on any real network, close to the best ratio on JSON.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 6
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# Streamed as events; buffering them in a compressor would delay delivery.
+_NEVER_COMPRESS = ("text/event-stream",)
+
+
+def _load_brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _load_zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+_brotli = _load_brotli()
+_zstd = _load_zstd()
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodings this process can produce: gzip always, br and zstd if their packages are installed."""
+    loaded = {"gzip": True, "br": _brotli is not None, "zstd": _zstd is not None}
+    return tuple(name for name in PREFERRED_ENCODINGS if loaded[name])
+
+
+def negotiate(accept_encoding: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header value, or None for identity.
+
+    Honors q-values (q=0 refuses) and `*`; among equally weighted codings the order of
+    `offered` decides.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for name in offered:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """One-shot compression of a whole body."""
+    if encoding == "gzip":
+        return gzip.compress(data, GZIP_LEVEL, mtime=0)
+    if encoding == "br":
+        return _brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == "zstd":
+        return _zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"unsupported encoding: {encoding}")
+
+
+class StreamCompressor:
+    """
+    Incremental compression for streamed bodies. Every chunk is flushed on its own, so a
+    client reading e.g. NDJSON sees each line as soon as the application sends it.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == "br":
+            self._brotli = _brotli.Compressor(quality=BROTLI_QUALITY)
+        elif encoding == "zstd":
+            self._zstd = _zstd.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            raise ValueError(f"unsupported encoding: {encoding}")
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zstd.compress(data) + self._zstd.flush(_zstd.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == "gzip":
+            return self._zlib.flush()
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zstd.flush()
+
+
+class CompressedBodyCache:
+    """
+    Bounded LRU of compressed response bodies, keyed by request path, ETag and encoding, so
+    a response that carries an ETag is compressed once per encoding rather than on every
+    request. Bounded by total bytes. Thread-safe.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._bodies: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is None:
+                self._stats["misses"] += 1
+                return None
+            self._bodies.move_to_end(key)
+            self._stats["hits"] += 1
+            return body
+
+    def put(self, key: Tuple[str, str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._bodies[key] = body
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._bodies)
+            stats["bytes"] = self._bytes
+            stats["maxBytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRatio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing text-like responses (JSON, NDJSON, SVG...) with the best
+    encoding the client accepts: zstd, br or gzip.
+
+    Bodies under `minimum_size` bytes are sent as they are (compressing them costs more than
+    it saves), as are responses that already have a Content-Encoding (e.g. precompressed
+    ones) and images. Streamed responses are compressed chunk by chunk. A compressed
+    response's ETag becomes weak, since its bytes differ from the identity representation;
+    if-none-match comparison ignores the W/ prefix, so revalidation still works. With a
+    `cache`, responses carrying an ETag are compressed once per encoding.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        cache: Optional[CompressedBodyCache] = None,
+        encodings: Optional[Sequence[str]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.encodings = tuple(encodings) if encodings is not None else available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        start_message: Optional[Dict[str, Any]] = None
+        # None until the first body chunk decides; then "identity", "whole" or "stream"
+        mode: Optional[str] = None
+        streamer: Optional[StreamCompressor] = None
+
+        async def send_wrapper(message):
+            nonlocal start_message, mode, streamer
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or mode == "identity":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if mode is None:
+                headers = MutableHeaders(scope=start_message)
+                compressible = _compressible(start_message["status"], headers)
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                if (
+                    not compressible
+                    or encoding is None
+                    or "content-encoding" in headers
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    mode = "identity"
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                if not more_body:
+                    mode = "whole"
+                    compressed = self._compress_whole(scope, etag, encoding, body)
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed, "more_body": False})
+                    return
+                mode = "stream"
+                del headers["Content-Length"]
+                streamer = StreamCompressor(encoding)
+                await send(start_message)
+
+            if mode == "stream":
+                data = streamer.chunk(body) if body else b""
+                if not more_body:
+                    data += streamer.finish()
+                if data or not more_body:
+                    await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+        if start_message is not None and mode is None:
+            # The app ended the response without a body message
+            await send(start_message)
+
+    def _compress_whole(self, scope, etag: Optional[str], encoding: str, body: bytes) -> bytes:
+        if self.cache is None or not etag or etag.startswith("W/"):
+            return compress(body, encoding)
+        key = (scope.get("path", "") + "?" + scope.get("query_string", b"").decode("latin-1"), etag, encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = compress(body, encoding)
+            self.cache.put(key, compressed)
+        return compressed
+
+
+def _compressible(status: int, headers: MutableHeaders) -> bool:
+    if status < 200 or status in (204, 304):
+        return False
+    content_type = headers.get("content-type", "").lower()
+    if content_type.startswith(_NEVER_COMPRESS):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import collections
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Innermost frames in these files mean the thread is idle (waiting for work or I/O).
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+
+class SlowRequestProfiler:
+    """
+    Opt-in sampling profiler that writes a flamegraph for every request slower than a threshold.
+
+    While at least one request is in flight, a background thread samples the stacks of all
+    threads every `interval` seconds (idle threads are skipped) into a bounded ring buffer.
+    When a request ends after `threshold` seconds or more, the samples taken during it are
+    written to `out_dir` as folded stacks (`<stack> <count>` per line), which flamegraph.pl,
+    speedscope and inferno read directly, next to a JSON file with the route, duration and
+    stage breakdown. Samples cover the whole process, so concurrent requests show up in each
+    other's profiles; work done in render worker processes is not sampled.
+
+    Costs nothing while no request is running; keeps at most `max_files` profiles.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        out_dir: Path,
+        interval: float = 0.005,
+        max_samples: int = 50_000,
+        max_files: int = 100,
+    ):
+        self.threshold = threshold
+        self.out_dir = Path(out_dir)
+        self.interval = interval
+        self.max_files = max_files
+        self._samples: Deque[Tuple[float, str]] = collections.deque(maxlen=max_samples)
+        self._active = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._written = 0
+
+    def begin(self) -> float:
+        """Mark a request as started; returns the ticket to pass to end()."""
+        with self._cond:
+            self._active += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample_loop, name="slow-request-profiler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return time.perf_counter()
+
+    def end(self, ticket: float, label: str, seconds: float, stages: Dict[str, float]) -> Optional[Path]:
+        """Mark a request as finished; write and return its profile if it was slow."""
+        with self._cond:
+            self._active -= 1
+        if seconds < self.threshold:
+            return None
+        finished = time.perf_counter()
+        with self._cond:
+            stacks = collections.Counter(stack for at, stack in self._samples if ticket <= at <= finished)
+        try:
+            return self._write(label, seconds, stages, stacks)
+        except OSError:
+            return None
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "thresholdSeconds": self.threshold,
+                "intervalSeconds": self.interval,
+                "bufferedSamples": len(self._samples),
+                "profilesWritten": self._written,
+                "directory": str(self.out_dir),
+            }
+
+    # --- internals ---
+
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        while True:
+            with self._cond:
+                while self._active == 0:
+                    self._cond.wait()
+            now = time.perf_counter()
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            samples = []
+            for ident, frame in sys._current_frames().items():
+                if ident == me or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                samples.append((now, _fold(names.get(ident, str(ident)), frame)))
+            with self._cond:
+                self._samples.extend(samples)
+            time.sleep(self.interval)
+
+    def _write(self, label: str, seconds: float, stages: Dict[str, float], stacks: collections.Counter) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-")[:80]
+        base = self.out_dir / f"{stamp}-{int(seconds * 1000)}ms-{slug}-{os.getpid()}-{threading.get_ident()}"
+        folded = base.with_suffix(".folded")
+        folded.write_text("".join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+        info = {
+            "request": label,
+            "seconds": round(seconds, 4),
+            "stages": {k: round(v, 4) for k, v in stages.items()},
+            "samples": sum(stacks.values()),
+            "intervalSeconds": self.interval,
+        }
+        base.with_suffix(".json").write_text(json.dumps(info, indent=2))
+        with self._cond:
+            self._written += 1
+        self._prune()
+        return folded
+
+    def _prune(self) -> None:
+        profiles: List[Path] = sorted(self.out_dir.glob("*.folded"), key=lambda p: p.name)
+        for old in profiles[: max(0, len(profiles) - self.max_files)]:
+            for path in (old, old.with_suffix(".json")):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+def _fold(thread_name: str, frame) -> str:
+    # root-to-leaf, ';'-separated: "thread;module:function;..."
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{os.path.splitext(os.path.basename(code.co_filename))[0]}:{code.co_name}")
+        frame = frame.f_back
+    parts.append(thread_name)
+    return ";".join(reversed(parts)).replace(" ", "_")
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Warmup:
+    """
+    Startup work that runs in the background once the server is accepting requests.
+
+    Each task (spawning render workers, importing NetworkX, loading data files...) runs on
+    its own daemon thread, so slow tasks overlap and none of them delays the first
+    response. Requests that arrive early simply do the work themselves, the same way they
+    would without a warmup. `status()` backs the readiness endpoint. Thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: List[Tuple[str, Callable[[], Any]]] = []
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._remaining = 0
+        self._started_at: Optional[float] = None
+
+    def add(self, name: str, fn: Callable[[], Any]) -> None:
+        """Register a task; tasks are only run by start()."""
+        with self._lock:
+            self._tasks.append((name, fn))
+            self._state[name] = {"state": "pending"}
+
+    def start(self) -> None:
+        """Run every registered task on its own thread and return immediately."""
+        with self._lock:
+            if self._started_at is not None:
+                return
+            self._started_at = time.perf_counter()
+            self._remaining = len(self._tasks)
+            tasks = list(self._tasks)
+        if not tasks:
+            self._done.set()
+        for name, fn in tasks:
+            threading.Thread(target=self._run, args=(name, fn), name=f"warmup-{name}", daemon=True).start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every task has finished (or failed); False on timeout."""
+        return self._done.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        "warming" while tasks run, then "ready", or "degraded" if a task failed (the
+        features it prepares then pay the cost, or fail, on first use).
+        """
+        with self._lock:
+            tasks = {name: dict(state) for name, state in self._state.items()}
+            started_at = self._started_at
+        if not self._done.is_set():
+            status = "warming"
+        elif any(task["state"] == "failed" for task in tasks.values()):
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "secondsSinceStart": round(time.perf_counter() - started_at, 3) if started_at is not None else None,
+            "tasks": tasks,
+        }
+
+    def _run(self, name: str, fn: Callable[[], Any]) -> None:
+        start = time.perf_counter()
+        self._set(name, state="running")
+        try:
+            fn()
+        except Exception as e:  # a failed warmup must never take the server down
+            self._set(name, state="failed", seconds=round(time.perf_counter() - start, 3), error=f"{type(e).__name__}: {e}")
+        else:
+            self._set(name, state="done", seconds=round(time.perf_counter() - start, 3))
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining == 0:
+                self._done.set()
+
+    def _set(self, name: str, **state: Any) -> None:
+        with self._lock:
+            self._state[name] = state
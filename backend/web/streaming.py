@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterable, AsyncIterator
+
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from starlette.types import Receive
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse whose body is produced while the request body is still being read.
+
+    On ASGI servers older than spec 2.4, StreamingResponse watches for the client going away
+    by reading `receive()` in parallel with the body, and drops every message that is not a
+    disconnect, including request body chunks. Here that watch starts only once the request
+    body has been read; until then, a disconnect surfaces through `request.stream()` itself.
+    """
+
+    def __init__(self, content: AsyncIterable, body_read: asyncio.Event, **kwargs) -> None:
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await self.body_read.wait()
+        await super().listen_for_disconnect(receive)
+
+
+async def request_chunks(request: Request, body_read: asyncio.Event) -> AsyncIterator[bytes]:
+    """`request.stream()`, setting `body_read` once the body is exhausted (or reading failed)."""
+    try:
+        async for chunk in request.stream():
+            yield chunk
+    finally:
+        body_read.set()
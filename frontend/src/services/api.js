@@ -15,12 +15,14 @@ export const apiService = {
    * Fetch explore cards with pagination
    * @param {number} limit - Number of cards to fetch (1-20)
    * @param {number} offset - Number of cards to skip
-   * @returns {Promise<{cards: Array, has_more: boolean, total_count: number}>}
+   * @param {string|null} cursor - next_cursor from the previous page (takes precedence over offset)
+   * @returns {Promise<{cards: Array, has_more: boolean, total_count: number, next_cursor: string|null}>}
    */
-  async getExploreCards(limit = 8, offset = 0) {
+  async getExploreCards(limit = 8, offset = 0, cursor = null) {
     try {
+      const page = cursor ? `cursor=${encodeURIComponent(cursor)}` : `offset=${offset}`;
       const response = await fetch(
-        `${API_BASE_URL}/api/explore?limit=${limit}&offset=${offset}`,
+        `${API_BASE_URL}/api/explore?limit=${limit}&${page}`,
         {
           method: 'GET',
           headers: {